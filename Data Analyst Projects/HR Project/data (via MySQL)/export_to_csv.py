@@ -1,17 +1,52 @@
-import pandas as pd
-import mysql.connector
+import argparse
 import shutil
 import os
+import sys
+# Helpers shared by the Insurance and HR projects (sinks, loaders, sharding, ...) live in ../../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from table_export import CHUNK_SIZE, MANIFEST, export_incremental, export_table, export_tables
+
+# Largest table: read as parallel primary-key ranges, then joined into one file
+SPLIT_KEYS = {'FACT_EmployeeSnapshot': 'SnapshotID'}
+
+# --incremental: only rows past the last exported value of these columns are exported (other tables are re-exported)
+WATERMARKS = {'FACT_EmployeeSnapshot': 'SnapshotID', 'FACT_TrainingAttendance': 'AttendanceID', 'FACT_Recruitment': 'RecruitmentID'}
+
+# Parquet column types that differ from the MySQL default (TINYINT(1) flags → bool, short text → dictionary)
+PARQUET_DTYPES = {
+    'DIM_Date': {'QuarterName': 'dictionary', 'MonthName': 'dictionary', 'MonthShort': 'dictionary',
+                 'DayOfWeek': 'dictionary', 'IsWeekend': 'bool'},
+    'DIM_Location': {'Country': 'dictionary', 'OfficeType': 'dictionary'},
+    'DIM_Training': {'Certification': 'bool'},
+    'DIM_Employee': {'Gender': 'dictionary', 'IsActive': 'bool'},
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export the HR Analytics tables to CSV or Parquet")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows fetched and written per chunk")
+    parser.add_argument('--compression', default='zstd', help="Parquet compression (zstd, snappy, gzip, none)")
+    parser.add_argument('--workers', type=int, default=4, help="Tables / table ranges exported at the same time")
+    parser.add_argument('--incremental', action='store_true', help="Append only new rows as partition files (see manifest.json)")
+    parser.add_argument('--sqlite', metavar='PATH', help="Export from a file written by the generator's --sink sqlite instead of MySQL")
+    args = parser.parse_args()
+    if args.sqlite and args.incremental:
+        parser.error("--incremental needs MySQL (it reads a consistent snapshot)")
+    return args
+
+def export_hr_to_csv(fmt='csv', chunk_size=CHUNK_SIZE, compression='zstd', workers=4, incremental=False, sqlite_path=None):
+    if sqlite_path is None:
+        import mysql.connector.pooling  # Here, so the generators' file sinks can import PARQUET_DTYPES without MySQL
+        # Enter your Connection Information (one pooled connection per worker + one for the snapshot lock)
+        pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_name='hr_export',
+            pool_size=workers + 1,
+            host='localhost',
+            user='root',
+            password='1111',
+            database='hr_analytics'
+        )
 
-def export_hr_to_csv():
-    # Enter your Connection Information
-    cnx = mysql.connector.connect(
-        host='localhost',
-        user='root',
-        password='1111',  
-        database='hr_analytics'
-    )
-    
     # List ALL tables (add or remove if you add more later)
     tables = [
         'DIM_Date',
@@ -24,33 +59,59 @@ def export_hr_to_csv():
         'DIM_Performance',
         'DIM_Employee',
         'FACT_EmployeeSnapshot',
-        'FACT_TrainingAttendance',   
-        'FACT_Recruitment'           
+        'FACT_TrainingAttendance',
+        'FACT_Recruitment'
     ]
-    
+
     # Folder name
-    folder_name = 'hr_analytics_csv'
-    
+    folder_name = f'hr_analytics_{fmt}'
+
+    # Incremental run on an earlier incremental export: keep it and only add new rows
+    if incremental and os.path.exists(os.path.join(folder_name, MANIFEST)):
+        print(f"Incremental export into '{folder_name}'...")
+        export_incremental(pool, tables, folder_name, WATERMARKS, fmt=fmt, workers=workers, split_keys=SPLIT_KEYS,
+                           chunk_size=chunk_size, dtypes=PARQUET_DTYPES, compression=compression)
+        print(f"\nAll done! New rows exported to '{folder_name}' (see {MANIFEST}).")
+        return
+
     # Remove old folder if exists
     if os.path.exists(folder_name):
         shutil.rmtree(folder_name)
         print(f"Old folder '{folder_name}' removed.")
-    
+
     # Create new folder
     os.makedirs(folder_name)
     print(f"Folder '{folder_name}' created.")
-    
-    # Export each table to CSV
-    for table in tables:
-        print(f"Exporting {table} to CSV...")
-        query = f"SELECT * FROM `{table}`"  # backticks in case of special names
-        df = pd.read_sql(query, cnx)
-        csv_path = f"{folder_name}/{table}.csv"
-        df.to_csv(csv_path, index=False)
-        print(f"   → {csv_path} ({len(df)} rows)")
-    
-    cnx.close()
-    print("\nAll done! HR Analytics data exported to 'hr_analytics_csv' folder.")
+
+    if incremental:
+        # First incremental run: full export in the partitioned layout + manifest
+        export_incremental(pool, tables, folder_name, WATERMARKS, fmt=fmt, workers=workers, split_keys=SPLIT_KEYS,
+                           chunk_size=chunk_size, dtypes=PARQUET_DTYPES, compression=compression)
+        print(f"\nAll done! HR Analytics data exported to '{folder_name}' folder (see {MANIFEST}).")
+        return
+
+    if sqlite_path:
+        # One connection to the file, tables one after another (nothing else writes to it)
+        from sinks import connect_sqlite, sqlite_parquet_types
+        print(f"Exporting {len(tables)} tables from {sqlite_path} to {fmt.upper()}...")
+        cnx = connect_sqlite(sqlite_path)
+        try:
+            for table in tables:
+                dtypes = {**sqlite_parquet_types(cnx, table), **PARQUET_DTYPES.get(table, {})}
+                export_table(cnx, table, folder_name, fmt, chunk_size, dtypes, compression)
+        finally:
+            cnx.close()
+        print(f"\nAll done! HR Analytics data exported to '{folder_name}' folder.")
+        return
+
+    # Export the tables concurrently from one consistent snapshot, each streamed in chunks
+    print(f"Exporting {len(tables)} tables to {fmt.upper()} with {workers} workers...")
+    export_tables(pool, tables, folder_name, fmt=fmt, workers=workers, split_keys=SPLIT_KEYS,
+                  chunk_size=chunk_size, dtypes=PARQUET_DTYPES, compression=compression)
+
+    print(f"\nAll done! HR Analytics data exported to '{folder_name}' folder.")
 
 # Run it
-export_hr_to_csv()
\ No newline at end of file
+if __name__ == "__main__":
+    args = parse_args()
+    export_hr_to_csv(args.format, args.chunk_size, args.compression, args.workers, args.incremental, args.sqlite)
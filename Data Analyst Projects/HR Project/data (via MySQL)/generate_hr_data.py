@@ -1,20 +1,126 @@
 # ====== IMPORTS ======
+import argparse
+import calendar
+import os
 import random
-from datetime import datetime, timedelta
-import mysql.connector
+import sys
+from datetime import date, datetime, timedelta
+import numpy as np
+# Helpers shared by the Insurance and HR projects (sinks, loaders, sharding, ...) live in ../../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from sinks import RESUMABLE, SINKS, open_sink
+from pipeline import QUEUE_BATCHES, WRITERS, PipelinedLoader
+from checkpoint import COMMIT_ROWS, Checkpoints, commit_intervals
+from sharding import run_sharded
+from id_allocator import EmailAllocator
+from snapshot_engine import BLOCK_SIZE, snapshot_rows
 
 # ====== CONSTANTS ======
 EGYPTIAN_DOMAINS = [
     "gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "icloud.com"
 ]
 
+N_EMPLOYEES = 1000
+
+# Sharded mode: employees per shard. Keep it fixed between runs - the output depends on it, not on --workers
+SHARD_SIZE = 250
+BATCH_SIZE = 5000
+
+# Database connection for --sink mysql
+DB_CONFIG = {'host': 'localhost', 'user': 'root', 'password': '1111', 'database': 'hr_analytics'}
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hr_analytics_schema.sql')
+
+# Date dimension range - the same days the schema's PopulateDate() procedure fills in MySQL
+DATE_RANGE = (date(2020, 1, 1), date(2030, 12, 31))
+
+EMPLOYEE_COLUMNS = ['EmployeeID', 'FullName', 'FirstName', 'LastName', 'Email', 'Gender', 'DateOfBirth', 'HireDate',
+                    'TerminationDate', 'IsActive', 'DepartmentID', 'JobRoleID', 'LocationID', 'EducationID', 'ManagerID']
+SNAPSHOT_COLUMNS = ['EmployeeID', 'SnapshotDateKey', 'DepartmentID', 'JobRoleID', 'LocationID', 'ManagerID',
+                    'MonthlySalary', 'Bonus', 'OvertimeHours', 'SickDays', 'TrainingHours', 'PerformanceID',
+                    'DistanceFromHome', 'JobSatisfaction', 'WorkLifeBalance', 'YearsInCurrentRole', 'YearsSinceLastPromotion']
+DATE_COLUMNS = ['DateKey', 'FullDate', 'Year', 'Quarter', 'QuarterName', 'Month', 'MonthName', 'MonthShort', 'DayOfWeek', 'IsWeekend']
+
+# Generation phases for checkpoint.py, keyed on EmployeeID. Sharded mode writes both tables per shard
+PHASES = [('DIM_Employee', ['DIM_Employee']), ('FACT_EmployeeSnapshot', ['FACT_EmployeeSnapshot'])]
+SHARDED_PHASES = [('DIM_Employee', ['DIM_Employee', 'FACT_EmployeeSnapshot'])]
+CHECKPOINT_SETTINGS = ['seed', 'scale', 'sharded', 'shard_size']  # Arguments a --resume run must repeat
+
 # ====== MAIN LOGIC ======
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate HR employees and monthly snapshots")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplier for the number of employees")
+    parser.add_argument('--seed', type=int, default=42, help="Base seed (sharded mode, emails and snapshot metrics)")
+    parser.add_argument('--sharded', action='store_true', help="Generate employee ranges (and their snapshots) in parallel worker processes")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes in sharded mode (does not change the output)")
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    parser.add_argument('--sink', choices=SINKS, default='mysql', help="Where the rows go: the MySQL database (mysql-load: staged TSV files + LOAD DATA, keys rebuilt at the end), a SQLite file, or CSV/Parquet files (sinks.py)")
+    parser.add_argument('--out', help="SQLite file or output folder (default: hr_analytics.sqlite / hr_analytics_<format>)")
+    parser.add_argument('--pipeline', action='store_true', help="Write batches from writer threads while the rows are generated (pipeline.py)")
+    parser.add_argument('--writers', type=int, help=f"Writer threads with --pipeline (default {WRITERS} for --sink mysql, 1 for the others)")
+    parser.add_argument('--queue-batches', type=int, default=QUEUE_BATCHES, help="Batches the pipeline holds before the generator waits")
+    parser.add_argument('--commit-every', action='append', metavar='[TABLE=]ROWS', help=f"Commit and checkpoint every ROWS rows (default {COMMIT_ROWS:,}); TABLE=ROWS sets one table, e.g. FACT_EmployeeSnapshot=200000")
+    parser.add_argument('--resume', action='store_true', help="Continue an interrupted run from its last checkpoint (same --seed, --scale, --sharded and --shard-size)")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: <SQLite file or MySQL database>.checkpoint)")
+    args = parser.parse_args()
+    if args.resume and args.sink not in RESUMABLE:
+        parser.error(f"--resume needs --sink {' or '.join(RESUMABLE)}")
+    return args
+
+
+def output_path(args):
+    return args.out or ('hr_analytics.sqlite' if args.sink == 'sqlite' else f'hr_analytics_{args.sink}')
+
+
+def checkpoint_path(args):
+    # Next to the SQLite file, or named after the MySQL database. The other sinks keep no checkpoint
+    if args.sink not in RESUMABLE:
+        return None
+    return args.checkpoint or f"{output_path(args) if args.sink == 'sqlite' else DB_CONFIG['database']}.checkpoint"
+
+
+def open_output(args):
+    out = output_path(args)
+    dtypes = None
+    if args.sink == 'parquet':
+        from export_to_csv import PARQUET_DTYPES  # Same column types as an exported database
+        dtypes = PARQUET_DTYPES
+    if not args.sink.startswith('mysql'):
+        print(f"Writing to {args.sink}: {out}")
+    sink = open_sink(args.sink, SCHEMA_PATH, mysql_config=DB_CONFIG, out=out, batch_size=BATCH_SIZE, dtypes=dtypes, resume=args.resume)
+    if args.pipeline:
+        sink = PipelinedLoader(sink, args.writers or (WRITERS if args.sink == 'mysql' else 1), args.queue_batches)
+    sink.register('DIM_Employee', EMPLOYEE_COLUMNS)
+    sink.register('FACT_EmployeeSnapshot', SNAPSHOT_COLUMNS, parents=['DIM_Employee'])
+    if not args.sink.startswith('mysql') and not args.resume:
+        # MySQL fills DIM_Date with the schema's stored procedure; the other sinks get the same rows from here
+        sink.register('DIM_Date', DATE_COLUMNS)
+        sink.add_rows('DIM_Date', date_rows(*DATE_RANGE))
+        sink.finish('DIM_Date')
+    return sink
+
+
+def open_checkpoints(sink, args, phases, state):
+    # Commits every --commit-every rows, each followed by a checkpoint (checkpoint.py) holding what the
+    # next rows depend on (state()), so --resume continues an interrupted run with the same rows.
+    # Returns the checkpoints and the state saved by the interrupted run (None for a new run)
+    checkpoints = Checkpoints(sink, checkpoint_path(args), {name: getattr(args, name) for name in CHECKPOINT_SETTINGS},
+                              commit_intervals(args.commit_every), state, phases)
+    if args.resume:
+        return checkpoints, checkpoints.resume()
+    checkpoints.save(phases[0][0], 0)  # A run interrupted before its first commit resumes from the start
+    return checkpoints, None
+
+
 def main():
-    # Database
-    cnx = mysql.connector.connect(
-        host='localhost', user='root', password='1111', database='hr_analytics'
-    )
-    cursor = cnx.cursor()
+    args = parse_args()
+    n_employees = int(N_EMPLOYEES * args.scale)
+
+    # MySQL (default), SQLite, CSV or Parquet - both tables go through the same loader interface
+    sink = open_output(args)
+
+    if args.sharded:
+        generate_sharded(sink, n_employees, args)
+        return
 
     # Load names
     names = load_egyptian_names()
@@ -22,92 +128,129 @@ def main():
     first_female_names = names.first_female
     last_names = names.last
 
-    used_emails = set()  # This is For unique emails 
+    emails = EmailAllocator(seed=args.seed)  # This is For unique emails 
+    snapshot_rng = np.random.default_rng(args.seed)
 
-    # === Insert 1000 employees ===
-    for i in range(1, 1001):
-        gender = random.choice(['Male', 'Female'])
-        first = random.choice(first_male_names if gender == 'Male' else first_female_names)
-        last = random.choice(last_names)
-        full = f"{first} {last}"
-        email = realistic_email(first, last, used_emails)
-        
-        dob = datetime(1980 + random.randint(0,20), random.randint(1,12), random.randint(1,28))
-        hire = datetime(2015 + random.randint(0,10), random.randint(1,12), random.randint(1,28))
-        term = hire + timedelta(days=random.randint(0, 2000)) if random.random() < 0.3 else None
-        is_active = 0 if term else 1
-
-        manager_id = random.randint(1, 50) if i > 50 else None
+    # The random stream isn't seeded here, so the checkpoints carry its state along with the emails
+    # and the snapshot generator
+    def state():
+        return {'random': random.getstate(), 'emails': emails, 'snapshot_rng': snapshot_rng.bit_generator.state}
 
-        sql = """
-        INSERT INTO DIM_Employee 
-        (EmployeeID, FullName, FirstName, LastName, Email, Gender, DateOfBirth, HireDate, TerminationDate, IsActive,
-        DepartmentID, JobRoleID, LocationID, EducationID, ManagerID)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+    checkpoints, saved = open_checkpoints(sink, args, PHASES, state)
+    if saved:
+        random.setstate(saved['random'])
+        emails = saved['emails']
+        snapshot_rng.bit_generator.state = saved['snapshot_rng']
 
-        cursor.execute(sql, (i, full, first, last, email, gender, dob.date(), hire.date(),
-              term.date() if term else None, is_active,
-              random.randint(1,5), random.randint(1,5), random.randint(1,4),
-              random.randint(1,3), manager_id))
+    # === Insert 1000 employees ===
+    # Kept in memory for the snapshot phase (no SELECT back per employee); a resumed run reads back
+    # the employees the interrupted one committed
+    resume_after = n_employees if checkpoints.done('DIM_Employee') else checkpoints.resume_after('DIM_Employee')
+    employees = list(sink.read_rows('DIM_Employee', resume_after)) if resume_after else []
+    if not checkpoints.done('DIM_Employee'):
+        for i in range(resume_after + 1, n_employees + 1):
+            gender = random.choice(['Male', 'Female'])
+            first = random.choice(first_male_names if gender == 'Male' else first_female_names)
+            last = random.choice(last_names)
+            full = f"{first} {last}"
+            email = realistic_email(first, last, emails)
+            
+            dob = datetime(1980 + random.randint(0,20), random.randint(1,12), random.randint(1,28))
+            hire = datetime(2015 + random.randint(0,10), random.randint(1,12), random.randint(1,28))
+            term = hire + timedelta(days=random.randint(0, 2000)) if random.random() < 0.3 else None
+            is_active = 0 if term else 1
+
+            manager_id = random.randint(1, 50) if i > 50 else None
+
+            employee = (i, full, first, last, email, gender, dob.date(), hire.date(),
+                  term.date() if term else None, is_active,
+                  random.randint(1,5), random.randint(1,5), random.randint(1,4),
+                  random.randint(1,3), manager_id)
+            employees.append(employee)
+            sink.add('DIM_Employee', employee)
+            checkpoints.advance('DIM_Employee', i, 1)
+        sink.finish('DIM_Employee')
+        checkpoints.finished('DIM_Employee')
+    emails = None  # Not needed after the employees (and no longer saved with every checkpoint)
 
 
 
     # === Monthly Snapshots (2020–2025) ===
+    # Month windows are expanded for blocks of employees at once (snapshot_engine.py) and the
+    # rows are loaded with batched INSERTs - no per-employee SELECT, no INSERT…SELECT per month.
+    # One block at a time, so a checkpoint falls between blocks (EmployeeIDs are 1..n, so the
+    # last EmployeeID done is also the index of the next employee)
     print("Generating monthly snapshots...")
-    for emp_id in range(1, 1001):
-        # To Fetch employee's actual HireDate and TerminationDate
-        cursor.execute("""
-            SELECT HireDate, TerminationDate 
-            FROM DIM_Employee 
-            WHERE EmployeeID = %s
-        """, (emp_id,))
-        result = cursor.fetchone()
-        if not result:
-            continue
-        hire_date, term_date = result
-
-        # Determine snapshot window
-        start_snap = max(hire_date, datetime(2020, 1, 1).date())
-        end_snap = term_date if term_date else datetime(2025, 12, 31).date()
-        end_snap = min(end_snap, datetime(2025, 12, 31).date())  # Cap at 2025
-
-        if start_snap > end_snap:
-            continue  # Skip if hired after 2025 or terminated before 2020
-
-        # Generate first day of each month in range
-        current = datetime(start_snap.year, start_snap.month, 1).date()
-        end_limit = datetime(end_snap.year, end_snap.month, 1).date()
-
-        while current <= end_limit:
-            date_key = int(current.strftime('%Y%m%d'))
-
-            # Generate realistic monthly metrics
-            salary = round(random.uniform(5000, 25000), 2)
-            cursor.execute("""
-                INSERT INTO FACT_EmployeeSnapshot 
-                (EmployeeID, SnapshotDateKey, DepartmentID, JobRoleID, LocationID, ManagerID,
-                MonthlySalary, Bonus, OvertimeHours, SickDays, TrainingHours, PerformanceID,
-                DistanceFromHome, JobSatisfaction, WorkLifeBalance, YearsInCurrentRole, YearsSinceLastPromotion)
-                SELECT %s, %s, DepartmentID, JobRoleID, LocationID, ManagerID,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                FROM DIM_Employee WHERE EmployeeID = %s
-            """, (
-                emp_id, date_key, salary, round(salary * random.uniform(0.05, 0.15), 2),
-                random.uniform(0, 20), random.randint(0, 5), random.randint(0, 40),
-                random.randint(1, 100), random.randint(1, 50), random.randint(1, 4),
-                random.randint(1, 4), random.randint(0, 5), random.randint(0, 3), emp_id
-            ))
-
-            # Then we Move to next month
-            if current.month == 12:
-                current = current.replace(year=current.year + 1, month=1)
-            else:
-                current = current.replace(month=current.month + 1)
-
-    cnx.commit()
-    print("1,000 employees + snapshots inserted!")
-    cnx.close()
+    n_snapshots = 0
+    for block_start in range(checkpoints.resume_after('FACT_EmployeeSnapshot'), len(employees), BLOCK_SIZE):
+        block = employees[block_start:block_start + BLOCK_SIZE]
+        block_rows = 0
+        for rows in snapshot_rows(block, snapshot_rng):
+            sink.add_rows('FACT_EmployeeSnapshot', rows)
+            block_rows += len(rows)
+        n_snapshots += block_rows
+        checkpoints.advance('FACT_EmployeeSnapshot', block[-1][0], block_rows)
+    sink.finish('FACT_EmployeeSnapshot')
+
+    print(f"{n_employees:,} employees + {n_snapshots:,} snapshots inserted!")
+    sink.close()
+    checkpoints.remove()
+
+
+
+
+# ====== SHARDED MODE ======
+# Each worker builds a range of employees and, from those in-memory rows, their monthly snapshots.
+# Seeds come from (base seed, table, shard), so the merged output is the same for any --workers.
+def build_employees(rng, fake, first_id, last_id, ctx):
+    names = ctx['names']
+    employees = []
+    for i in range(first_id, last_id + 1):
+        gender = rng.choice(['Male', 'Female'])
+        first = rng.choice(names.first_male if gender == 'Male' else names.first_female)
+        last = rng.choice(names.last)
+        email = email_parts(first, last, rng=rng)  # (base, domain, numbered) - allocated when merging
+
+        dob = datetime(1980 + rng.randint(0,20), rng.randint(1,12), rng.randint(1,28))
+        hire = datetime(2015 + rng.randint(0,10), rng.randint(1,12), rng.randint(1,28))
+        term = hire + timedelta(days=rng.randint(0, 2000)) if rng.random() < 0.3 else None
+        is_active = 0 if term else 1
+        manager_id = rng.randint(1, 50) if i > 50 else None
+
+        employee = (i, f"{first} {last}", first, last, email, gender, dob.date(), hire.date(),
+                    term.date() if term else None, is_active,
+                    rng.randint(1,5), rng.randint(1,5), rng.randint(1,4),
+                    rng.randint(1,3), manager_id)
+        employees.append(employee)
+
+    # Snapshots for the whole shard in one vectorized pass (NumPy generator seeded from the shard's rng)
+    snapshot_rng = np.random.default_rng(rng.getrandbits(64))
+    snapshots = [row for rows in snapshot_rows(employees, snapshot_rng) for row in rows]
+    return {'DIM_Employee': employees, 'FACT_EmployeeSnapshot': snapshots}
+
+
+def generate_sharded(sink, n_employees, args):
+    print(f"Generating {n_employees:,} employees + snapshots in shards of {args.shard_size:,} ({args.workers} workers)...")
+    ctx = {'names': load_egyptian_names()}
+    emails = EmailAllocator(seed=args.seed)
+    checkpoints, saved = open_checkpoints(sink, args, SHARDED_PHASES, lambda: {'emails': emails})
+    if saved:
+        emails = saved['emails']
+    total_snapshots = 0
+    for shard in run_sharded(build_employees, 'DIM_Employee', 1, n_employees, ctx, base_seed=args.seed,
+                             shard_size=args.shard_size, workers=args.workers,
+                             resume_after=checkpoints.resume_after('DIM_Employee')):
+        # Emails are allocated here, in shard order, so they're unique across shards
+        employees = [row[:4] + (emails.allocate(*row[4]),) + row[5:] for row in shard['DIM_Employee']]
+        sink.add_rows('DIM_Employee', employees)
+        sink.add_rows('FACT_EmployeeSnapshot', shard['FACT_EmployeeSnapshot'])  # Flushes pending employees first
+        total_snapshots += len(shard['FACT_EmployeeSnapshot'])
+        checkpoints.advance('DIM_Employee', employees[-1][0], len(employees) + len(shard['FACT_EmployeeSnapshot']))
+    sink.finish('DIM_Employee')
+    sink.finish('FACT_EmployeeSnapshot')
+    print(f"{n_employees:,} employees + {total_snapshots:,} snapshots inserted!")
+    sink.close()
+    checkpoints.remove()
 
 
 
@@ -115,33 +258,18 @@ def main():
 #                               ==================================== BACKEND ====================================
 
 # ====== Generate Realistic Emails ======
-def realistic_email(first, last, used_set):
+# first.last@domain, the address the original generator gave almost everyone. Only the domain is
+# drawn; the EmailAllocator adds a number when that address is already taken - O(1) per email,
+# no retry loop over a set of used emails.
+def email_parts(first, last, rng=random):
     first = first.split()[0].lower()
     last = last.split()[-1].lower()
-    formats = [
-        f"{first}.{last}",
-        f"{first}{last}",
-        f"{first}_{last}",
-        f"{first[0]}{last}",
-        f"{first}{last[0]}",
-    ]
-    domain = random.choice(EGYPTIAN_DOMAINS)
-    
-    for base in formats:
-        email = f"{base}@{domain}"
-        if email not in used_set:
-            used_set.add(email)
-            return email
+    domain = rng.choice(EGYPTIAN_DOMAINS)
+    return f"{first}.{last}", domain, False
+
 
-    # Fallback with number
-    counter = 1
-    base = f"{first}.{last}"
-    while True:
-        email = f"{base}{counter}@{domain}"
-        if email not in used_set:
-            used_set.add(email)
-            return email
-        counter += 1
+def realistic_email(first, last, allocator, rng=random):
+    return allocator.allocate(*email_parts(first, last, rng=rng))
 
 
 
@@ -231,6 +359,19 @@ class _EgyptianNames:
 
 
 
+# ====== Date Dimension ======
+# Same rows as the PopulateDate() procedure in hr_analytics_schema.sql, for the sinks that don't run it
+# (English month and day names, like MySQL's MONTHNAME() and DAYNAME())
+def date_rows(first, last):
+    d = first
+    while d <= last:
+        quarter = (d.month - 1) // 3 + 1
+        yield (d.year * 10000 + d.month * 100 + d.day, d, d.year, quarter, f"Q{quarter}",
+               d.month, calendar.month_name[d.month], calendar.month_name[d.month][:3],
+               calendar.day_name[d.weekday()], 1 if d.weekday() >= 5 else 0)
+        d += timedelta(days=1)
+
+
 def load_egyptian_names():
     return _EgyptianNames()
 
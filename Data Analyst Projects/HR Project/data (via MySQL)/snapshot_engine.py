@@ -0,0 +1,66 @@
+# ====== IMPORTS ======
+import numpy as np
+
+# ====== CONSTANTS ======
+SNAPSHOT_START = np.datetime64('2020-01', 'M')
+SNAPSHOT_END = np.datetime64('2025-12', 'M')  # Snapshots are capped at Dec 2025
+BLOCK_SIZE = 5_000  # Employees expanded at a time (≤ 72 snapshot rows each)
+
+
+# ====== MONTH WINDOWS ======
+# Every employee gets one snapshot per month from max(hire, Jan 2020) to min(termination, Dec 2025).
+# The windows are expanded for a whole block at once: np.repeat the employee columns by their
+# month counts, then add 0, 1, 2, ... inside each employee's run to the start month.
+def month_windows(hire_dates, term_dates):
+    hire = np.asarray(hire_dates, dtype='datetime64[D]').astype('datetime64[M]')
+    term = np.asarray(term_dates, dtype='datetime64[D]').astype('datetime64[M]')  # None → NaT
+    start = np.maximum(hire, SNAPSHOT_START)
+    end = np.where(np.isnat(term), SNAPSHOT_END, np.minimum(term, SNAPSHOT_END))
+    counts = np.maximum((end - start).astype(np.int64) + 1, 0)  # 0 when hired after the window
+    return start, counts
+
+
+def expand_months(start, counts):
+    total = int(counts.sum())
+    run_start = np.repeat(np.cumsum(counts) - counts, counts)
+    offset = np.arange(total) - run_start
+    months = np.repeat(start, counts) + offset.astype('timedelta64[M]')
+    years = months.astype('datetime64[Y]').astype(np.int64) + 1970
+    month_numbers = months.astype(np.int64) % 12 + 1
+    return years * 10000 + month_numbers * 100 + 1  # SnapshotDateKey, e.g. 20230401
+
+
+# ====== SNAPSHOT ROWS ======
+# employees: DIM_Employee rows as inserted (EmployeeID, ..., HireDate [7], TerminationDate [8],
+# DepartmentID [10], JobRoleID [11], LocationID [12], ..., ManagerID [14]).
+# Yields lists of FACT_EmployeeSnapshot tuples (SNAPSHOT_COLUMNS order), one list per block of employees.
+def snapshot_rows(employees, rng, block_size=BLOCK_SIZE):
+    for block_start in range(0, len(employees), block_size):
+        block = employees[block_start:block_start + block_size]
+        start, counts = month_windows([e[7] for e in block], [e[8] for e in block])
+        n = int(counts.sum())
+        if n == 0:
+            continue
+
+        def repeat(column):
+            return np.repeat(np.array([e[column] for e in block], dtype=object), counts)
+
+        # Same metric ranges as the original per-month loop
+        salary = np.round(rng.uniform(5000, 25000, n), 2)
+        columns = [
+            repeat(0),
+            expand_months(start, counts),
+            repeat(10), repeat(11), repeat(12), repeat(14),
+            salary,
+            np.round(salary * rng.uniform(0.05, 0.15, n), 2),
+            np.round(rng.uniform(0, 20, n), 2),
+            rng.integers(0, 6, n),
+            rng.integers(0, 41, n),
+            rng.integers(1, 101, n),
+            rng.integers(1, 51, n),
+            rng.integers(1, 5, n),
+            rng.integers(1, 5, n),
+            rng.integers(0, 6, n),
+            rng.integers(0, 4, n),
+        ]
+        yield list(zip(*(column.tolist() for column in columns)))
@@ -1,13 +1,21 @@
+import argparse
+import os
 import random
-from datetime import datetime, timedelta
-import mysql.connector
-from faker import Faker
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+import numpy as np
+# Helpers shared by the Insurance and HR projects (sinks, loaders, sharding, ...) live in ../../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from bulk_loader import BulkLoader
+from sinks import connect_sqlite
+from table_export import reset_tables
+from vocab_pools import VocabPools
+from samplers import sampler
+from policy_index import CATEGORIES, PolicyIndex, to_date
 
 # ====== SETUP ======
-fake = Faker('en_US')
-Faker.seed(42)
-random.seed(42)
-
 # Your database credentials
 DB_CONFIG = {
     'host': 'localhost',
@@ -27,119 +35,269 @@ claim_severity_factors = {
     2017: 0.95,
     2018: 0.90,
     2019: 0.95,
-    2020: 1.10,   
+    2020: 1.10,
     2021: 1.05,
     2022: 1.00,
     2023: 0.85,
     2024: 0.78,
-    2025: 0.65    
+    2025: 0.65
 }
 
-# ====== CONNECT AND CLEAR CLAIMS ======
-print("Connecting to database...")
-cnx = mysql.connector.connect(**DB_CONFIG)
-cursor = cnx.cursor()
-
-print("Clearing existing claims...")
-
-print("Temporarily disabling foreign key checks...")
-cursor.execute("SET FOREIGN_KEY_CHECKS = 0")  
-
-cursor.execute("TRUNCATE TABLE Claims")       
-
-cursor.execute("SET FOREIGN_KEY_CHECKS = 1")  
-print("Foreign key checks re-enabled.")
-
-# ====== FETCH VALID POLICIES ======
-print("Fetching valid policies...")
-cursor.execute("""
-    SELECT PolicyID, StartDate
-    FROM Policies
-    WHERE StartDate <= %s
-""", (today,))
-valid_policies = cursor.fetchall()
+TARGET_CLAIMS = 20000  # Claims built by a full rebuild
+BATCH_SIZE = 5000      # Rows per multi-row INSERT
 
-if not valid_policies:
-    print("ERROR: No policies found! Run the full script first.")
-    cnx.close()
-    exit()
+# Statements that differ between MySQL and a SQLite file written by the generator's --sink sqlite.
+# (The CSV/Parquet sinks write files, there is no database to fix in place.)
+DIALECTS = {
+    'mysql': {
+        'placeholder': '%s',
+        'fk_off': "SET FOREIGN_KEY_CHECKS = 0",
+        'fk_on': "SET FOREIGN_KEY_CHECKS = 1",
+        'drop_temp': "DROP TEMPORARY TABLE IF EXISTS {}",
+        'delete_claims': "DELETE c FROM Claims c JOIN claim_scope s ON s.ClaimID = c.ClaimID",
+        'update_payouts': """
+            UPDATE Payments p
+            JOIN payout_fix f ON f.PaymentID = p.PaymentID
+            SET p.Amount = f.Amount, p.PaymentDate = f.PaymentDate
+            WHERE f.Keep
+        """,
+        'delete_payouts': "DELETE p FROM Payments p JOIN payout_fix f ON f.PaymentID = p.PaymentID WHERE NOT f.Keep",
+    },
+    'sqlite': {
+        'placeholder': '?',
+        'fk_off': "PRAGMA foreign_keys = OFF",
+        'fk_on': "PRAGMA foreign_keys = ON",
+        'drop_temp': "DROP TABLE IF EXISTS temp.{}",
+        'delete_claims': "DELETE FROM Claims WHERE ClaimID IN (SELECT ClaimID FROM claim_scope)",
+        'update_payouts': """
+            UPDATE Payments
+            SET Amount = f.Amount, PaymentDate = f.PaymentDate
+            FROM payout_fix f
+            WHERE f.PaymentID = Payments.PaymentID AND f.Keep
+        """,
+        'delete_payouts': "DELETE FROM Payments WHERE PaymentID IN (SELECT PaymentID FROM payout_fix WHERE NOT Keep)",
+    },
+}
 
-print(f"Found {len(valid_policies):,} valid policies. Starting claim insertion...")
+CLAIM_COLUMNS = ['ClaimID', 'PolicyID', 'ClaimDate', 'IncidentDate', 'IncidentDescription',
+                 'ClaimAmountRequested', 'ClaimAmountApproved', 'ClaimStatus', 'FraudFlag']
 
-# ====== INSERT 20,000 CLAIMS ======
-claims_inserted = 0
-target_claims = 20000
 
-while claims_inserted < target_claims:
-    policy_id, policy_start_date = random.choice(valid_policies)
-    
-    # Incident date: after policy start, before or on today
-    try:
-        incident_date = fake.date_between(start_date=policy_start_date, end_date=today)
-    except ValueError:
-        incident_date = policy_start_date
-    
+# ====== CLAIM BUILDER ======
+def build_claim(claim_id, policy_id, incident_date, vocab, rng=random):
     incident_year = incident_date.year
-    claim_date = incident_date + timedelta(days=random.randint(0, 60))
+    claim_date = incident_date + timedelta(days=rng.randint(0, 60))
     if claim_date > today:
         claim_date = today
-    
+
     # Severity for the incident year
     severity = claim_severity_factors.get(incident_year, 0.90)
-    
+
     # Requested amount - realistic range
-    requested = round(random.uniform(1500, 60000), 2)
-    
-    # Approval: ~65% base, slightly higher in bad years
-    base_approval_prob = 0.65
-    approval_prob = base_approval_prob * severity
-    approval_prob = min(0.85, approval_prob)  # Never over 85%
-    
-    if random.random() > approval_prob:
+    requested = round(rng.uniform(1500, 60000), 2)
+
+    # Approval: ~65% base, slightly higher in bad years, never over 85%; 75% of approved claims are settled.
+    # Denied / Approved / Settled come from one draw of a sampler compiled once per severity factor
+    approval_prob = min(0.85, 0.65 * severity)
+    status = sampler(['Denied', 'Approved', 'Settled'], [1 - approval_prob, approval_prob * 0.25, approval_prob * 0.75]).draw(rng)
+
+    if status == 'Denied':
         approved = 0.0
-        status = 'Denied'
     else:
         # Payout ratio: 40–65% base, adjusted by severity but capped
-        base_ratio = random.uniform(0.40, 0.65)
+        base_ratio = rng.uniform(0.40, 0.65)
         final_ratio = base_ratio * severity
         final_ratio = min(0.75, final_ratio)  # Never pay more than 75% of requested
-        
+
         approved = requested * final_ratio
         approved = round(approved, 2)
-        
-        status = 'Approved'
-        if random.random() < 0.75:
-            status = 'Settled'
-    
-    fraud_flag = 1 if random.random() < 0.015 else 0  # Boolean as int for MySQL
-    
-    # Insert claim
+
+    fraud_flag = 1 if rng.random() < 0.015 else 0  # Boolean as int for MySQL
+
+    return (claim_id, policy_id, claim_date, incident_date, vocab.pick('claim_description', rng),
+            requested, approved, status, fraud_flag)
+
+
+# Claims and payouts are rewritten under the same ClaimIDs and PaymentIDs, which the ID watermarks
+# of export_to_csv.py --incremental would never pick up again: the two tables are reset in these
+# export folders, so their next incremental run exports them in full
+EXPORT_FOLDERS = ['insurance_dataset_csv', 'insurance_dataset_parquet']
+
+
+# ====== SCOPE ======
+# Without a scope every claim is rebuilt (the original behaviour). With --years, --category and/or
+# --policies only the claims in that slice are deleted and rebuilt - same count, same ClaimIDs,
+# new policies and incident dates drawn inside the slice - so retuning one year takes seconds.
+def parse_args():
+    parser = argparse.ArgumentParser(description="Regenerate all claims, or only one slice of them")
+    parser.add_argument('--years', type=int, nargs=2, metavar=('FIRST', 'LAST'), help="Only claims with an incident date in these years")
+    parser.add_argument('--category', nargs='+', choices=CATEGORIES, help="Only claims on policies of these product categories")
+    parser.add_argument('--policies', type=int, nargs=2, metavar=('FIRST', 'LAST'), help="Only claims on this PolicyID range")
+    parser.add_argument('--claims', type=int, default=TARGET_CLAIMS, help="Number of claims of a full rebuild (no scope)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sink', choices=list(DIALECTS), default='mysql', help="The MySQL database, or a SQLite file from the generator's --sink sqlite")
+    parser.add_argument('--out', default='insurance_project_001.sqlite', help="SQLite file (with --sink sqlite)")
+    parser.add_argument('--exports', nargs='+', default=EXPORT_FOLDERS, metavar='FOLDER',
+                        help="export_to_csv.py --incremental folders whose Claims and Payments are reset (next run re-exports them)")
+    return parser.parse_args()
+
+
+def scope_filter(args, ph='%s'):
+    # WHERE clause (and its parameters) for the existing claims in the scope; ph: placeholder of the driver
+    clauses, params = [], []
+    if args.years:
+        clauses.append(f"c.IncidentDate BETWEEN {ph} AND {ph}")
+        params += [date(args.years[0], 1, 1), date(args.years[1], 12, 31)]
+    if args.category:
+        clauses.append(f"pr.ProductCategory IN ({', '.join([ph] * len(args.category))})")
+        params += args.category
+    if args.policies:
+        clauses.append(f"c.PolicyID BETWEEN {ph} AND {ph}")
+        params += args.policies
+    return " AND ".join(clauses), params
+
+
+def scope_window(args):
+    # Incident dates of the rebuilt claims stay inside the year range (date ordinals)
+    if not args.years:
+        return None
+    return date(args.years[0], 1, 1).toordinal(), date(args.years[1], 12, 31).toordinal()
+
+
+def insert_ids(cursor, table, ids, ph='%s'):
+    for start in range(0, len(ids), BATCH_SIZE):
+        cursor.executemany(f"INSERT INTO {table} VALUES ({ph})", [(i,) for i in ids[start:start + BATCH_SIZE]])
+
+
+# ====== PAYOUT FIX-UP ======
+# Payout payments of the rebuilt claims are kept consistent with them: deleted when the claim is now
+# Denied, otherwise the claim's approved amount is split over its payouts and none is dated before
+# the claim. New values go into a temporary table first, then one UPDATE and one DELETE apply them.
+def fix_payouts(cursor, claims, sql=DIALECTS['mysql']):
     cursor.execute("""
-        INSERT INTO Claims 
-        (ClaimID, PolicyID, ClaimDate, IncidentDate, IncidentDescription,
-         ClaimAmountRequested, ClaimAmountApproved, ClaimStatus, FraudFlag)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """, (
-        claims_inserted + 1,
-        policy_id,
-        claim_date,
-        incident_date,
-        fake.paragraph(nb_sentences=2),
-        requested,
-        approved,
-        status,
-        fraud_flag
-    ))
-    
-    claims_inserted += 1
-    if claims_inserted % 2000 == 0:
-        print(f"   {claims_inserted:,} / {target_claims:,} claims inserted...")
-
-# ====== FINALIZE ======
-cnx.commit()
-print(f"\nDone! {claims_inserted:,} claims inserted successfully.")
-print("You can now query your loss ratio table - it should be realistic and under 100% in all years.")
-
-cnx.close()
+        SELECT p.PaymentID, p.ClaimID, p.PaymentDate
+        FROM Payments p
+        JOIN claim_scope s ON s.ClaimID = p.ClaimID
+        WHERE p.PaymentType = 'Payout'
+    """)
+    payouts = cursor.fetchall()
+    per_claim = Counter(claim_id for _, claim_id, _ in payouts)
+
+    fixes = []
+    for payment_id, claim_id, payment_date in payouts:
+        claim_date, approved, status = claims[claim_id]
+        if status == 'Denied':
+            fixes.append((payment_id, None, None, 0))
+        else:
+            fixes.append((payment_id, round(approved / per_claim[claim_id], 2), max(payment_date, claim_date), 1))
+
+    ph = sql['placeholder']
+    cursor.execute(sql['drop_temp'].format('payout_fix'))
+    cursor.execute("CREATE TEMPORARY TABLE payout_fix (PaymentID INT PRIMARY KEY, Amount DECIMAL(15,2), PaymentDate DATE, Keep BOOLEAN)")
+    for start in range(0, len(fixes), BATCH_SIZE):
+        cursor.executemany(f"INSERT INTO payout_fix VALUES ({ph}, {ph}, {ph}, {ph})", fixes[start:start + BATCH_SIZE])
+    cursor.execute(sql['update_payouts'])
+    updated = cursor.rowcount
+    cursor.execute(sql['delete_payouts'])
+    return updated, cursor.rowcount
+
+
+# ====== MAIN LOGIC ======
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    vocab = VocabPools(seed=args.seed)  # Claim descriptions, drawn from a cached Faker pool
+    scoped = bool(args.years or args.category or args.policies)
+    started = time.perf_counter()
+
+    sql = DIALECTS[args.sink]
+    ph = sql['placeholder']
+    print("Connecting to database...")
+    if args.sink == 'sqlite':
+        cnx = connect_sqlite(args.out)
+    else:
+        import mysql.connector
+        cnx = mysql.connector.connect(**DB_CONFIG)
+    cursor = cnx.cursor()
+
+    # ====== FETCH VALID POLICIES ======
+    # Kept as NumPy arrays (id, start, end, category) instead of a list of tuples - see policy_index.py
+    print("Fetching valid policies...")
+    policy_index = PolicyIndex.from_db(cnx, today, placeholder=ph).restrict(args.policies, args.category, scope_window(args))
+
+    if len(policy_index) == 0:
+        print("ERROR: No policies found in scope! Run the full script first.")
+        cnx.close()
+        return
+
+    print(f"Found {len(policy_index):,} valid policies in scope.")
+
+    # ====== CLEAR THE CLAIMS IN SCOPE ======
+    # Everything from here to the commit is one transaction: claims and their payouts change together.
+    # Foreign key checks are off for this session only - the rebuilt claims keep their ClaimIDs, so the
+    # Payments rows pointing at them stay valid (with checks on, the DELETE would set them to NULL).
+    cursor.execute(sql['fk_off'])
+    try:
+        cursor.execute(sql['drop_temp'].format('claim_scope'))
+        cursor.execute("CREATE TEMPORARY TABLE claim_scope (ClaimID INT PRIMARY KEY)")
+        if scoped:
+            where, params = scope_filter(args, ph)
+            cursor.execute(f"""
+                INSERT INTO claim_scope (ClaimID)
+                SELECT c.ClaimID
+                FROM Claims c
+                JOIN Policies p ON p.PolicyID = c.PolicyID
+                JOIN Products pr ON pr.ProductID = p.ProductID
+                WHERE {where}
+            """, params)
+            cursor.execute("SELECT ClaimID FROM claim_scope ORDER BY ClaimID")
+            claim_ids = [row[0] for row in cursor.fetchall()]
+            print(f"Clearing {len(claim_ids):,} claims in scope...")
+            cursor.execute(sql['delete_claims'])
+        else:
+            claim_ids = list(range(1, args.claims + 1))
+            insert_ids(cursor, 'claim_scope', claim_ids, ph)
+            print("Clearing existing claims...")
+            cursor.execute("DELETE FROM Claims")  # Not TRUNCATE: that would commit the transaction
+            # Payouts of claims beyond the new count have nothing left to point to
+            cursor.execute(f"DELETE FROM Payments WHERE PaymentType = 'Payout' AND ClaimID > {ph}", (args.claims,))
+
+        # ====== REBUILD THE CLAIMS ======
+        # Claims follow exposure: a policy active for more days gets proportionally more claims, and every
+        # incident date falls inside its policy's window (start to min(end, today)). Drawn for all claims at once
+        policy_ids, incidents = policy_index.sample(np.random.default_rng(args.seed), len(claim_ids))
+
+        loader = BulkLoader(cnx, batch_size=BATCH_SIZE, placeholder=ph)
+        loader.register('Claims', CLAIM_COLUMNS)
+        claims = {}  # ClaimID → (claim date, approved amount, status) for the payout fix-up
+        for claim_id, policy_id, incident in zip(claim_ids, policy_ids.tolist(), incidents.tolist()):
+            row = build_claim(claim_id, policy_id, to_date(incident), vocab)
+            loader.add('Claims', row)
+            claims[claim_id] = (row[2], row[6], row[7])
+        loader.flush('Claims')
+        loader.close()
+        print(f"   {len(claims):,} claims rebuilt.")
+
+        updated, deleted = fix_payouts(cursor, claims, sql)
+        print(f"   Payouts: {updated:,} updated, {deleted:,} removed (their claim is now Denied).")
+
+        # ====== FINALIZE ======
+        cnx.commit()
+    except Exception:
+        cnx.rollback()
+        raise
+    finally:
+        cursor.execute(sql['fk_on'])
+        cnx.close()
+
+    for folder in args.exports:
+        reset = reset_tables(folder, ['Claims', 'Payments'])
+        if reset:
+            print(f"Incremental export '{folder}': {' and '.join(reset)} reset - the next --incremental run re-exports them in full.")
+
+    print(f"\nDone! {len(claims):,} claims regenerated in {time.perf_counter() - started:.1f}s.")
+    print("You can now query your loss ratio table - it should be realistic and under 100% in all years.")
 
 
+if __name__ == "__main__":
+    main()
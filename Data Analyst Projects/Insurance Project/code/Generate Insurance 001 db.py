@@ -1,10 +1,24 @@
 # ====== IMPORTS =======
+import argparse
+import os
 import random
+import sys
 from datetime import datetime, timedelta
+import numpy as np
 import string
-import mysql.connector
 from faker import Faker
 from decimal import Decimal  
+# Helpers shared by the Insurance and HR projects (sinks, loaders, sharding, ...) live in ../../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from sinks import RESUMABLE, SINKS, open_sink
+from pipeline import QUEUE_BATCHES, WRITERS, PipelinedLoader
+from checkpoint import COMMIT_ROWS, Checkpoints, commit_intervals
+from product_catalog import ProductCatalog
+from sharding import run_sharded, shard_ranges
+from id_allocator import EmailAllocator, PolicyNumberAllocator
+from vocab_pools import VocabPools, phone_number
+from samplers import WeightedSampler, sampler
+from policy_index import PolicyIndex, PolicyIndexBuilder, to_date
 
 # ====== CONSTANTS ======
 fake = Faker('en_US')
@@ -36,386 +50,554 @@ claim_severity_factors = {
 # Year weights for more policies/claims in recent years (growth)
 year_weights = [1.0, 1.15, 1.3, 1.45, 1.6, 1.75, 1.9, 2.05, 2.00]  
 
-def weighted_date(start_year=2017, end_year=2025):
-    year = random.choices(years, weights=year_weights)[0]
-    month = random.randint(1, 12)
-    day = random.randint(1, 28)  # Safe for all months
+# Weighted distributions, compiled once into alias tables (samplers.py) instead of
+# random.choices(..., weights=...) rebuilding the cumulative weights on every row
+YEAR_SAMPLER = WeightedSampler(years, year_weights)
+GENDER_SAMPLER = WeightedSampler(['Female', 'Male', 'Non-Binary'], [39.93, 46.18, 13.89])       # Adjustable   - Note: the "weights" don’t need to sum to 100—they just need to be in the right proportion.
+POLICY_STATUS_SAMPLER = WeightedSampler(['Active', 'Expired', 'Cancelled', 'Renewed'], [0.6, 0.2, 0.1, 0.1])
+
+# Row counts at scale 1 (--scale multiplies customers, policies, claims and payments)
+N_BRANCHES = 50
+N_AGENTS = 500
+N_PRODUCTS = 20
+N_CUSTOMERS = 50_000
+N_POLICIES = 120_000
+N_CLAIMS = 20_000
+N_PAYMENTS = 300_000
+
+# Bulk-load mode: rows per multi-row INSERT (one round trip per batch instead of per row)
+BATCH_SIZE = 5000
+
+# Database connection for --sink mysql - adjust credentials as needed
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '1111',
+    'database': 'insurance_project_001'
+}
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Insurance Schema.sql')
+
+# Sharded mode: IDs per shard. Keep it fixed between runs - the output depends on it, not on --workers
+SHARD_SIZE = 10_000
+
+# Generation phases for checkpoint.py: each fills one ID range of its table (Policies also the detail tables)
+PHASES = [
+    ('Branches', ['Branches']),
+    ('Agents', ['Agents']),
+    ('Products', ['Products']),
+    ('Customers', ['Customers']),
+    ('Policies', ['Policies', 'AutoPolicyDetails', 'HomePolicyDetails', 'LifePolicyDetails', 'HealthPolicyDetails']),
+    ('Claims', ['Claims']),
+    ('Payments', ['Payments']),
+]
+CHECKPOINT_SETTINGS = ['seed', 'scale', 'sharded', 'shard_size']  # Arguments a --resume run must repeat
+
+def weighted_date(start_year=2017, end_year=2025, rng=random):
+    year = YEAR_SAMPLER.draw(rng)
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)  # Safe for all months
     return datetime(year, month, day).date()
 
-# ====== MAIN LOGIC ======
-def main():
-    # Database connection - adjust credentials as needed
-    cnx = mysql.connector.connect(
-        host='localhost',
-        user='root',
-        password='1111',
-        database='insurance_project_001'
-    )
-    cursor = cnx.cursor()
-
-    used_emails = set()
-    used_policy_numbers = set()
-    agent_by_branch = [[] for _ in range(51)]  # Index 0 unused
-
-    # === Insert Branches (50 branches) ===
-    print("Inserting Branches...")
-    for i in range(1, 51):
-        cursor.execute("""
-            INSERT INTO Branches (BranchID, BranchName, Address, City, State, ZipCode, OpeningDate, EmployeeCount)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            i,
-            f"{fake.city()} Branch",
-            fake.street_address(),
-            fake.city(),
-            random.choice(US_STATES),
-            fake.zipcode(),
-            fake.date_between(start_date='-20y', end_date='-5y'),
-            random.randint(15, 80)
-        ))
-
-    # === Insert Agents (500 agents) ===
-    print("Inserting Agents...")
-    for i in range(1, 501):
-        branch_id = random.randint(1, 50)
-        agent_by_branch[branch_id].append(i)
-        hire_date = fake.date_between(start_date='-15y', end_date=today)
-        phone = f"({fake.numerify('###')}) {fake.numerify('###')}-{fake.numerify('####')}"
-        cursor.execute("""
-            INSERT INTO Agents (AgentID, FirstName, LastName, PhoneNumber, Email, AgencyName, LicenseNumber, HireDate, CommissionRate, Region, PerformanceRating, ActiveStatus, BranchID)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            i,
-            fake.first_name(),
-            fake.last_name(),
-            phone,
-            fake.unique.company_email(),
-            fake.company(),
-            ''.join(random.choices(string.digits, k=8)),
-            hire_date,
-            round(random.uniform(0.05, 0.15), 4),
-            random.choice(US_STATES),
-            random.randint(1, 5),
-            random.random() > 0.1,  # 90% active
-            branch_id
-        ))
-
-    # === Insert Products (20 products) ===
-    print("Inserting Products...")
-    for i in range(1, 21):
-        category = random.choice(PRODUCT_CATEGORIES)
-        cursor.execute("""
-            INSERT INTO Products (ProductID, ProductName, ProductCategory, Description, BasePremium, CoverageLimit, IsActive, LaunchDate)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            i,
-            f"{category} {random.choice(['Standard', 'Premium', 'Basic', 'Elite', 'Plus'])} Plan",
-            category,
-            fake.text(max_nb_chars=200),
-            round(random.uniform(300, 3000), 2),
-            round(random.uniform(50000, 1000000), 2),
-            True,
-            fake.date_between(start_date='-10y', end_date='-1y')
-        ))
-
-    # === Insert Customers (50,000 customers) ===
-    print("Inserting 50,000 Customers...")
-    for i in range(1, 50001):
-        gender = random.choices(['Female', 'Male', 'Non-Binary'], weights=[39.93, 46.18, 13.89])[0]       # Adjustable   - Note: the "weights" don’t need to sum to 100—they just need to be in the right proportion.
-        first = fake.first_name_male() if gender == 'Male' else fake.first_name_female() if gender == 'Female' else fake.first_name()
-        last = fake.last_name()
-        email = realistic_email(first, last, used_emails)
-        phone = f"({fake.numerify('###')}) {fake.numerify('###')}-{fake.numerify('####')}"
-        dob = fake.date_of_birth(minimum_age=18, maximum_age=85)
-        registration = weighted_date()
+# ====== ROW BUILDERS ======
+# Each builder creates the rows for one ID range with the given random source and Faker.
+# Classic mode passes the global `random`/`fake` streams; sharded mode passes per-shard seeded ones.
+# Names, addresses, plates and descriptions are picked from ctx['vocab'] (pre-generated Faker pools).
+def build_customers(rng, fake, first_id, last_id, ctx):
+    vocab = ctx['vocab']
+    rows = []
+    for i in range(first_id, last_id + 1):
+        gender = GENDER_SAMPLER.draw(rng)
+        first = vocab.pick('first_name_male', rng) if gender == 'Male' else vocab.pick('first_name_female', rng) if gender == 'Female' else vocab.pick('first_name', rng)
+        last = vocab.pick('last_name', rng)
+        email = email_parts(first, last, rng=rng)  # (base, domain, numbered) - the address is allocated when merging
+        phone = phone_number(rng)
+        dob = today - timedelta(days=rng.randint(18 * 365, 85 * 365))  # Age 18-85
+        registration = weighted_date(rng=rng)
 
         # Realistic income and credit score
-        income = round(random.uniform(30000, 200000), 2)
+        income = round(rng.uniform(30000, 200000), 2)
         base_from_income = int(income / 200)  # $100k income → ~500 added
-        variation = random.randint(-120, 180)
+        variation = rng.randint(-120, 180)
         credit_score = 300 + base_from_income + variation
         credit_score = max(300, min(850, credit_score))
 
         # High earners rarely bad credit; low earners rarely perfect
         if income > 150000:
-            credit_score = max(credit_score, random.randint(680, 850))
+            credit_score = max(credit_score, rng.randint(680, 850))
         elif income < 50000:
-            credit_score = min(credit_score, random.randint(300, 740))
+            credit_score = min(credit_score, rng.randint(300, 740))
 
-        cursor.execute("""
-            INSERT INTO Customers 
-            (CustomerID, FirstName, LastName, DateOfBirth, Gender, AddressLine1, City, State, ZipCode, Country, PhoneNumber, Email, AnnualIncome, MaritalStatus, NumberOfDependents, CreditScore, ChurnProbability, RegistrationDate)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
+        rows.append((
             i, first, last, dob, gender,
-            fake.street_address(), fake.city(), random.choice(US_STATES), fake.zipcode(), 'USA',
+            vocab.pick('street_address', rng), vocab.pick('city', rng), rng.choice(US_STATES), vocab.pick('zipcode', rng), 'USA',
             phone, email,
             income,
-            random.choice(['Single', 'Married', 'Divorced', 'Widowed']),
-            random.randint(0, 5),
+            rng.choice(['Single', 'Married', 'Divorced', 'Widowed']),
+            rng.randint(0, 5),
             credit_score,
-            round(random.uniform(0.0, 0.4), 4),
+            round(rng.uniform(0.0, 0.4), 4),
             registration
         ))
+    return {'Customers': rows}
+
+
+def build_policies(rng, fake, first_id, last_id, ctx):
+    agent_by_branch = ctx['agent_by_branch']
+    catalog = ctx['catalog']
+    vocab = ctx['vocab']
+    out = {table: [] for table in ['Policies', 'AutoPolicyDetails', 'HomePolicyDetails', 'LifePolicyDetails', 'HealthPolicyDetails']}
+    for i in range(first_id, last_id + 1):
+        customer_id = rng.randint(1, ctx['n_customers'])
+        product_id = rng.randint(1, N_PRODUCTS)
+        branch_id = rng.randint(1, N_BRANCHES)
 
-    # === Insert Policies (120,000 policies) ===
-    print("Inserting 120,000 Policies...")
-    for i in range(1, 120001):
-        customer_id = random.randint(1, 50000)
-        product_id = random.randint(1, 20)
-        branch_id = random.randint(1, 50)
-        
         # Prefer agents from the same branch for realism (80% chance)
-        if random.random() < 0.8 and agent_by_branch[branch_id]:
-            agent_id = random.choice(agent_by_branch[branch_id])
+        if rng.random() < 0.8 and agent_by_branch[branch_id]:
+            agent_id = rng.choice(agent_by_branch[branch_id])
         else:
-            agent_id = random.randint(1, 500)
+            agent_id = rng.randint(1, N_AGENTS)
 
-        # Fetch product category and base premium safely
-        cursor.execute("SELECT ProductCategory, BasePremium FROM Products WHERE ProductID = %s", (product_id,))
-        result = cursor.fetchone()
-        if not result:
+        # Product category and base premium from the in-memory catalog (no DB round trip)
+        product = catalog.get(product_id)
+        if product is None:
             continue  # Skip if product not found (shouldn't happen)
-        category, base_premium_decimal = result
-
-        # Convert Decimal to float for calculation
-        base_premium = float(base_premium_decimal)
+        category = product.category
+        base_premium = product.base_premium
 
-        start_date = weighted_date()
-        end_date = start_date + timedelta(days=365) if category in ['Auto', 'Home', 'Health'] else start_date + timedelta(days=365*random.choice([10, 20, 30]))
+        start_date = weighted_date(rng=rng)
+        end_date = start_date + timedelta(days=365) if category in ['Auto', 'Home', 'Health'] else start_date + timedelta(days=365*rng.choice([10, 20, 30]))
 
         year = start_date.year
         inflation_factor = 1 + (year - premium_inflation_base_year) * 0.03
-        premium = base_premium * random.uniform(0.7, 1.8) * inflation_factor
-        coverage = premium * random.uniform(50, 300)
-        deductible = round(random.choice([250, 500, 1000, 2000, 5000]), 2)
+        premium = base_premium * rng.uniform(0.7, 1.8) * inflation_factor
+        coverage = premium * rng.uniform(50, 300)
+        deductible = round(rng.choice([250, 500, 1000, 2000, 5000]), 2)
 
-        policy_number = realistic_policy_number(used_policy_numbers)
+        policy_number = realistic_policy_number(i, ctx['policy_numbers'])
 
-        status_choices = ['Active', 'Expired', 'Cancelled', 'Renewed']
-        weights = [0.6, 0.2, 0.1, 0.1]
-        status = random.choices(status_choices, weights=weights)[0]
+        status = POLICY_STATUS_SAMPLER.draw(rng)
 
-        cursor.execute("""
-            INSERT INTO Policies 
-            (PolicyID, CustomerID, AgentID, BranchID, ProductID, PolicyNumber, StartDate, EndDate, PremiumAmount, CoverageAmount, Deductible, PolicyStatus, RiskScore, CreatedDate)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
+        out['Policies'].append((
             i, customer_id, agent_id, branch_id, product_id, policy_number,
             start_date, end_date, round(premium, 2), round(coverage, 2), deductible,
-            status, round(random.uniform(10, 90), 2), datetime.now()
+            status, round(rng.uniform(10, 90), 2), ctx['created_at']
         ))
 
-        # === Insert Product-Specific Details ===
+        # === Product-Specific Details ===
         if category == 'Auto':
-            cursor.execute("""
-                INSERT INTO AutoPolicyDetails (PolicyID, VehicleMake, VehicleModel, VehicleYear, VIN, LicensePlate, Mileage, UsageType)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
+            out['AutoPolicyDetails'].append((
                 i,
-                random.choice(VEHICLE_MAKES),
-                fake.word().capitalize(),
-                random.randint(2010, 2025),
-                ''.join(random.choices(string.ascii_uppercase + string.digits, k=17)),
-                fake.license_plate(),
-                random.randint(5000, 150000),
-                random.choice(['Personal', 'Commercial'])
+                rng.choice(VEHICLE_MAKES),
+                vocab.pick('vehicle_model', rng),
+                rng.randint(2010, 2025),
+                ''.join(rng.choices(string.ascii_uppercase + string.digits, k=17)),
+                vocab.pick('license_plate', rng),
+                rng.randint(5000, 150000),
+                rng.choice(['Personal', 'Commercial'])
             ))
         elif category == 'Home':
-            cursor.execute("""
-                INSERT INTO HomePolicyDetails (PolicyID, PropertyAddress, PropertyType, PropertyValue, SquareFootage, YearBuilt, ConstructionType, SecuritySystem, FloodZone)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
+            out['HomePolicyDetails'].append((
                 i,
-                fake.street_address() + ", " + fake.city(),
-                random.choice(PROPERTY_TYPES),
-                round(random.uniform(150000, 800000), 2),
-                random.randint(800, 5000),
-                random.randint(1950, 2025),
-                random.choice(['Wood', 'Brick', 'Concrete', 'Steel']),
-                random.choice([True, False]),
-                random.choice([True, False])
+                vocab.pick('street_address', rng) + ", " + vocab.pick('city', rng),
+                rng.choice(PROPERTY_TYPES),
+                round(rng.uniform(150000, 800000), 2),
+                rng.randint(800, 5000),
+                rng.randint(1950, 2025),
+                rng.choice(['Wood', 'Brick', 'Concrete', 'Steel']),
+                rng.choice([True, False]),
+                rng.choice([True, False])
             ))
         elif category == 'Life':
-            cursor.execute("""
-                INSERT INTO LifePolicyDetails (PolicyID, BeneficiaryFirstName, BeneficiaryLastName, BeneficiaryRelationship, TermLength, SmokerStatus, HealthRating)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (
+            out['LifePolicyDetails'].append((
                 i,
-                fake.first_name(),
-                fake.last_name(),
-                random.choice(['Spouse', 'Child', 'Parent', 'Sibling']),
-                random.choice([10, 20, 30]),
-                random.choice([True, False]),
-                random.choice(['Excellent', 'Good', 'Fair', 'Poor'])
+                vocab.pick('first_name', rng),
+                vocab.pick('last_name', rng),
+                rng.choice(['Spouse', 'Child', 'Parent', 'Sibling']),
+                rng.choice([10, 20, 30]),
+                rng.choice([True, False]),
+                rng.choice(['Excellent', 'Good', 'Fair', 'Poor'])
             ))
         elif category == 'Health':
-            cursor.execute("""
-                INSERT INTO HealthPolicyDetails (PolicyID, CoverageType, NetworkType, CopayAmount, OutOfPocketMax, PrescriptionCoverage)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
+            out['HealthPolicyDetails'].append((
                 i,
-                random.choice(['Individual', 'Family']),
-                random.choice(['HMO', 'PPO', 'EPO']),
-                round(random.uniform(20, 100), 2),
-                round(random.uniform(3000, 12000), 2),
-                random.choice([True, False])
+                rng.choice(['Individual', 'Family']),
+                rng.choice(['HMO', 'PPO', 'EPO']),
+                round(rng.uniform(20, 100), 2),
+                round(rng.uniform(3000, 12000), 2),
+                rng.choice([True, False])
             ))
+    return out
 
 
+def build_claims(rng, fake, first_id, last_id, ctx):
+    vocab = ctx['vocab']
+    # Policy and incident date for the whole range at once, weighted by exposure days (policy_index.py),
+    # from a NumPy generator seeded by this range's rng
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+    policy_ids, incidents = ctx['policy_index'].sample(np_rng, last_id - first_id + 1)
+    rows = []
+    for claim_id, policy_id, incident in zip(range(first_id, last_id + 1), policy_ids.tolist(), incidents.tolist()):
+        # Incident date inside the policy's active window (start to min(end, today))
+        incident_date = to_date(incident)
 
-    # === Insert Claims (20,000 claims) ===
-    print("Inserting 20,000 Claims...")
-    claims_inserted = 0
-    
-    # Pre-fetch valid policies
-    cursor.execute("""
-        SELECT PolicyID, StartDate, YEAR(StartDate) as PolicyYear 
-        FROM Policies 
-        WHERE StartDate <= %s
-    """, (today,))
-    valid_policies = cursor.fetchall()
-    
-    if not valid_policies:
-        print("No valid policies for claims!")
-        return
-    
-    while claims_inserted < 20000:
-        policy_id, policy_start_date, _ = random.choice(valid_policies)
-        
-        # Incident date between policy start and today
-        try:
-            incident_date = fake.date_between(start_date=policy_start_date, end_date=today)
-        except ValueError:
-            incident_date = policy_start_date
-        
         incident_year = incident_date.year
-        claim_date = min(incident_date + timedelta(days=random.randint(0, 60)), today)
-        
+        claim_date = min(incident_date + timedelta(days=rng.randint(0, 60)), today)
+
         # Get severity factor (higher = tougher year)
         severity = claim_severity_factors.get(incident_year, 0.90)
-        
+
         # Lower requested amounts for realism (most claims are small/medium)
-        requested = round(random.uniform(1500, 60000), 2)
-        
-        # Base approval rate ~65%, scaled slightly by severity
-        base_approval_prob = 0.65
-        approval_prob = base_approval_prob * severity
-        approval_prob = min(0.75, approval_prob)  # Cap at 75%
-        
-        if random.random() < (1 - approval_prob):  # Denied
+        requested = round(rng.uniform(1500, 60000), 2)
+
+        # Denied / Approved / Settled in one draw (one compiled sampler per severity factor)
+        status = claim_status_sampler(severity).draw(rng)
+        if status == 'Denied':
             approved = 0.0
-            status = 'Denied'
         else:
-            base_ratio = random.uniform(0.40, 0.65)
+            base_ratio = rng.uniform(0.40, 0.65)
             final_ratio = base_ratio * severity
             final_ratio = min(0.75, final_ratio)  # Never pay more than 75% of requested
-            
+
             approved = requested * final_ratio
             approved = round(approved, 2)
-            
-            status = 'Approved'
-            if random.random() < 0.75:
-                status = 'Settled'
-        
-        fraud_flag = random.random() < 0.015
-        
-        cursor.execute("""
-            INSERT INTO Claims 
-            (ClaimID, PolicyID, ClaimDate, IncidentDate, IncidentDescription, 
-             ClaimAmountRequested, ClaimAmountApproved, ClaimStatus, FraudFlag)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            claims_inserted + 1,
+
+        fraud_flag = rng.random() < 0.015
+
+        rows.append((
+            claim_id,
             policy_id,
             claim_date,
             incident_date,
-            fake.paragraph(nb_sentences=2),
+            vocab.pick('claim_description', rng),
             requested,
             approved,
             status,
             fraud_flag
         ))
-        
-        claims_inserted += 1
-        if claims_inserted % 5000 == 0:
-            print(f"   {claims_inserted:,} claims inserted...")
+    return {'Claims': rows}
 
 
-    # === Insert Payments (300,000 payments) ===
-    print("Inserting 300,000 Payments...")
-    for i in range(1, 300001):
-        if random.random() < 0.8:  # 80% premium payments
-            policy_id = random.randint(1, 120000)
+def claim_status_sampler(severity):
+    # Base approval rate ~65%, scaled slightly by severity and capped at 75%; 75% of approved claims are settled
+    approval_prob = min(0.75, 0.65 * severity)
+    return sampler(['Denied', 'Approved', 'Settled'], [1 - approval_prob, approval_prob * 0.25, approval_prob * 0.75])
+
+
+def build_payments(rng, fake, first_id, last_id, ctx):
+    rows = []
+    for i in range(first_id, last_id + 1):
+        if rng.random() < 0.8:  # 80% premium payments
+            policy_id = rng.randint(1, ctx['n_policies'])
             claim_id = None
             payment_type = 'Premium'
-            amount = round(random.uniform(100, 5000), 2)
+            amount = round(rng.uniform(100, 5000), 2)
         else:
             # Simple approach: pick random settled claim
-            claim_id = random.randint(1, 20000)
+            claim_id = rng.randint(1, ctx['n_claims'])
             policy_id = None
             payment_type = 'Payout'
-            amount = round(random.uniform(500, 50000), 2)
+            amount = round(rng.uniform(500, 50000), 2)
 
-        payment_date = fake.date_between(start_date='-7y', end_date='today')
+        payment_date = today - timedelta(days=rng.randint(0, 7 * 365))  # Last 7 years, up to the fixed `today`
 
-        cursor.execute("""
-            INSERT INTO Payments (PaymentID, PolicyID, ClaimID, PaymentType, PaymentDate, Amount, PaymentMethod, Status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
+        rows.append((
             i, policy_id, claim_id, payment_type, payment_date, amount,
-            random.choice(['Credit Card', 'Bank Transfer', 'Check', 'Auto-Debit']),
+            rng.choice(['Credit Card', 'Bank Transfer', 'Check', 'Auto-Debit']),
             'Successful'
         ))
+    return {'Payments': rows}
+
 
-    cnx.commit()
+# ====== MAIN LOGIC ======
+def parse_args():
+    parser = argparse.ArgumentParser(description="Populate the insurance database with realistic data")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplier for customers, policies, claims and payments")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sharded', action='store_true', help="Generate ID ranges in parallel worker processes (per-shard seeds)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes in sharded mode (does not change the output)")
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    parser.add_argument('--sink', choices=SINKS, default='mysql', help="Where the rows go: the MySQL database (mysql-load: staged TSV files + LOAD DATA, keys rebuilt at the end), a SQLite file, or CSV/Parquet files (sinks.py)")
+    parser.add_argument('--out', help="SQLite file or output folder (default: insurance_project_001.sqlite / insurance_dataset_<format>)")
+    parser.add_argument('--pipeline', action='store_true', help="Write batches from writer threads while the rows are generated (pipeline.py)")
+    parser.add_argument('--writers', type=int, help=f"Writer threads with --pipeline (default {WRITERS} for --sink mysql, 1 for the others)")
+    parser.add_argument('--queue-batches', type=int, default=QUEUE_BATCHES, help="Batches the pipeline holds before the generator waits")
+    parser.add_argument('--commit-every', action='append', metavar='[TABLE=]ROWS', help=f"Commit and checkpoint every ROWS rows (default {COMMIT_ROWS:,}); TABLE=ROWS sets one table, e.g. Payments=100000")
+    parser.add_argument('--resume', action='store_true', help="Continue an interrupted run from its last checkpoint (same --seed, --scale, --sharded and --shard-size)")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: <SQLite file or MySQL database>.checkpoint)")
+    args = parser.parse_args()
+    if args.resume and args.sink not in RESUMABLE:
+        parser.error(f"--resume needs --sink {' or '.join(RESUMABLE)}")
+    return args
+
+
+def output_path(args):
+    return args.out or ('insurance_project_001.sqlite' if args.sink == 'sqlite' else f'insurance_dataset_{args.sink}')
+
+
+def checkpoint_path(args):
+    # Next to the SQLite file, or named after the MySQL database. The other sinks keep no checkpoint
+    if args.sink not in RESUMABLE:
+        return None
+    return args.checkpoint or f"{output_path(args) if args.sink == 'sqlite' else DB_CONFIG['database']}.checkpoint"
+
+
+def open_output(args):
+    out = output_path(args)
+    dtypes = None
+    if args.sink == 'parquet':
+        from export_to_csv import PARQUET_DTYPES  # Same column types as an exported database
+        dtypes = PARQUET_DTYPES
+    if not args.sink.startswith('mysql'):
+        print(f"Writing to {args.sink}: {out}")
+    sink = open_sink(args.sink, SCHEMA_PATH, mysql_config=DB_CONFIG, out=out, batch_size=BATCH_SIZE, dtypes=dtypes, resume=args.resume)
+    if args.pipeline:
+        sink = PipelinedLoader(sink, args.writers or (WRITERS if args.sink == 'mysql' else 1), args.queue_batches)
+    return sink
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    Faker.seed(args.seed)
+    n_customers = int(N_CUSTOMERS * args.scale)
+    n_policies = int(N_POLICIES * args.scale)
+    n_claims = int(N_CLAIMS * args.scale)
+    n_payments = int(N_PAYMENTS * args.scale)
+
+    # MySQL (default), SQLite, CSV or Parquet - every table goes through the same loader interface
+    loader = open_output(args)
+    loader.register('Branches', ['BranchID', 'BranchName', 'Address', 'City', 'State', 'ZipCode', 'OpeningDate', 'EmployeeCount'])
+    loader.register('Agents', ['AgentID', 'FirstName', 'LastName', 'PhoneNumber', 'Email', 'AgencyName', 'LicenseNumber', 'HireDate', 'CommissionRate', 'Region', 'PerformanceRating', 'ActiveStatus', 'BranchID'])
+    loader.register('Products', ['ProductID', 'ProductName', 'ProductCategory', 'Description', 'BasePremium', 'CoverageLimit', 'IsActive', 'LaunchDate'])
+    loader.register('Customers', ['CustomerID', 'FirstName', 'LastName', 'DateOfBirth', 'Gender', 'AddressLine1', 'City', 'State', 'ZipCode', 'Country', 'PhoneNumber', 'Email', 'AnnualIncome', 'MaritalStatus', 'NumberOfDependents', 'CreditScore', 'ChurnProbability', 'RegistrationDate'])
+    loader.register('Policies', ['PolicyID', 'CustomerID', 'AgentID', 'BranchID', 'ProductID', 'PolicyNumber', 'StartDate', 'EndDate', 'PremiumAmount', 'CoverageAmount', 'Deductible', 'PolicyStatus', 'RiskScore', 'CreatedDate'])
+    # Detail rows reference Policies, so pending policies are always flushed first
+    loader.register('AutoPolicyDetails', ['PolicyID', 'VehicleMake', 'VehicleModel', 'VehicleYear', 'VIN', 'LicensePlate', 'Mileage', 'UsageType'], parents=['Policies'])
+    loader.register('HomePolicyDetails', ['PolicyID', 'PropertyAddress', 'PropertyType', 'PropertyValue', 'SquareFootage', 'YearBuilt', 'ConstructionType', 'SecuritySystem', 'FloodZone'], parents=['Policies'])
+    loader.register('LifePolicyDetails', ['PolicyID', 'BeneficiaryFirstName', 'BeneficiaryLastName', 'BeneficiaryRelationship', 'TermLength', 'SmokerStatus', 'HealthRating'], parents=['Policies'])
+    loader.register('HealthPolicyDetails', ['PolicyID', 'CoverageType', 'NetworkType', 'CopayAmount', 'OutOfPocketMax', 'PrescriptionCoverage'], parents=['Policies'])
+    loader.register('Claims', ['ClaimID', 'PolicyID', 'ClaimDate', 'IncidentDate', 'IncidentDescription', 'ClaimAmountRequested', 'ClaimAmountApproved', 'ClaimStatus', 'FraudFlag'])
+    loader.register('Payments', ['PaymentID', 'PolicyID', 'ClaimID', 'PaymentType', 'PaymentDate', 'Amount', 'PaymentMethod', 'Status'])
+
+    emails = EmailAllocator(seed=args.seed)  # Unique emails without a set of every address issued
+    vocab = VocabPools(seed=args.seed)  # Faker pools, built once and cached in .vocab_cache/
+    catalog = ProductCatalog()  # ProductID → category, base premium, coverage limit
+    agent_by_branch = [[] for _ in range(N_BRANCHES + 1)]  # Index 0 unused
+    created_at = datetime.now().replace(microsecond=0)  # CreatedDate of every policy
+
+    # Commits every --commit-every rows, each followed by a checkpoint (checkpoint.py) holding what
+    # the next rows depend on, so --resume continues an interrupted run with the same rows
+    def state():
+        return {'random': random.getstate(), 'faker': fake.random.getstate(), 'emails': emails,
+                'catalog': catalog, 'agent_by_branch': agent_by_branch, 'created_at': created_at}
+
+    checkpoints = Checkpoints(loader, checkpoint_path(args), {name: getattr(args, name) for name in CHECKPOINT_SETTINGS},
+                              commit_intervals(args.commit_every), state, PHASES)
+    if args.resume:
+        saved = checkpoints.resume()
+        random.setstate(saved['random'])
+        fake.random.setstate(saved['faker'])
+        emails, catalog, agent_by_branch, created_at = saved['emails'], saved['catalog'], saved['agent_by_branch'], saved['created_at']
+    else:
+        checkpoints.save('Branches', 0)  # A run interrupted before its first commit resumes from the start
+
+    def generate(builder, table, first_id, last_id, ctx, shard_size=args.shard_size):
+        resume_after = checkpoints.resume_after(table)  # IDs an interrupted run already committed
+        if args.sharded:
+            return run_sharded(builder, table, first_id, last_id, ctx, base_seed=args.seed,
+                               shard_size=shard_size, workers=args.workers, locale='en_US', resume_after=resume_after)
+        # Classic mode: one global random/Faker stream, chunked only to bound memory
+        return (builder(random, fake, start, end, ctx) for _, start, end in shard_ranges(first_id, last_id, shard_size) if end > resume_after)
+
+    # === Insert Branches (50 branches) ===
+    if not checkpoints.done('Branches'):
+        print("Inserting Branches...")
+        for i in range(1, N_BRANCHES + 1):
+            loader.add('Branches', (
+                i,
+                f"{fake.city()} Branch",
+                fake.street_address(),
+                fake.city(),
+                random.choice(US_STATES),
+                fake.zipcode(),
+                fake.date_between(start_date=today - timedelta(days=20 * 365), end_date=today - timedelta(days=5 * 365)),
+                random.randint(15, 80)
+            ))
+        loader.finish('Branches')
+        checkpoints.finished('Branches')
+
+    # === Insert Agents (500 agents) ===
+    if not checkpoints.done('Agents'):
+        print("Inserting Agents...")
+        for i in range(1, N_AGENTS + 1):
+            branch_id = random.randint(1, N_BRANCHES)
+            agent_by_branch[branch_id].append(i)
+            hire_date = fake.date_between(start_date=today - timedelta(days=15 * 365), end_date=today)
+            phone = f"({fake.numerify('###')}) {fake.numerify('###')}-{fake.numerify('####')}"
+            loader.add('Agents', (
+                i,
+                fake.first_name(),
+                fake.last_name(),
+                phone,
+                fake.unique.company_email(),
+                fake.company(),
+                ''.join(random.choices(string.digits, k=8)),
+                hire_date,
+                round(random.uniform(0.05, 0.15), 4),
+                random.choice(US_STATES),
+                random.randint(1, 5),
+                random.random() > 0.1,  # 90% active
+                branch_id
+            ))
+        loader.finish('Agents')
+        checkpoints.finished('Agents')
+
+    # === Insert Products (20 products) ===
+    if not checkpoints.done('Products'):
+        print("Inserting Products...")
+        for i in range(1, N_PRODUCTS + 1):
+            category = random.choice(PRODUCT_CATEGORIES)
+            product_name = f"{category} {random.choice(['Standard', 'Premium', 'Basic', 'Elite', 'Plus'])} Plan"
+            description = fake.text(max_nb_chars=200)
+            product = catalog.add(i, category, round(random.uniform(300, 3000), 2), round(random.uniform(50000, 1000000), 2))
+            loader.add('Products', (
+                i,
+                product_name,
+                category,
+                description,
+                product.base_premium,
+                product.coverage_limit,
+                True,
+                fake.date_between(start_date=today - timedelta(days=10 * 365), end_date=today - timedelta(days=365))
+            ))
+        loader.finish('Products')
+        checkpoints.finished('Products')
+
+    # === Insert Customers (50,000 customers) ===
+    if not checkpoints.done('Customers'):
+        print(f"Inserting {n_customers:,} Customers...")
+        # Emails are allocated here, in shard order, so they're unique across shards and the same for any --workers
+        for shard in generate(build_customers, 'Customers', 1, n_customers, {'vocab': vocab}):
+            rows = shard['Customers']
+            for row in rows:
+                loader.add('Customers', row[:11] + (emails.allocate(*row[11]),) + row[12:])
+            checkpoints.advance('Customers', rows[-1][0], len(rows))
+        loader.finish('Customers')
+        checkpoints.finished('Customers')
+    emails = None  # Not needed after the customers (and no longer saved with every checkpoint)
+
+    # === Insert Policies (120,000 policies) ===
+    ctx = {
+        'agent_by_branch': agent_by_branch,
+        'catalog': catalog,
+        'n_customers': n_customers,
+        'created_at': created_at,
+        'policy_numbers': PolicyNumberAllocator(seed=args.seed),  # PolicyID → number, no shared state
+        'vocab': vocab,
+    }
+    index_builder = PolicyIndexBuilder()  # Policies for the claims phase, kept as they are generated
+    if not checkpoints.done('Policies'):
+        print(f"Inserting {n_policies:,} Policies...")
+        for shard in generate(build_policies, 'Policies', 1, n_policies, ctx):
+            policies = shard.pop('Policies')
+            for row in policies:
+                loader.add('Policies', row)
+                index_builder.add(row[0], row[6], row[7], catalog.get(row[4]).category)
+            for detail_table, detail_rows in shard.items():
+                for row in detail_rows:
+                    loader.add(detail_table, row)
+            checkpoints.advance('Policies', policies[-1][0], len(policies) + sum(len(rows) for rows in shard.values()))
+        loader.finish('Policies')
+        for detail_table in ['AutoPolicyDetails', 'HomePolicyDetails', 'LifePolicyDetails', 'HealthPolicyDetails']:
+            loader.finish(detail_table)
+        checkpoints.finished('Policies')
+
+
+
+    # === Insert Claims (20,000 claims) ===
+    if not checkpoints.done('Claims'):
+        print(f"Inserting {n_claims:,} Claims...")
+
+        # Policies already started, as NumPy arrays (id, start, end, category) - built from the generated rows,
+        # so nothing is read back from the database. A resumed run that didn't generate all the policies reads them back
+        if checkpoints.done('Policies') or checkpoints.resume_after('Policies'):
+            database = getattr(loader, 'sink', loader)  # Under --pipeline, the sink's own connection
+            policy_index = PolicyIndex.from_db(database.cnx, today, placeholder=database.placeholder)
+        else:
+            policy_index = index_builder.build(today)
+        del index_builder
+
+        if len(policy_index) == 0:
+            print("No valid policies for claims!")
+            loader.close()
+            return
+
+        # Claims are generated in this process (one shard) - the policy index is too big to ship to workers
+        ctx = {'policy_index': policy_index, 'vocab': vocab}
+        claims_inserted = checkpoints.resume_after('Claims')
+        if args.sharded:
+            shards = run_sharded(build_claims, 'Claims', 1, n_claims, ctx, base_seed=args.seed,
+                                 shard_size=max(n_claims, 1), workers=1, locale='en_US', resume_after=claims_inserted)
+        else:
+            shards = generate(build_claims, 'Claims', 1, n_claims, ctx, shard_size=5000)
+        for shard in shards:
+            rows = shard['Claims']
+            for row in rows:
+                loader.add('Claims', row)
+                claims_inserted += 1
+                if claims_inserted % 5000 == 0:
+                    print(f"   {claims_inserted:,} claims inserted...")
+            checkpoints.advance('Claims', rows[-1][0], len(rows))
+        loader.finish('Claims')
+        checkpoints.finished('Claims')
+
+
+    # === Insert Payments (300,000 payments) ===
+    print(f"Inserting {n_payments:,} Payments...")
+    ctx = {'n_policies': n_policies, 'n_claims': n_claims}
+    for shard in generate(build_payments, 'Payments', 1, n_payments, ctx):
+        rows = shard['Payments']
+        for row in rows:
+            loader.add('Payments', row)
+        checkpoints.advance('Payments', rows[-1][0], len(rows))
+    loader.finish('Payments')
+
+    loader.close()
+    checkpoints.remove()
     print("Insurance database successfully populated with realistic data!")
-    cnx.close()
 
 
 #                               ==================================== BACKEND ====================================
 
 # ====== Generate Realistic Emails ======
-def realistic_email(first, last, used_set):
+# Only picks the style and domain. The EmailAllocator turns (base, domain) into an address and adds a
+# number when that base@domain is already taken - O(1), no retry loop over a set of used emails.
+def email_parts(first, last, rng=random):
     first = first.lower()
     last = last.lower()
     domains = ["gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "aol.com", "protonmail.com", "icloud.com"]
     formats = [
-        f"{first}.{last}",
-        f"{first}{last}",
-        f"{first}_{last}",
-        f"{first[0]}{last}",
-        f"{first}{last}{random.randint(10,99)}",
-        f"{first}.{last}{random.randint(1,999)}"
+        (f"{first}.{last}", False),
+        (f"{first}{last}", False),
+        (f"{first}_{last}", False),
+        (f"{first[0]}{last}", False),
+        (f"{first}{last}", True),   # e.g. johnsmith57
+        (f"{first}.{last}", True)   # e.g. john.smith12
     ]
-    random.shuffle(formats)
-    domain = random.choice(domains)
+    base, numbered = rng.choice(formats)
+    domain = rng.choice(domains)
+    return base, domain, numbered
 
-    for base in formats:
-        email = f"{base}@{domain}"
-        if email not in used_set:
-            used_set.add(email)
-            return email
 
-    counter = 1
-    while True:
-        email = f"{first}.{last}{counter}@{domain}"
-        if email not in used_set:
-            used_set.add(email)
-            return email
-        counter += 1
+def realistic_email(first, last, allocator, rng=random):
+    return allocator.allocate(*email_parts(first, last, rng=rng))
 
 
 # ====== Generate Realistic Policy Numbers ======
-def realistic_policy_number(used_set):
-    while True:
-        prefix = random.choice(['POL', 'INS', 'COV', 'PRM'])
-        number = random.randint(1000000, 9999999)
-        policy_num = f"{prefix}-{number}"
-        if policy_num not in used_set:
-            used_set.add(policy_num)
-            return policy_num
+# Keyed shuffle of the 36M PREFIX-NNNNNNN space: PolicyID n always maps to its own number
+def realistic_policy_number(policy_id, allocator):
+    return allocator.number(policy_id)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
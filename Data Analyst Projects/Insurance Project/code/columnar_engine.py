@@ -0,0 +1,349 @@
+# ====== IMPORTS ======
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Helpers shared by the Insurance and HR projects (sinks, loaders, sharding, ...) live in ../../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from id_allocator import PolicyNumberAllocator
+from policy_index import PolicyIndex
+from samplers import sampler
+from vocab_pools import VocabPools
+
+# ====== CONSTANTS ======
+# Same distributions as "Generate Insurance 001 db.py" - keep the two in sync
+PRODUCT_CATEGORIES = ['Auto', 'Home', 'Life', 'Health']
+US_STATES = ['CA', 'TX', 'FL', 'NY', 'PA', 'IL', 'OH', 'GA', 'NC', 'MI']
+
+today = np.datetime64('2025-12-20', 'D')
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()  # datetime64[D] day 0 as a date ordinal (policy_index.py)
+
+years = list(range(2017, 2026))
+premium_inflation_base_year = 2017
+claim_severity_factors = {
+    2017: 0.95,
+    2018: 0.90,
+    2019: 0.95,
+    2020: 1.10,
+    2021: 1.05,
+    2022: 1.00,
+    2023: 0.85,
+    2024: 0.78,
+    2025: 0.66
+}
+year_weights = [1.0, 1.15, 1.3, 1.45, 1.6, 1.75, 1.9, 2.05, 2.00]
+
+# Row counts of the original generator; every table scales with the number of policies
+BASE_COUNTS = {
+    'branches': 50,
+    'agents': 500,
+    'products': 20,
+    'customers': 50_000,
+    'policies': 120_000,
+    'claims': 20_000,
+    'payments': 300_000,
+}
+
+
+# ====== HELPERS ======
+def scaled_counts(n_policies):
+    factor = n_policies / BASE_COUNTS['policies']
+    counts = {table: max(1, int(round(n * factor))) for table, n in BASE_COUNTS.items()}
+    # Dimension tables stay at their original size
+    for table in ('branches', 'agents', 'products'):
+        counts[table] = BASE_COUNTS[table]
+    return counts
+
+
+def choice_codes(rng, n_values, size, weights=None):
+    # Index draw over n_values options (weights need not sum to 1). Weighted draws go through an
+    # alias table compiled once per distribution, instead of rng.choice(p=...) rebuilding it per call
+    if weights is None:
+        return rng.integers(0, n_values, size)
+    return sampler(range(n_values), weights).codes(rng, size)
+
+
+def choice(rng, values, size, weights=None):
+    # Numeric draw that returns the values themselves
+    return np.asarray(values)[choice_codes(rng, len(values), size, weights)]
+
+
+def categorical(rng, values, size, weights=None):
+    # String columns are kept as pandas categoricals: one small code per row instead of a Python str
+    return pd.Categorical.from_codes(choice_codes(rng, len(values), size, weights), categories=values)
+
+
+def uniform(rng, low, high, size, decimals=None):
+    values = rng.uniform(low, high, size)
+    return np.round(values, decimals) if decimals is not None else values
+
+
+def dates_from_parts(year, month, day):
+    months = (np.asarray(year) - 1970) * 12 + (np.asarray(month) - 1)
+    return months.astype('datetime64[M]').astype('datetime64[D]') + (np.asarray(day) - 1)
+
+
+def weighted_dates(rng, size):
+    # Column version of weighted_date(): year by year_weights, month 1-12, day 1-28
+    year = choice(rng, years, size, year_weights)
+    month = rng.integers(1, 13, size)
+    day = rng.integers(1, 29, size)
+    return dates_from_parts(year, month, day)
+
+
+def date_years(dates):
+    return dates.astype('datetime64[Y]').astype(np.int64) + 1970
+
+
+def date_column(dates):
+    # pandas stores dates at second resolution; converting in NumPy avoids a slow per-column cast in pandas
+    return np.asarray(dates).astype('datetime64[s]')
+
+
+def string_column(chars):
+    # chars: (rows, width) uint8 matrix of ASCII codes → pandas string column
+    n_rows, width = chars.shape
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return pd.Series(chars.view(f'S{width}').ravel().astype(f'U{width}'))
+    offsets = np.arange(0, width * (n_rows + 1), width, dtype=np.int32)
+    array = pa.Array.from_buffers(pa.string(), n_rows, [None, pa.py_buffer(offsets), pa.py_buffer(np.ascontiguousarray(chars))])
+    return pd.Series(pd.arrays.ArrowStringArray(array))
+
+
+# ====== TABLE GENERATORS ======
+def generate_products(rng, n_products):
+    category = categorical(rng, PRODUCT_CATEGORIES, n_products)
+    return pd.DataFrame({
+        'ProductID': np.arange(1, n_products + 1),
+        'ProductCategory': category,
+        'BasePremium': uniform(rng, 300, 3000, n_products, 2),
+        'CoverageLimit': uniform(rng, 50000, 1000000, n_products, 2),
+        'IsActive': True,
+    })
+
+
+def generate_agent_branches(rng, n_agents, n_branches):
+    return rng.integers(1, n_branches + 1, n_agents)
+
+
+def generate_customers(rng, n_customers, vocab):
+    gender = categorical(rng, ['Female', 'Male', 'Non-Binary'], n_customers, [39.93, 46.18, 13.89])
+    codes = np.asarray(gender.codes)
+    first_name = np.where(codes == 0, vocab.sample('first_name_female', rng, n_customers),
+                          np.where(codes == 1, vocab.sample('first_name_male', rng, n_customers),
+                                   vocab.sample('first_name', rng, n_customers)))
+    income = uniform(rng, 30000, 200000, n_customers, 2)
+
+    # Credit score follows income, then high earners rarely have bad credit and low earners rarely perfect
+    credit = 300 + (income / 200).astype(np.int64) + rng.integers(-120, 181, n_customers)
+    credit = np.clip(credit, 300, 850)
+    high = income > 150000
+    low = income < 50000
+    credit = np.where(high, np.maximum(credit, rng.integers(680, 851, n_customers)), credit)
+    credit = np.where(low, np.minimum(credit, rng.integers(300, 741, n_customers)), credit)
+
+    # Age 18-85 on the fixed "today"
+    dob = today - rng.integers(18 * 365, 85 * 365 + 1, n_customers)
+
+    return pd.DataFrame({
+        'CustomerID': np.arange(1, n_customers + 1),
+        'FirstName': first_name,
+        'LastName': vocab.sample('last_name', rng, n_customers),
+        'DateOfBirth': date_column(dob),
+        'Gender': gender,
+        'AddressLine1': vocab.sample('street_address', rng, n_customers),
+        'City': vocab.sample('city', rng, n_customers),
+        'State': categorical(rng, US_STATES, n_customers),
+        'ZipCode': vocab.sample('zipcode', rng, n_customers),
+        'Country': 'USA',
+        'AnnualIncome': income,
+        'MaritalStatus': categorical(rng, ['Single', 'Married', 'Divorced', 'Widowed'], n_customers),
+        'NumberOfDependents': rng.integers(0, 6, n_customers),
+        'CreditScore': credit,
+        'ChurnProbability': uniform(rng, 0.0, 0.4, n_customers, 4),
+        'RegistrationDate': date_column(weighted_dates(rng, n_customers)),
+    })
+
+
+def policy_numbers(rng, n_policies):
+    # Distinct PREFIX-NNNNNNN values: a keyed shuffle of the whole number space indexed by PolicyID
+    # (same allocator as the row-by-row generator, no n-sized draw without replacement)
+    allocator = PolicyNumberAllocator(seed=int(rng.integers(2**63)))
+    codes = allocator.permutation.apply(np.arange(n_policies)).astype(np.int64)
+    prefixes = np.frombuffer(''.join(allocator.PREFIXES).encode(), dtype=np.uint8).reshape(-1, 3)
+    chars = np.empty((n_policies, 11), dtype=np.uint8)
+    chars[:, :3] = prefixes[codes // allocator.NUMBERS_PER_PREFIX]
+    chars[:, 3] = ord('-')
+    number = codes % allocator.NUMBERS_PER_PREFIX + 1000000
+    for position in range(10, 3, -1):
+        chars[:, position] = ord('0') + number % 10
+        number //= 10
+    return string_column(chars)
+
+
+def generate_policies(rng, n_policies, n_customers, products, agent_branches, n_branches):
+    n_agents = len(agent_branches)
+    product_id = rng.integers(1, len(products) + 1, n_policies)
+    category = np.asarray(products['ProductCategory'].cat.codes)[product_id - 1]
+    base_premium = products['BasePremium'].to_numpy()[product_id - 1]
+    branch_id = rng.integers(1, n_branches + 1, n_policies)
+
+    # 80% of policies go to an agent of the same branch (when that branch has agents)
+    agents_by_branch = np.argsort(agent_branches, kind='stable') + 1
+    branch_count = np.bincount(agent_branches, minlength=n_branches + 1)
+    branch_start = np.concatenate(([0], np.cumsum(branch_count)[:-1]))
+    same_branch = (rng.random(n_policies) < 0.8) & (branch_count[branch_id] > 0)
+    pick = branch_start[branch_id] + np.floor(rng.random(n_policies) * branch_count[branch_id]).astype(np.int64)
+    agent_id = np.where(same_branch, agents_by_branch[np.minimum(pick, n_agents - 1)], rng.integers(1, n_agents + 1, n_policies))
+
+    start = weighted_dates(rng, n_policies)
+    is_life = category == PRODUCT_CATEGORIES.index('Life')
+    term_years = np.where(~is_life, 1, choice(rng, [10, 20, 30], n_policies))
+    end = start + term_years * 365
+
+    inflation = 1 + (date_years(start) - premium_inflation_base_year) * 0.03
+    premium = base_premium * rng.uniform(0.7, 1.8, n_policies) * inflation
+    coverage = premium * rng.uniform(50, 300, n_policies)
+
+    return pd.DataFrame({
+        'PolicyID': np.arange(1, n_policies + 1),
+        'CustomerID': rng.integers(1, n_customers + 1, n_policies),
+        'AgentID': agent_id,
+        'BranchID': branch_id,
+        'ProductID': product_id,
+        'PolicyNumber': policy_numbers(rng, n_policies),
+        'StartDate': date_column(start),
+        'EndDate': date_column(end),
+        'PremiumAmount': np.round(premium, 2),
+        'CoverageAmount': np.round(coverage, 2),
+        'Deductible': choice(rng, [250, 500, 1000, 2000, 5000], n_policies).astype(float),
+        'PolicyStatus': categorical(rng, ['Active', 'Expired', 'Cancelled', 'Renewed'], n_policies, [0.6, 0.2, 0.1, 0.1]),
+        'RiskScore': uniform(rng, 10, 90, n_policies, 2),
+        'CreatedDate': np.datetime64(datetime.now().replace(microsecond=0), 's'),
+    })
+
+
+def generate_claims(rng, n_claims, policies, products, vocab):
+    # Claims only for policies already started on "today", weighted by exposure days, with the
+    # incident date inside the policy's active window (same PolicyIndex as the row-by-row generator)
+    policy_start = policies['StartDate'].to_numpy().astype('datetime64[D]')
+    policy_end = policies['EndDate'].to_numpy().astype('datetime64[D]')
+    started = policy_start <= today
+    if not started.any():
+        raise ValueError("No valid policies for claims!")
+    index = PolicyIndex(policies['PolicyID'].to_numpy()[started],
+                        policy_start[started].astype(np.int64) + EPOCH_ORDINAL,
+                        policy_end[started].astype(np.int64) + EPOCH_ORDINAL,
+                        np.asarray(products['ProductCategory'].cat.codes)[policies['ProductID'].to_numpy()[started] - 1],
+                        today.astype(object))
+
+    policy_id, incident_ordinal = index.sample(rng, n_claims)
+    incident = (incident_ordinal - EPOCH_ORDINAL).astype('datetime64[D]')
+    claim_date = np.minimum(incident + rng.integers(0, 61, n_claims), today)
+
+    # Severity factor (higher = tougher year) drives both approval and payout ratio
+    severity_lookup = np.array([claim_severity_factors.get(y, 0.90) for y in range(min(years), max(years) + 2)])
+    year_index = np.clip(date_years(incident) - min(years), 0, len(severity_lookup) - 1)
+    severity = severity_lookup[year_index]
+
+    requested = uniform(rng, 1500, 60000, n_claims, 2)
+    approval_prob = np.minimum(0.75, 0.65 * severity)
+    denied = rng.random(n_claims) < (1 - approval_prob)
+    ratio = np.minimum(0.75, rng.uniform(0.40, 0.65, n_claims) * severity)
+    approved = np.where(denied, 0.0, np.round(requested * ratio, 2))
+    settled = rng.random(n_claims) < 0.75
+    status = pd.Categorical.from_codes(np.where(denied, 0, np.where(settled, 2, 1)), categories=['Denied', 'Approved', 'Settled'])
+
+    return pd.DataFrame({
+        'ClaimID': np.arange(1, n_claims + 1),
+        'PolicyID': policy_id,
+        'ClaimDate': date_column(claim_date),
+        'IncidentDate': date_column(incident),
+        'IncidentDescription': vocab.sample('claim_description', rng, n_claims),
+        'ClaimAmountRequested': requested,
+        'ClaimAmountApproved': approved,
+        'ClaimStatus': status,
+        'FraudFlag': rng.random(n_claims) < 0.015,
+    })
+
+
+def generate_payments(rng, n_payments, n_policies, n_claims):
+    premium = rng.random(n_payments) < 0.8  # 80% premium payments, the rest claim payouts
+    policy_id = pd.array(np.where(premium, rng.integers(1, n_policies + 1, n_payments), 0), dtype='Int64')
+    claim_id = pd.array(np.where(premium, 0, rng.integers(1, n_claims + 1, n_payments)), dtype='Int64')
+    policy_id[~premium] = pd.NA
+    claim_id[premium] = pd.NA
+    amount = np.where(premium, rng.uniform(100, 5000, n_payments), rng.uniform(500, 50000, n_payments))
+
+    return pd.DataFrame({
+        'PaymentID': np.arange(1, n_payments + 1),
+        'PolicyID': policy_id,
+        'ClaimID': claim_id,
+        'PaymentType': pd.Categorical.from_codes((~premium).astype(np.int8), categories=['Premium', 'Payout']),
+        'PaymentDate': date_column(today - rng.integers(0, 7 * 365 + 1, n_payments)),
+        'Amount': np.round(amount, 2),
+        'PaymentMethod': categorical(rng, ['Credit Card', 'Bank Transfer', 'Check', 'Auto-Debit'], n_payments),
+        'Status': 'Successful',
+    })
+
+
+def generate_tables(n_policies=BASE_COUNTS['policies'], seed=42):
+    # One seeded Generator drives every column, so the same (n_policies, seed) gives the same tables
+    rng = np.random.default_rng(seed)
+    vocab = VocabPools(seed=seed)  # Faker text columns are drawn by index from cached pools
+    counts = scaled_counts(n_policies)
+    products = generate_products(rng, counts['products'])
+    agent_branches = generate_agent_branches(rng, counts['agents'], counts['branches'])
+    customers = generate_customers(rng, counts['customers'], vocab)
+    policies = generate_policies(rng, counts['policies'], counts['customers'], products, agent_branches, counts['branches'])
+    claims = generate_claims(rng, counts['claims'], policies, products, vocab)
+    payments = generate_payments(rng, counts['payments'], counts['policies'], counts['claims'])
+    return {
+        'Customers': customers,
+        'Policies': policies,
+        'Claims': claims,
+        'Payments': payments,
+    }
+
+
+def to_arrow(tables):
+    import pyarrow as pa
+    return {name: pa.Table.from_pandas(df, preserve_index=False) for name, df in tables.items()}
+
+
+def write_tables(tables, out_dir, fmt='parquet'):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, df in tables.items():
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        if fmt == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        print(f"   → {path} ({len(df):,} rows)")
+
+
+# ====== MAIN LOGIC ======
+def main():
+    parser = argparse.ArgumentParser(description="Columnar (NumPy) generator for the insurance fact tables")
+    parser.add_argument('--policies', type=int, default=BASE_COUNTS['policies'], help="Number of policies; other tables scale with it")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='insurance_columnar')
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet')
+    args = parser.parse_args()
+
+    print(f"Generating tables for {args.policies:,} policies (seed={args.seed})...")
+    started = time.perf_counter()
+    tables = generate_tables(args.policies, args.seed)
+    print(f"Generated in {time.perf_counter() - started:.1f}s")
+    write_tables(tables, args.out, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,115 @@
-import pandas as pd
-import mysql.connector
+import argparse
+import os
 import shutil
+import sys
+# Helpers shared by the Insurance and HR projects (sinks, loaders, sharding, ...) live in ../../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from table_export import CHUNK_SIZE, MANIFEST, export_incremental, export_table, export_tables
+
+# Largest tables: read as parallel primary-key ranges, then joined into one file
+SPLIT_KEYS = {'Payments': 'PaymentID', 'Policies': 'PolicyID'}
+
+# --incremental: only rows past the last exported value of these columns are exported.
+# Increasing IDs are safest; a date column (e.g. 'ClaimDate') misses rows added later for an already exported date.
+WATERMARKS = {'Claims': 'ClaimID', 'Payments': 'PaymentID', 'Policies': 'PolicyID', 'Customers': 'CustomerID'}
+
+# Parquet column types that differ from the MySQL default (BOOLEAN is TINYINT, short text → dictionary)
+PARQUET_DTYPES = {
+    'Branches': {'State': 'dictionary'},
+    'Agents': {'ActiveStatus': 'bool', 'Region': 'dictionary'},
+    'Products': {'ProductCategory': 'dictionary', 'IsActive': 'bool'},
+    'Customers': {'Gender': 'dictionary', 'State': 'dictionary', 'Country': 'dictionary', 'MaritalStatus': 'dictionary'},
+    'Policies': {'PolicyStatus': 'dictionary'},
+    'AutoPolicyDetails': {'VehicleMake': 'dictionary', 'UsageType': 'dictionary'},
+    'HomePolicyDetails': {'PropertyType': 'dictionary', 'ConstructionType': 'dictionary', 'SecuritySystem': 'bool', 'FloodZone': 'bool'},
+    'LifePolicyDetails': {'BeneficiaryRelationship': 'dictionary', 'SmokerStatus': 'bool', 'HealthRating': 'dictionary'},
+    'HealthPolicyDetails': {'CoverageType': 'dictionary', 'NetworkType': 'dictionary', 'PrescriptionCoverage': 'bool'},
+    'Claims': {'ClaimStatus': 'dictionary', 'FraudFlag': 'bool'},
+    'Payments': {'PaymentType': 'dictionary', 'PaymentMethod': 'dictionary', 'Status': 'dictionary'},
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export the insurance tables to CSV or Parquet")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows fetched and written per chunk")
+    parser.add_argument('--compression', default='zstd', help="Parquet compression (zstd, snappy, gzip, none)")
+    parser.add_argument('--workers', type=int, default=4, help="Tables / table ranges exported at the same time")
+    parser.add_argument('--incremental', action='store_true', help="Append only new rows as partition files (see manifest.json). Rows changed in place are not picked up: Claim Fix.py resets Claims and Payments, other edits need a full export")
+    parser.add_argument('--sqlite', metavar='PATH', help="Export from a file written by the generator's --sink sqlite instead of MySQL")
+    args = parser.parse_args()
+    if args.sqlite and args.incremental:
+        parser.error("--incremental needs MySQL (it reads a consistent snapshot)")
+    return args
+
+def export_to_csv(fmt='csv', chunk_size=CHUNK_SIZE, compression='zstd', workers=4, incremental=False, sqlite_path=None):
+    if sqlite_path is None:
+        import mysql.connector.pooling  # Here, so the generators' file sinks can import PARQUET_DTYPES without MySQL
+        # One pooled connection per worker, plus one that takes the snapshot lock
+        pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_name='insurance_export',
+            pool_size=workers + 1,
+            host='localhost',
+            user='root',
+            password='1111',
+            database='insurance_project_001'
+        )
 
-def export_to_csv():
-    cnx = mysql.connector.connect(
-        host='localhost',
-        user='root',
-        password='1111',
-        database='insurance_project_001'
-    )
-    
     tables = [
         'Branches', 'Agents', 'Products', 'Customers', 'Policies',
         'AutoPolicyDetails', 'HomePolicyDetails', 'LifePolicyDetails', 'HealthPolicyDetails',
         'Claims', 'Payments'
     ]
-    
+
     # Create a folder
     import os
-    
-
-    if os.path.exists('insurance_dataset_csv'):
-        shutil.rmtree('insurance_dataset_csv')
-        print(f"Existing folder 'insurance_dataset_csv' removed.")
-        
-
-    os.makedirs('insurance_dataset_csv')
-    print(f"Folder 'insurance_dataset_csv' created.")
-    
-    for table in tables:
-        print(f"Exporting {table} to CSV...")
-        query = f"SELECT * FROM {table}"
-        df = pd.read_sql(query, cnx)
-        df.to_csv(f"insurance_dataset_csv/{table}.csv", index=False)
-    
-    cnx.close()
-    print("All tables exported to 'insurance_dataset_csv' folder!")
+
+    folder_name = f'insurance_dataset_{fmt}'
+
+    if incremental and os.path.exists(os.path.join(folder_name, MANIFEST)):
+        # Keep the previous partitions; only new rows are exported
+        print(f"Incremental export into '{folder_name}'...")
+        export_incremental(pool, tables, folder_name, WATERMARKS, fmt=fmt, workers=workers, split_keys=SPLIT_KEYS,
+                           chunk_size=chunk_size, dtypes=PARQUET_DTYPES, compression=compression)
+        print(f"New rows exported to '{folder_name}' (see {MANIFEST})!")
+        return
+
+    if os.path.exists(folder_name):
+        shutil.rmtree(folder_name)
+        print(f"Existing folder '{folder_name}' removed.")
+
+
+    os.makedirs(folder_name)
+    print(f"Folder '{folder_name}' created.")
+
+    if incremental:
+        # First incremental run: full export in the partitioned layout + manifest
+        export_incremental(pool, tables, folder_name, WATERMARKS, fmt=fmt, workers=workers, split_keys=SPLIT_KEYS,
+                           chunk_size=chunk_size, dtypes=PARQUET_DTYPES, compression=compression)
+        print(f"All tables exported to '{folder_name}' folder (see {MANIFEST})!")
+        return
+
+    if sqlite_path:
+        # One connection to the file, tables one after another (nothing else writes to it)
+        from sinks import connect_sqlite, sqlite_parquet_types
+        print(f"Exporting {len(tables)} tables from {sqlite_path} to {fmt.upper()}...")
+        cnx = connect_sqlite(sqlite_path)
+        try:
+            for table in tables:
+                dtypes = {**sqlite_parquet_types(cnx, table), **PARQUET_DTYPES.get(table, {})}
+                export_table(cnx, table, folder_name, fmt, chunk_size, dtypes, compression)
+        finally:
+            cnx.close()
+        print(f"All tables exported to '{folder_name}' folder!")
+        return
+
+    # Tables are exported concurrently from one consistent snapshot, each streamed in chunks
+    print(f"Exporting {len(tables)} tables to {fmt.upper()} with {workers} workers...")
+    export_tables(pool, tables, folder_name, fmt=fmt, workers=workers, split_keys=SPLIT_KEYS,
+                  chunk_size=chunk_size, dtypes=PARQUET_DTYPES, compression=compression)
+
+    print(f"All tables exported to '{folder_name}' folder!")
 
 # Call this after your main() or run separately
-export_to_csv()
\ No newline at end of file
+if __name__ == "__main__":
+    args = parse_args()
+    export_to_csv(args.format, args.chunk_size, args.compression, args.workers, args.incremental, args.sqlite)
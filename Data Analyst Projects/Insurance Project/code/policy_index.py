@@ -0,0 +1,118 @@
+# ====== IMPORTS ======
+from array import array
+from datetime import date
+
+import numpy as np
+
+# ====== CONSTANTS ======
+CATEGORIES = ['Auto', 'Home', 'Life', 'Health']
+FETCH_SIZE = 100_000  # Policies read per fetchmany() while building the index
+
+POLICY_QUERY = """
+    SELECT p.PolicyID, p.StartDate, p.EndDate, pr.ProductCategory
+    FROM Policies p
+    JOIN Products pr ON pr.ProductID = p.ProductID
+    WHERE p.StartDate <= %s
+    ORDER BY p.PolicyID
+"""
+
+
+# ====== POLICY INDEX ======
+# The policies claims can be filed against, held as four NumPy arrays (id, start and end as date
+# ordinals, category code) - about 17 bytes per policy instead of a list of Python tuples.
+# Claims are drawn proportional to exposure: each policy owns one slot per day it has been active
+# up to "today" (start..min(end, today)). A draw picks one of all those days uniformly, finds its
+# policy by binary search on the cumulative exposure, and the day itself is the incident date.
+# So a 30-year Life policy gets more claims than a 1-year Auto policy that started last month,
+# and every incident falls inside its policy's active window.
+class PolicyIndex:
+    def __init__(self, policy_id, start, end, category, today):
+        self.policy_id = np.asarray(policy_id, dtype=np.int64)
+        self.start = np.asarray(start, dtype=np.int32)
+        self.end = np.asarray(end, dtype=np.int32)
+        self.category = np.asarray(category, dtype=np.int8)
+        self.today = today.toordinal()
+        last_day = np.minimum(self.end, self.today)
+        self.exposure = np.maximum(last_day.astype(np.int64) - self.start + 1, 0)
+        self.cumulative = np.cumsum(self.exposure)
+        self.total = int(self.cumulative[-1]) if len(self.cumulative) else 0
+
+    def __len__(self):
+        return len(self.policy_id)
+
+    @classmethod
+    def from_db(cls, cnx, today, fetch_size=FETCH_SIZE, placeholder='%s'):
+        # Reads the policies started on or before today in chunks, so no full list of rows is ever held
+        codes = {name: code for code, name in enumerate(CATEGORIES)}
+        cursor = cnx.cursor()
+        cursor.execute(POLICY_QUERY.replace('%s', placeholder), (today,))
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            policy_id, start, end, category = zip(*rows)
+            chunks.append((
+                np.array(policy_id, dtype=np.int64),
+                np.array([d.toordinal() for d in start], dtype=np.int32),
+                np.array([d.toordinal() for d in end], dtype=np.int32),
+                np.array([codes.get(c, -1) for c in category], dtype=np.int8),
+            ))
+        cursor.close()
+        if not chunks:
+            return cls([], [], [], [], today)
+        return cls(*(np.concatenate(column) for column in zip(*chunks)), today)
+
+    def restrict(self, policy_range=None, categories=None, window=None):
+        # Sub-index for a targeted regeneration: only policies with first <= PolicyID <= last and
+        # one of the categories, each active window clipped to window = (first day, last day) ordinals
+        keep = np.ones(len(self), dtype=bool)
+        if policy_range is not None:
+            keep &= (self.policy_id >= policy_range[0]) & (self.policy_id <= policy_range[1])
+        if categories:
+            keep &= np.isin(self.category, [CATEGORIES.index(c) for c in categories])
+        start, end = self.start, self.end
+        if window is not None:
+            start = np.maximum(start, window[0])
+            end = np.minimum(end, window[1])
+            keep &= start <= np.minimum(end, self.today)  # Drop policies not active at all in the window
+        return PolicyIndex(self.policy_id[keep], start[keep], end[keep], self.category[keep], date.fromordinal(self.today))
+
+    def sample(self, rng, size):
+        # rng: numpy.random.Generator. Returns (policy ids, incident date ordinals), one per claim
+        if self.total == 0:
+            raise ValueError("No policy has any exposure before today")
+        day = rng.integers(0, self.total, size)
+        pos = np.searchsorted(self.cumulative, day, side='right')
+        incident = self.start[pos] + (day - (self.cumulative[pos] - self.exposure[pos]))
+        return self.policy_id[pos], incident
+
+
+# Same index, collected while the policies are generated: the generator no longer reads them back
+# from the database (and works when the output is a set of files). Compact array.array columns,
+# policies added in PolicyID order - the result is identical to from_db() on the loaded tables.
+class PolicyIndexBuilder:
+    def __init__(self):
+        self.policy_id = array('q')
+        self.start = array('i')
+        self.end = array('i')
+        self.category = array('b')
+        self.codes = {name: code for code, name in enumerate(CATEGORIES)}
+
+    def add(self, policy_id, start_date, end_date, category):
+        self.policy_id.append(policy_id)
+        self.start.append(start_date.toordinal())
+        self.end.append(end_date.toordinal())
+        self.category.append(self.codes.get(category, -1))
+
+    def build(self, today):
+        # Only the policies started on or before today, like POLICY_QUERY
+        start = np.frombuffer(self.start, dtype=np.int32)
+        keep = start <= today.toordinal()
+        return PolicyIndex(np.frombuffer(self.policy_id, dtype=np.int64)[keep], start[keep],
+                           np.frombuffer(self.end, dtype=np.int32)[keep],
+                           np.frombuffer(self.category, dtype=np.int8)[keep], today)
+
+
+def to_date(ordinal):
+    return date.fromordinal(int(ordinal))
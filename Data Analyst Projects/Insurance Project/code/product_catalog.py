@@ -0,0 +1,34 @@
+# ====== IMPORTS ======
+from typing import NamedTuple, Optional
+
+
+# ====== PRODUCT CATALOG ======
+# In-process copy of the Products table, filled while the products are inserted.
+# The generators look products up here instead of running a SELECT per policy.
+class Product(NamedTuple):
+    product_id: int
+    category: str
+    base_premium: float
+    coverage_limit: float
+
+
+class ProductCatalog:
+    def __init__(self):
+        self._products = {}
+
+    def add(self, product_id: int, category: str, base_premium: float, coverage_limit: float) -> Product:
+        product = Product(product_id, category, float(base_premium), float(coverage_limit))
+        self._products[product_id] = product
+        return product
+
+    def get(self, product_id: int) -> Optional[Product]:
+        return self._products.get(product_id)
+
+    def ids(self):
+        return list(self._products)
+
+    def __len__(self):
+        return len(self._products)
+
+    def __contains__(self, product_id):
+        return product_id in self._products
@@ -0,0 +1,102 @@
+# ====== IMPORTS ======
+import hashlib
+import os
+import random
+
+import numpy as np
+
+# ====== VOCABULARY POOLS ======
+# Faker is slow per call (~20-60 µs for an address or a paragraph), and the generators call it
+# several times per row. Instead, each kind of value is drawn from Faker once into a large pool,
+# and rows pick from the pool by index: a single rng call in the row builders, or an integer
+# array for whole columns. Pools are seeded, so the same seed gives the same pools, and they are
+# cached on disk (.vocab_cache/) so later runs skip the Faker calls entirely.
+POOLS = {
+    # name: (Faker call, pool size)
+    'first_name': (lambda fake: fake.first_name(), 5_000),
+    'first_name_male': (lambda fake: fake.first_name_male(), 5_000),
+    'first_name_female': (lambda fake: fake.first_name_female(), 5_000),
+    'last_name': (lambda fake: fake.last_name(), 5_000),
+    'city': (lambda fake: fake.city(), 10_000),
+    'street_address': (lambda fake: fake.street_address(), 50_000),
+    'zipcode': (lambda fake: fake.zipcode(), 20_000),
+    'license_plate': (lambda fake: fake.license_plate(), 50_000),
+    'vehicle_model': (lambda fake: fake.word().capitalize(), 2_000),
+    'claim_description': (lambda fake: fake.paragraph(nb_sentences=2), 20_000),
+}
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.vocab_cache')
+
+_loaded = {}  # (locale, seed, cache_dir) → pools, so every worker process reads the cache once
+
+
+def cache_path(locale, seed, cache_dir=CACHE_DIR):
+    # Faker's version is part of the key: another version gives other values for the same seed
+    import faker
+    spec = repr(sorted((name, size) for name, (_, size) in POOLS.items()))
+    digest = hashlib.sha256(f"{locale}:{seed}:{faker.VERSION}:{spec}".encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"vocab-{locale}-{seed}-{digest}.npz")
+
+
+def build_pools(locale, seed):
+    from faker import Faker
+    fake = Faker(locale)
+    fake.seed_instance(seed)
+    return {name: [call(fake) for _ in range(size)] for name, (call, size) in sorted(POOLS.items())}
+
+
+def load_pools(locale='en_US', seed=42, cache_dir=CACHE_DIR):
+    key = (locale, seed, cache_dir)
+    if key in _loaded:
+        return _loaded[key]
+    path = cache_path(locale, seed, cache_dir)
+    if os.path.exists(path):
+        with np.load(path) as data:
+            pools = {name: data[name].tolist() for name in data.files}
+    else:
+        pools = build_pools(locale, seed)
+        os.makedirs(cache_dir, exist_ok=True)
+        part = f"{path}.{os.getpid()}.part"
+        with open(part, 'wb') as f:
+            np.savez_compressed(f, **{name: np.array(values) for name, values in pools.items()})
+        os.replace(part, path)
+    _loaded[key] = pools
+    return pools
+
+
+class VocabPools:
+    # Pickles as (locale, seed, cache_dir) only - shard workers reload the pools from the disk cache
+    def __init__(self, seed=42, locale='en_US', cache_dir=CACHE_DIR):
+        self.seed = seed
+        self.locale = locale
+        self.cache_dir = cache_dir
+        self.pools = load_pools(locale, seed, cache_dir)
+        self._arrays = {}
+
+    def __getstate__(self):
+        return {'seed': self.seed, 'locale': self.locale, 'cache_dir': self.cache_dir}
+
+    def __setstate__(self, state):
+        self.__init__(state['seed'], state['locale'], state['cache_dir'])
+
+    # --- Row builders (random.Random) ---
+    def pick(self, name, rng=random):
+        pool = self.pools[name]
+        return pool[int(rng.random() * len(pool))]
+
+    # --- Column generators (numpy.random.Generator) ---
+    def array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.array(self.pools[name], dtype=object)
+        return self._arrays[name]
+
+    def take(self, name, indices):
+        return self.array(name)[indices]
+
+    def sample(self, name, rng, size):
+        return self.take(name, rng.integers(0, len(self.pools[name]), size))
+
+
+def phone_number(rng=random):
+    # Same shape as f"({fake.numerify('###')}) {fake.numerify('###')}-{fake.numerify('####')}"
+    return f"({rng.randrange(1000):03d}) {rng.randrange(1000):03d}-{rng.randrange(10000):04d}"
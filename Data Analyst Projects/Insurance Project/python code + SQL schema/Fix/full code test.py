@@ -5,6 +5,15 @@ import string
 import mysql.connector
 from faker import Faker
 from decimal import Decimal
+import os
+import sys
+
+# Shared helpers live next to the main generator in ../../code and in ../../../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'code'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'common'))
+from product_catalog import ProductCatalog
+from id_allocator import EmailAllocator, PolicyNumberAllocator
+from samplers import WeightedSampler
 
 # ====== SETUP ======
 fake = Faker('en_US')
@@ -25,6 +34,11 @@ years = list(range(2017, 2026))
 # Improved year weights for policy dates – milder growth, prevents huge 2025 spike
 year_weights = [1.1, 1.31, 1.43, 1.9, 1.8, 2.5, 2.1, 2.3, 2.5]
 
+# Weighted distributions compiled once into alias tables (samplers.py), not per random.choices call
+YEAR_SAMPLER = WeightedSampler(years, year_weights)
+GENDER_SAMPLER = WeightedSampler(['Female', 'Male', 'Non-Binary'], [39.93, 46.18, 13.89])
+POLICY_STATUS_SAMPLER = WeightedSampler(['Active', 'Expired', 'Cancelled', 'Renewed'], [0.6, 0.2, 0.1, 0.1])
+
 # Claim severity factors (higher = worse year → higher payouts/approvals)
 claim_severity_factors = {
     2017: 0.95,
@@ -41,49 +55,31 @@ claim_severity_factors = {
 premium_inflation_base_year = 2017
 
 def weighted_date(start_year=2017, end_year=2025):
-    year = random.choices(years, weights=year_weights)[0]
+    year = YEAR_SAMPLER.draw(random)
     month = random.randint(1, 12)
     day = random.randint(1, 28)  # Safe for all months
     return datetime(year, month, day).date()
 
 # ====== HELPER FUNCTIONS ======
-def realistic_email(first, last, used_set):
+# Style/domain are random; the allocators guarantee uniqueness without retry loops or used-value sets
+def realistic_email(first, last, allocator):
     first = first.lower()
     last = last.lower()
     domains = ["gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "aol.com", "protonmail.com", "icloud.com"]
     formats = [
-        f"{first}.{last}",
-        f"{first}{last}",
-        f"{first}_{last}",
-        f"{first[0]}{last}",
-        f"{first}{last}{random.randint(10,99)}",
-        f"{first}.{last}{random.randint(1,999)}"
+        (f"{first}.{last}", False),
+        (f"{first}{last}", False),
+        (f"{first}_{last}", False),
+        (f"{first[0]}{last}", False),
+        (f"{first}{last}", True),
+        (f"{first}.{last}", True)
     ]
-    random.shuffle(formats)
+    base, numbered = random.choice(formats)
     domain = random.choice(domains)
+    return allocator.allocate(base, domain, numbered)
 
-    for base in formats:
-        email = f"{base}@{domain}"
-        if email not in used_set:
-            used_set.add(email)
-            return email
-
-    counter = 1
-    while True:
-        email = f"{first}.{last}{counter}@{domain}"
-        if email not in used_set:
-            used_set.add(email)
-            return email
-        counter += 1
-
-def realistic_policy_number(used_set):
-    while True:
-        prefix = random.choice(['POL', 'INS', 'COV', 'PRM'])
-        number = random.randint(1000000, 9999999)
-        policy_num = f"{prefix}-{number}"
-        if policy_num not in used_set:
-            used_set.add(policy_num)
-            return policy_num
+def realistic_policy_number(policy_id, allocator):
+    return allocator.number(policy_id)
 
 # ====== MAIN FUNCTION ======
 def main():
@@ -96,8 +92,9 @@ def main():
     )
     cursor = cnx.cursor()
 
-    used_emails = set()
-    used_policy_numbers = set()
+    emails = EmailAllocator(seed=42)
+    policy_numbers = PolicyNumberAllocator(seed=42)
+    catalog = ProductCatalog()
     agent_by_branch = [[] for _ in range(51)]  # Index 0 unused
 
     # === Branches (50) ===
@@ -134,23 +131,25 @@ def main():
     print("Inserting Products...")
     for i in range(1, 21):
         category = random.choice(PRODUCT_CATEGORIES)
+        product_name = f"{category} {random.choice(['Standard', 'Premium', 'Basic', 'Elite', 'Plus'])} Plan"
+        description = fake.text(max_nb_chars=200)
+        product = catalog.add(i, category, round(random.uniform(300, 3000), 2), round(random.uniform(50000, 1000000), 2))
         cursor.execute("""
             INSERT INTO Products (ProductID, ProductName, ProductCategory, Description, BasePremium, CoverageLimit, IsActive, LaunchDate)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """, (
-            i, f"{category} {random.choice(['Standard', 'Premium', 'Basic', 'Elite', 'Plus'])} Plan",
-            category, fake.text(max_nb_chars=200),
-            round(random.uniform(300, 3000), 2), round(random.uniform(50000, 1000000), 2),
+            i, product_name, category, description,
+            product.base_premium, product.coverage_limit,
             True, fake.date_between(start_date='-10y', end_date='-1y')
         ))
 
     # === Customers (50,000) ===
     print("Inserting 50,000 Customers...")
     for i in range(1, 50001):
-        gender = random.choices(['Female', 'Male', 'Non-Binary'], weights=[39.93, 46.18, 13.89])[0]
+        gender = GENDER_SAMPLER.draw(random)
         first = fake.first_name_male() if gender == 'Male' else fake.first_name_female() if gender == 'Female' else fake.first_name()
         last = fake.last_name()
-        email = realistic_email(first, last, used_emails)
+        email = realistic_email(first, last, emails)
         phone = f"({fake.numerify('###')}) {fake.numerify('###')}-{fake.numerify('####')}"
         dob = fake.date_of_birth(minimum_age=18, maximum_age=85)
         registration = weighted_date()
@@ -187,12 +186,11 @@ def main():
         else:
             agent_id = random.randint(1, 500)
 
-        cursor.execute("SELECT ProductCategory, BasePremium FROM Products WHERE ProductID = %s", (product_id,))
-        result = cursor.fetchone()
-        if not result:
+        product = catalog.get(product_id)
+        if product is None:
             continue
-        category, base_premium_decimal = result
-        base_premium = float(base_premium_decimal)
+        category = product.category
+        base_premium = product.base_premium
 
         start_date = weighted_date()
         end_date = start_date + timedelta(days=365) if category in ['Auto', 'Home', 'Health'] else start_date + timedelta(days=365*random.choice([10, 20, 30]))
@@ -203,9 +201,9 @@ def main():
         coverage = premium * random.uniform(50, 300)
         deductible = round(random.choice([250, 500, 1000, 2000, 5000]), 2)
 
-        policy_number = realistic_policy_number(used_policy_numbers)
+        policy_number = realistic_policy_number(i, policy_numbers)
 
-        status = random.choices(['Active', 'Expired', 'Cancelled', 'Renewed'], weights=[0.6, 0.2, 0.1, 0.1])[0]
+        status = POLICY_STATUS_SAMPLER.draw(random)
 
         cursor.execute("""
             INSERT INTO Policies 
@@ -0,0 +1,133 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from imdb_index import CHUNK_SIZE, TITLE_TYPE_RANK, load_ratings, read_tsv, resolve_directors
+
+# ----------------------------
+# Fuzzy title matcher (second pass)
+# ----------------------------
+# For Netflix titles the exact (title, year) join missed because of punctuation, accents, a
+# leading "The" or a release year that is off by one. Instead of comparing every Netflix title
+# with every IMDb title, both sides are cut into blocks: an IMDb title is only scored against a
+# Netflix title when they share a word and their years are at most YEAR_WINDOW apart. Within a
+# block, pairs sharing too few words are dropped before the (more expensive) character-trigram
+# similarity is computed. title.basics.tsv is streamed in chunks; each IMDb title lives in one
+# chunk, so all of its pairs are complete there.
+YEAR_WINDOW = 1          # ± years searched around the Netflix release year
+MIN_CONFIDENCE = 0.85    # matches below this are not returned
+MIN_WORD_OVERLAP = 0.5   # shared words / words of the longer title, before scoring
+YEAR_PENALTY = 0.05      # taken off the similarity per year of difference
+TOP_CANDIDATES = 5       # best candidates kept per Netflix title and chunk
+
+# Too common to make a useful block on their own
+STOPWORDS = {'the', 'a', 'an', 'and', 'of', 'in', 'on', 'to', 'for', 'with', 'de', 'la', 'el', 'le', 'les', 'der', 'die', 'das'}
+# Never what a Netflix title refers to (and tvEpisode alone is most of title.basics)
+SKIP_TYPES = {'tvEpisode', 'videoGame', 'podcastEpisode', 'podcastSeries'}
+
+
+def fuzzy_key(titles):
+    # "The Señora's Café: Part 2!" → "senoras cafe part 2"
+    titles = titles.fillna('').astype(str).str.normalize('NFKD')
+    titles = titles.str.replace('[\u0300-\u036f]', '', regex=True).str.lower()  # accents
+    titles = titles.str.replace('&', ' and ', regex=False).str.replace(r"['’`]", '', regex=True)
+    # Punctuation spelled out: with pyarrow strings (RE2) \w would only match ASCII letters
+    titles = titles.str.replace(r'[\s!-/:-@\[-`{-~¡-¿–—‘“”…·]+', ' ', regex=True).str.strip()
+    return titles.str.replace(r'^((the|a|an) )+', '', regex=True)
+
+
+def title_words(keys):
+    # One row per (row, word); titles made only of stopwords block on the whole key
+    words = keys.str.split().explode().dropna()
+    words = words[~words.isin(STOPWORDS)]
+    missing = keys.index.difference(words.index)
+    words = pd.concat([words, keys[missing][keys[missing] != '']])
+    words = words.reset_index().drop_duplicates()
+    words.columns = ['row', 'word']
+    return words
+
+
+@lru_cache(maxsize=500_000)
+def trigrams(key):
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(a, b):
+    # Dice coefficient of character trigrams: 1.0 for equal keys, tolerant to typos and word order
+    ta, tb = trigrams(a), trigrams(b)
+    return 2 * len(ta & tb) / (len(ta) + len(tb))
+
+
+def score_chunk(chunk, netflix, blocks, year_window):
+    # Candidate pairs of one title.basics chunk, with their confidence
+    years = pd.to_numeric(chunk['startYear'], errors='coerce').astype(float)
+    keep = (~chunk['titleType'].isin(SKIP_TYPES) & chunk['primaryTitle'].notna()
+            & years.between(netflix['year'].min() - year_window, netflix['year'].max() + year_window))
+    chunk, years = chunk[keep], years[keep]
+    if chunk.empty:
+        return None
+
+    imdb = pd.DataFrame({'tconst': chunk['tconst'].values, 'imdb_title': chunk['primaryTitle'].values,
+                         'imdb_year': years.values, 'type': chunk['titleType'].values,
+                         'key': fuzzy_key(chunk['primaryTitle']).values})
+    words = title_words(imdb['key'])
+    imdb['n_words'] = words.groupby('row').size().reindex(imdb.index, fill_value=0)
+    words['year'] = imdb['imdb_year'].values[words['row']]
+
+    # Block: same word, year within the window
+    pairs = words.merge(blocks, on=['word', 'year'], suffixes=('_imdb', ''))
+    if pairs.empty:
+        return None
+    pairs = pairs.groupby(['row', 'row_imdb']).size().rename('shared').reset_index()
+    pairs['overlap'] = pairs['shared'] / np.maximum(netflix['n_words'].values[pairs['row']],
+                                                    imdb['n_words'].values[pairs['row_imdb']])
+    pairs = pairs[pairs['overlap'] >= MIN_WORD_OVERLAP]
+    if pairs.empty:
+        return None
+
+    # Score only the pairs that survived the blocking
+    candidates = imdb.iloc[pairs['row_imdb']].reset_index(drop=True)
+    candidates['row'] = pairs['row'].values
+    netflix_keys = netflix['key'].values[candidates['row']]
+    year_gap = np.abs(netflix['year'].values[candidates['row']] - candidates['imdb_year'].values)
+    candidates['match_confidence'] = np.array([similarity(a, b) for a, b in zip(netflix_keys, candidates['key'])]) - YEAR_PENALTY * year_gap
+    candidates = candidates.sort_values(['row', 'match_confidence'], ascending=[True, False])
+    return candidates.groupby('row').head(TOP_CANDIDATES)
+
+
+def fuzzy_match(imdb_dir, titles, years, min_confidence=MIN_CONFIDENCE, year_window=YEAR_WINDOW, chunk_size=CHUNK_SIZE):
+    # Best IMDb match per (title, year), aligned with the input index:
+    # tconst, imdb_title, imdb_year, match_confidence, imdb_rating, imdb_director (NaN when none ≥ min_confidence)
+    netflix = pd.DataFrame({'key': fuzzy_key(pd.Series(titles)).values,
+                            'year': pd.to_numeric(pd.Series(years), errors='coerce').values})
+    words = title_words(netflix['key'][netflix['year'].notna()])
+    netflix['n_words'] = words.groupby('row').size().reindex(netflix.index, fill_value=0)
+    blocks = pd.concat([words.assign(year=netflix['year'].values[words['row']] + offset)
+                        for offset in range(-year_window, year_window + 1)], ignore_index=True)
+
+    found = []
+    for chunk in read_tsv(imdb_dir, 'title.basics.tsv', ['tconst', 'titleType', 'primaryTitle', 'startYear'], chunk_size):
+        scored = score_chunk(chunk, netflix, blocks, year_window)
+        if scored is not None:
+            found.append(scored[scored['match_confidence'] >= min_confidence])
+
+    columns = ['tconst', 'imdb_title', 'imdb_year', 'match_confidence', 'imdb_rating', 'imdb_director']
+    result = pd.DataFrame(index=pd.Series(titles).index, columns=columns)
+    found = pd.concat(found, ignore_index=True) if found else pd.DataFrame()
+    if found.empty:
+        return result
+
+    # Same tie-break as the index: title type, then votes, then tconst
+    found = found.merge(load_ratings(imdb_dir, found['tconst'], chunk_size), on='tconst', how='left')
+    found['type_rank'] = found['type'].map({t: rank for rank, t in enumerate(TITLE_TYPE_RANK)}).fillna(len(TITLE_TYPE_RANK))
+    found['votes'] = found['votes'].fillna(0)
+    best = (found.sort_values(['row', 'match_confidence', 'type_rank', 'votes', 'tconst'],
+                              ascending=[True, False, True, False, True])
+            .drop_duplicates('row').set_index('row'))
+    best['imdb_director'] = best['tconst'].map(resolve_directors(imdb_dir, best['tconst'], chunk_size))
+    best['match_confidence'] = best['match_confidence'].round(3)
+
+    result.iloc[best.index, :] = best[columns].values
+    return result.astype({'imdb_year': float, 'match_confidence': float, 'imdb_rating': float})
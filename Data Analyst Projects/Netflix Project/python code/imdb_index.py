@@ -0,0 +1,264 @@
+import csv
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+# ----------------------------
+# IMDb lookup index
+# ----------------------------
+# The IMDb TSVs are parsed once into a small SQLite file with one row per (title, year):
+# tconst, rating, votes and the director names already resolved. The enrichment step then
+# only joins its ~9k Netflix keys against that file instead of re-reading several GB of TSVs.
+# The index remembers the size/mtime of the TSVs it was built from and rebuilds itself when
+# any of them changes.
+SOURCES = ['title.basics.tsv', 'title.ratings.tsv', 'title.crew.tsv', 'name.basics.tsv']
+INDEX_FILE = 'imdb_index.sqlite'
+CHUNK_SIZE = 1_000_000
+
+# When several IMDb titles share a (title, year) key, keep the first by: title type, then
+# number of votes (desc), then tconst - so the same TSVs always give the same match
+TITLE_TYPE_RANK = ['movie', 'tvSeries', 'tvMiniSeries', 'tvMovie', 'tvSpecial', 'video', 'short', 'tvShort', 'tvEpisode']
+
+
+def normalize_title(titles):
+    # Same key as the notebook's match_title
+    return titles.astype(str).str.strip().str.lower()
+
+
+def read_tsv(imdb_dir, name, usecols, chunk_size=CHUNK_SIZE):
+    return pd.read_csv(
+        os.path.join(imdb_dir, name),
+        sep='\t',
+        usecols=usecols,
+        na_values='\\N',
+        keep_default_na=False,
+        quoting=csv.QUOTE_NONE,  # IMDb titles contain bare quotes
+        dtype=str,
+        chunksize=chunk_size
+    )
+
+
+def source_fingerprint(imdb_dir):
+    fingerprint = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(imdb_dir, name))
+        fingerprint[name] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprint
+
+
+def index_fingerprint(index_path):
+    try:
+        with sqlite3.connect(index_path) as con:
+            return json.loads(con.execute("SELECT value FROM meta WHERE key = 'sources'").fetchone()[0])
+    except (sqlite3.Error, TypeError):
+        return None
+
+
+# ----------------------------
+# Build
+# ----------------------------
+def build_index(imdb_dir, index_path=None, chunk_size=CHUNK_SIZE):
+    # Everything is streamed in chunks into SQLite staging tables; the ranking, director
+    # resolution and dedupe run as SQL, so Python memory stays at one chunk.
+    index_path = index_path or os.path.join(imdb_dir, INDEX_FILE)
+    building = index_path + '.building'
+    if os.path.exists(building):
+        os.remove(building)
+    started = time.time()
+    fingerprint = source_fingerprint(imdb_dir)
+
+    con = sqlite3.connect(building)
+    con.execute("PRAGMA journal_mode = OFF")
+    con.execute("PRAGMA synchronous = OFF")
+
+    print("Indexing title.ratings.tsv...")
+    con.execute("CREATE TABLE ratings (tconst TEXT PRIMARY KEY, rating REAL, votes INTEGER) WITHOUT ROWID")
+    for chunk in read_tsv(imdb_dir, 'title.ratings.tsv', ['tconst', 'averageRating', 'numVotes'], chunk_size):
+        rows = zip(chunk['tconst'], pd.to_numeric(chunk['averageRating'], errors='coerce'),
+                   pd.to_numeric(chunk['numVotes'], errors='coerce').fillna(0).astype('int64').tolist())
+        con.executemany("INSERT INTO ratings VALUES (?, ?, ?)", rows)
+
+    print("Indexing title.basics.tsv...")
+    con.execute("CREATE TABLE candidates (title_key TEXT, year INTEGER, tconst TEXT, type_rank INTEGER)")
+    type_rank = {title_type: rank for rank, title_type in enumerate(TITLE_TYPE_RANK)}
+    for chunk in read_tsv(imdb_dir, 'title.basics.tsv', ['tconst', 'titleType', 'primaryTitle', 'startYear'], chunk_size):
+        chunk = chunk[chunk['primaryTitle'].notna()]
+        year = pd.to_numeric(chunk['startYear'], errors='coerce')
+        chunk, year = chunk[year.notna()], year[year.notna()]
+        rows = zip(normalize_title(chunk['primaryTitle']), year.astype('int64').tolist(), chunk['tconst'],
+                   chunk['titleType'].map(type_rank).fillna(len(TITLE_TYPE_RANK)).astype('int64').tolist())
+        con.executemany("INSERT INTO candidates VALUES (?, ?, ?, ?)", rows)
+
+    print("Indexing title.crew.tsv...")
+    con.execute("CREATE TABLE title_directors (tconst TEXT, position INTEGER, nconst TEXT)")
+    for chunk in read_tsv(imdb_dir, 'title.crew.tsv', ['tconst', 'directors'], chunk_size):
+        directors = chunk.dropna(subset=['directors'])
+        directors = directors.assign(nconst=directors['directors'].str.split(',')).explode('nconst')
+        directors['position'] = directors.groupby(level=0).cumcount()
+        rows = zip(directors['tconst'], directors['position'].tolist(), directors['nconst'].str.strip())
+        con.executemany("INSERT INTO title_directors VALUES (?, ?, ?)", rows)
+
+    print("Indexing name.basics.tsv...")
+    con.execute("CREATE TABLE names (nconst TEXT PRIMARY KEY, name TEXT) WITHOUT ROWID")
+    for chunk in read_tsv(imdb_dir, 'name.basics.tsv', ['nconst', 'primaryName'], chunk_size):
+        chunk = chunk.dropna(subset=['primaryName'])
+        con.executemany("INSERT OR IGNORE INTO names VALUES (?, ?)", zip(chunk['nconst'], chunk['primaryName']))
+
+    print("Ranking matches and resolving directors...")
+    con.executescript("""
+        CREATE TABLE best AS
+        SELECT title_key, year, tconst FROM (
+            SELECT c.title_key, c.year, c.tconst,
+                   ROW_NUMBER() OVER (PARTITION BY c.title_key, c.year
+                                      ORDER BY c.type_rank, COALESCE(r.votes, 0) DESC, c.tconst) AS pick
+            FROM candidates c LEFT JOIN ratings r ON r.tconst = c.tconst
+        ) WHERE pick = 1;
+        CREATE INDEX best_tconst ON best (tconst);
+
+        -- Names in IMDb order, only for the titles that survived the dedupe
+        CREATE TABLE resolved AS
+        SELECT tconst, group_concat(name, ', ') AS directors FROM (
+            SELECT d.tconst, n.name FROM title_directors d
+            JOIN best b ON b.tconst = d.tconst
+            JOIN names n ON n.nconst = d.nconst
+            ORDER BY d.tconst, d.position
+        ) GROUP BY tconst;
+        CREATE INDEX resolved_tconst ON resolved (tconst);
+
+        CREATE TABLE titles (
+            title_key TEXT, year INTEGER, tconst TEXT, rating REAL, votes INTEGER, directors TEXT,
+            PRIMARY KEY (title_key, year)
+        ) WITHOUT ROWID;
+        INSERT INTO titles
+        SELECT b.title_key, b.year, b.tconst, r.rating, r.votes, d.directors
+        FROM best b
+        LEFT JOIN ratings r ON r.tconst = b.tconst
+        LEFT JOIN resolved d ON d.tconst = b.tconst;
+
+        DROP TABLE candidates;
+        DROP TABLE title_directors;
+        DROP TABLE names;
+        DROP TABLE ratings;
+        DROP TABLE best;
+        DROP TABLE resolved;
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+    """)
+    con.execute("INSERT INTO meta VALUES ('sources', ?)", (json.dumps(fingerprint),))
+    con.commit()
+    con.execute("VACUUM")
+    n_titles = con.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+    con.close()
+    os.replace(building, index_path)
+    print(f"✅ IMDb index built: {n_titles:,} (title, year) keys in {time.time() - started:.0f}s → {index_path}")
+    return index_path
+
+
+def open_index(imdb_dir, index_path=None):
+    # Reuses the index while the TSVs are unchanged, otherwise (re)builds it
+    index_path = index_path or os.path.join(imdb_dir, INDEX_FILE)
+    if os.path.exists(index_path) and index_fingerprint(index_path) == source_fingerprint(imdb_dir):
+        print(f"Using IMDb index {index_path}")
+        return index_path
+    if os.path.exists(index_path):
+        print("IMDb files changed since the index was built - rebuilding...")
+    return build_index(imdb_dir, index_path)
+
+
+# ----------------------------
+# Lookup
+# ----------------------------
+def lookup(index_path, match_title, match_year):
+    # Returns tconst / imdb_rating / imdb_director for each (match_title, match_year), aligned with the input index
+    keys = pd.DataFrame({'title_key': match_title, 'year': pd.to_numeric(match_year, errors='coerce').astype(float)})
+    known = keys.dropna().drop_duplicates()
+    with sqlite3.connect(index_path) as con:
+        con.execute("CREATE TEMP TABLE wanted (title_key TEXT, year INTEGER)")
+        con.executemany("INSERT INTO wanted VALUES (?, ?)", zip(known['title_key'], known['year'].astype('int64').tolist()))
+        found = pd.read_sql_query("""
+            SELECT t.title_key, t.year, t.tconst, t.rating AS imdb_rating, t.directors AS imdb_director
+            FROM wanted w JOIN titles t ON t.title_key = w.title_key AND t.year = w.year
+        """, con)
+    found['year'] = found['year'].astype(float)
+    # At most one index row per key, so the left merge keeps the input rows and their order
+    result = keys.merge(found, on=['title_key', 'year'], how='left')
+    result.index = keys.index
+    return result[['tconst', 'imdb_rating', 'imdb_director']]
+
+
+# ----------------------------
+# Direct lookup (no index)
+# ----------------------------
+# For a one-off run without building the index: the TSVs are streamed in chunks and each
+# chunk is semi-joined against what the Netflix titles actually need - (title, year) keys,
+# then the matched tconsts, then their director nconsts - so only a few thousand rows are
+# ever kept, instead of a dict of every person in name.basics.tsv.
+def match_titles(imdb_dir, keys, chunk_size=CHUNK_SIZE):
+    # Best IMDb title per wanted (title_key, year), same ranking as the index
+    wanted = keys.dropna().drop_duplicates()
+    type_rank = {title_type: rank for rank, title_type in enumerate(TITLE_TYPE_RANK)}
+    candidates = []
+    for chunk in read_tsv(imdb_dir, 'title.basics.tsv', ['tconst', 'titleType', 'primaryTitle', 'startYear'], chunk_size):
+        chunk = pd.DataFrame({
+            'title_key': normalize_title(chunk['primaryTitle'].fillna('')),
+            'year': pd.to_numeric(chunk['startYear'], errors='coerce').astype(float),
+            'tconst': chunk['tconst'],
+            'type_rank': chunk['titleType'].map(type_rank).fillna(len(TITLE_TYPE_RANK)),
+        })
+        candidates.append(chunk.merge(wanted, on=['title_key', 'year']))
+    candidates = pd.concat(candidates, ignore_index=True)
+
+    candidates = candidates.merge(load_ratings(imdb_dir, candidates['tconst'], chunk_size), on='tconst', how='left')
+    candidates['votes'] = candidates['votes'].fillna(0)
+    best = (candidates.sort_values(['type_rank', 'votes', 'tconst'], ascending=[True, False, True])
+            .drop_duplicates(['title_key', 'year']))
+    return best[['title_key', 'year', 'tconst', 'imdb_rating']]
+
+
+def load_ratings(imdb_dir, tconsts, chunk_size=CHUNK_SIZE):
+    # tconst / imdb_rating / votes for the given tconsts only
+    tconsts = set(tconsts)
+    ratings = pd.concat(
+        chunk[chunk['tconst'].isin(tconsts)]
+        for chunk in read_tsv(imdb_dir, 'title.ratings.tsv', ['tconst', 'averageRating', 'numVotes'], chunk_size)
+    )
+    return pd.DataFrame({
+        'tconst': ratings['tconst'],
+        'imdb_rating': pd.to_numeric(ratings['averageRating'], errors='coerce'),
+        'votes': pd.to_numeric(ratings['numVotes'], errors='coerce'),
+    })
+
+
+def resolve_directors(imdb_dir, tconsts, chunk_size=CHUNK_SIZE):
+    # tconst → "Name, Name" in IMDb order, for the given tconsts only
+    tconsts = set(tconsts)
+    directors = []
+    for chunk in read_tsv(imdb_dir, 'title.crew.tsv', ['tconst', 'directors'], chunk_size):
+        chunk = chunk[chunk['tconst'].isin(tconsts) & chunk['directors'].notna()]
+        directors.append(chunk.assign(nconst=chunk['directors'].str.split(',')).explode('nconst'))
+    directors = pd.concat(directors, ignore_index=True)
+    directors['nconst'] = directors['nconst'].str.strip()
+    directors['position'] = directors.groupby('tconst').cumcount()
+
+    nconsts = set(directors['nconst'])
+    names = pd.concat(
+        chunk[chunk['nconst'].isin(nconsts)].dropna(subset=['primaryName'])
+        for chunk in read_tsv(imdb_dir, 'name.basics.tsv', ['nconst', 'primaryName'], chunk_size)
+    ).drop_duplicates('nconst')
+
+    resolved = directors.merge(names, on='nconst').sort_values(['tconst', 'position'])
+    return resolved.groupby('tconst')['primaryName'].agg(', '.join)
+
+
+def lookup_direct(imdb_dir, match_title, match_year, chunk_size=CHUNK_SIZE):
+    # Same result as lookup(), straight from the TSVs
+    keys = pd.DataFrame({'title_key': match_title, 'year': pd.to_numeric(match_year, errors='coerce').astype(float)})
+    print("Matching titles in title.basics.tsv...")
+    best = match_titles(imdb_dir, keys, chunk_size)
+    print(f"Resolving directors for {len(best):,} matched titles...")
+    best['imdb_director'] = best['tconst'].map(resolve_directors(imdb_dir, best['tconst'], chunk_size))
+    result = keys.merge(best, on=['title_key', 'year'], how='left')
+    result.index = keys.index
+    return result[['tconst', 'imdb_rating', 'imdb_director']]
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import time
+
+import requests
+
+# ----------------------------
+# OMDb client
+# ----------------------------
+# Asks OMDb for many titles at once: up to `concurrency` requests in flight, paced by a token
+# bucket (`rate` requests per second), with retries and exponential backoff on network errors
+# and 5xx/429 answers. Every definitive answer is kept in an SQLite cache keyed by
+# (title, year), so a rerun only goes to the network for titles it has never seen.
+# requests is blocking, so each call runs in a worker thread (asyncio.to_thread).
+OMDB_URL = "http://www.omdbapi.com/"
+CACHE_FILE = "omdb_cache.sqlite"
+JOURNAL_FILE = "omdb_journal.jsonl"
+LIMIT_ERROR = "Request limit reached!"
+
+
+class RequestLimitReached(Exception):
+    pass
+
+
+def cache_key(title, year):
+    return str(title).strip().lower(), str(year or '')
+
+
+class TokenBucket:
+    # `rate` tokens per second, at most `burst` saved up
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_FILE):
+        self.con = sqlite3.connect(path)
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                title TEXT, year TEXT, response TEXT, fetched_at REAL,
+                PRIMARY KEY (title, year)
+            )
+        """)
+
+    def get(self, title, year):
+        row = self.con.execute("SELECT response FROM responses WHERE title = ? AND year = ?",
+                               cache_key(title, year)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, title, year, data):
+        self.con.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                         (*cache_key(title, year), json.dumps(data), time.time()))
+        self.con.commit()
+
+    def close(self):
+        self.con.close()
+
+
+def is_final(data):
+    # Found, or OMDb says it doesn't know the title: both are worth caching.
+    # Limit / key / server errors are not - the next run should ask again.
+    return data.get('Response') == 'True' or str(data.get('Error', '')).endswith('not found!')
+
+
+def answer_status(data):
+    if data.get('Response') == 'True':
+        return 'found'
+    return 'not_found' if is_final(data) else 'error'
+
+
+# ----------------------------
+# Progress journal
+# ----------------------------
+# One JSON line per processed row ({"idx", "imdb_rating", "director", "status"}), appended and
+# flushed as each answer arrives - constant cost per row instead of rewriting the whole CSV.
+# On resume the lines are replayed onto the input file; the output CSV is written once at the end.
+class ProgressJournal:
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.drop_torn_line()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def drop_torn_line(self):
+        # A crash mid-write can leave a last line without its newline; cut it off
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, 'rb+') as f:
+            content = f.read()
+            if not content.endswith(b'\n'):
+                f.truncate(content.rfind(b'\n') + 1)
+
+    def replay(self):
+        with open(self.path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def append(self, record):
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class OmdbClient:
+    def __init__(self, api_key, cache_path=CACHE_FILE, base_url=OMDB_URL, rate=5.0, burst=5,
+                 concurrency=8, retries=3, backoff=1.0, timeout=10):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache = ResponseCache(cache_path)
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+        self.stats = {'cached': 0, 'fetched': 0, 'retries': 0}
+
+    def _get(self, title, year):
+        response = self.session.get(self.base_url, params={'t': title, 'y': year, 'apikey': self.api_key},
+                                    timeout=self.timeout)
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+        return response.json()
+
+    async def fetch(self, title, year):
+        cached = self.cache.get(title, year)
+        if cached is not None:
+            self.stats['cached'] += 1
+            return cached
+
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            try:
+                data = await asyncio.to_thread(self._get, title, year)
+                break
+            except (requests.RequestException, ValueError) as e:
+                # OMDb answers 401 with a JSON body when the daily limit is hit
+                body = getattr(getattr(e, 'response', None), 'text', '') or ''
+                if LIMIT_ERROR in body:
+                    raise RequestLimitReached(LIMIT_ERROR)
+                if attempt == self.retries:
+                    return {'Response': 'False', 'Error': f"Network error: {e}"}
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+        self.stats['fetched'] += 1
+        if data.get('Error') == LIMIT_ERROR:
+            raise RequestLimitReached(LIMIT_ERROR)
+        if is_final(data):
+            self.cache.put(title, year, data)
+        return data
+
+    async def fetch_all(self, jobs, on_result=None):
+        # jobs: iterable of (key, title, year). on_result(key, title, year, data) is called as
+        # answers come in. Returns ({key: data}, limit_reached); on the daily limit the
+        # remaining requests are cancelled and what was already answered is returned.
+        results = {}
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+
+        async def worker():
+            while not queue.empty():
+                key, title, year = queue.get_nowait()
+                data = await self.fetch(title, year)
+                results[key] = data
+                if on_result:
+                    on_result(key, title, year, data)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+            return results, False
+        except RequestLimitReached:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            return results, True
+
+    def close(self):
+        self.session.close()
+        self.cache.close()
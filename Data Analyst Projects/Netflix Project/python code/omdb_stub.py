@@ -0,0 +1,90 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ----------------------------
+# Local OMDb stand-in
+# ----------------------------
+# Answers like http://www.omdbapi.com/?t=...&y=...&apikey=... so omdb_client.py can be tried
+# without an API key or using up the daily quota:
+#   python omdb_stub.py --port 8765 --limit 500 --fail-rate 0.05
+#   OmdbClient(API_KEY, base_url="http://localhost:8765/")
+# Answers are derived from a hash of the title, so they are the same on every run: about 2 in 3
+# titles are found (with a rating and usually a director), the rest get "Movie not found!".
+# After --limit requests every call gets "Request limit reached!" (HTTP 401, like OMDb).
+DIRECTORS = ['Jane Campion', 'Bong Joon Ho', 'Greta Gerwig', 'Denis Villeneuve', 'Mira Nair', 'N/A']
+
+
+def stub_answer(title, year):
+    digest = int(hashlib.md5(f"{title.strip().lower()}|{year}".encode()).hexdigest(), 16)
+    if digest % 3 == 0:
+        return {'Response': 'False', 'Error': 'Movie not found!'}
+    return {
+        'Title': title,
+        'Year': year,
+        'imdbRating': 'N/A' if digest % 7 == 0 else f"{1 + digest % 90 / 10:.1f}",
+        'Director': DIRECTORS[digest % len(DIRECTORS)],
+        'Response': 'True',
+    }
+
+
+def make_handler(limit, fail_rate, delay):
+    state = {'requests': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                state['requests'] += 1
+                n = state['requests']
+            time.sleep(delay)
+            query = parse_qs(urlparse(self.path).query)
+            if not query.get('apikey'):
+                self.reply(401, {'Response': 'False', 'Error': 'No API key provided.'})
+            elif limit and n > limit:
+                self.reply(401, {'Response': 'False', 'Error': 'Request limit reached!'})
+            elif random.random() < fail_rate:
+                self.reply(503, {'Response': 'False', 'Error': 'Service unavailable'})
+            else:
+                self.reply(200, stub_answer(query.get('t', [''])[0], query.get('y', [''])[0]))
+
+        def reply(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=8765, limit=0, fail_rate=0.0, delay=0.0):
+    # Returns the running server (stop it with .shutdown())
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(limit, fail_rate, delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of the OMDb API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--limit', type=int, default=0, help="Requests before 'Request limit reached!' (0 = never)")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    parser.add_argument('--delay', type=float, default=0.2, help="Seconds per answer, like a real round trip")
+    args = parser.parse_args()
+    server = serve(args.port, args.limit, args.fail_rate, args.delay)
+    print(f"OMDb stub on http://127.0.0.1:{args.port}/ (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
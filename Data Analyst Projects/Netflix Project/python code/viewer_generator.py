@@ -0,0 +1,183 @@
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Parameters (same defaults as the notebook)
+# ----------------------------
+N_USERS = 10_000             # 10k fake users
+N_EVENTS = 500_000           # 500k viewing events
+START_DATE = np.datetime64('1925-01-01T00:00:00', 'us')   # the lowest release year in the Kaggle data
+END_DATE = np.datetime64('2025-06-30T00:00:00', 'us')
+CHUNK_SIZE = 1_000_000       # events generated (and held in memory) at a time
+
+DEFAULT_TITLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'netflix_titles.csv')
+
+
+# ----------------------------
+# Categories
+# ----------------------------
+def load_titles(path=DEFAULT_TITLES):
+    # Titles that are Movies or TV Shows (exclude nulls), read once as the title categories
+    netflix = pd.read_csv(path, usecols=['title'])
+    return pd.Index(netflix['title'].dropna().unique())
+
+
+def user_ids(n_users=N_USERS):
+    # "user_00001" ... built once per user, not once per event
+    return pd.Index([f"user_{i:05d}" for i in range(1, n_users + 1)])
+
+
+# ----------------------------
+# Event generation
+# ----------------------------
+# Sorted output without a global sort: the time range is cut into equal slices, the number of
+# events per slice is drawn from a multinomial (exactly what n uniform timestamps would give),
+# and each slice is generated and sorted on its own. Slices come out in time order, so the
+# concatenation is sorted and memory only depends on the chunk size.
+def event_slice(rng, users, titles, low, high, count):
+    # `count` events in [low, high) microseconds, sorted by time
+    watched_at = rng.integers(low, high, count)
+    watched_at.sort()
+    return pd.DataFrame({
+        'user_id': pd.Categorical.from_codes(rng.integers(0, len(users), count, dtype=np.int32), categories=users),
+        'title': pd.Categorical.from_codes(rng.integers(0, len(titles), count, dtype=np.int32), categories=titles),
+        'watched_at': watched_at.astype('datetime64[us]').astype('datetime64[ns]'),
+    })
+
+
+def generate_chunks(titles, n_events=N_EVENTS, n_users=N_USERS, start=START_DATE, end=END_DATE,
+                    seed=42, chunk_size=CHUNK_SIZE):
+    rng = np.random.default_rng(seed)
+    users = user_ids(n_users)
+    titles = pd.Index(titles)
+    n_chunks = max(1, -(-n_events // chunk_size))
+    counts = rng.multinomial(n_events, [1 / n_chunks] * n_chunks)
+
+    start_us = np.datetime64(start, 'us').astype(np.int64)
+    end_us = np.datetime64(end, 'us').astype(np.int64)
+    edges = np.linspace(start_us, end_us, n_chunks + 1).astype(np.int64)
+
+    for i, count in enumerate(counts):
+        yield event_slice(rng, users, titles, edges[i], edges[i + 1], count)
+
+
+# ----------------------------
+# Month partitions
+# ----------------------------
+# Same idea with calendar months as the slices: each month gets its multinomial share of the
+# events (proportional to its length), and a month with more than chunk_size events is split
+# into sub-slices that are written as part-00000, part-00001, ... in time order.
+def month_edges(start=START_DATE, end=END_DATE):
+    start = np.datetime64(start, 'us')
+    end = np.datetime64(end, 'us')
+    month_starts = np.arange(start.astype('datetime64[M]') + 1, end.astype('datetime64[M]') + 1).astype('datetime64[us]')
+    month_starts = month_starts[month_starts < end]
+    return np.concatenate(([start], month_starts, [end])).astype(np.int64)
+
+
+def generate_partitions(titles, n_events=N_EVENTS, n_users=N_USERS, start=START_DATE, end=END_DATE,
+                        seed=42, chunk_size=CHUNK_SIZE):
+    # Yields (year, month, part, DataFrame) in time order
+    rng = np.random.default_rng(seed)
+    users = user_ids(n_users)
+    titles = pd.Index(titles)
+    edges = month_edges(start, end)
+    widths = np.diff(edges)
+    counts = rng.multinomial(n_events, widths / widths.sum())
+
+    for i, count in enumerate(counts):
+        if count == 0:
+            continue
+        month = edges[i].astype('datetime64[us]').astype('datetime64[M]')
+        year = int(month.astype('datetime64[Y]').astype(np.int64)) + 1970
+        month_number = int(month.astype(np.int64)) % 12 + 1
+        n_parts = -(-int(count) // chunk_size)
+        sub_edges = np.linspace(edges[i], edges[i + 1], n_parts + 1).astype(np.int64)
+        for part, part_count in enumerate(rng.multinomial(count, [1 / n_parts] * n_parts)):
+            yield year, month_number, part, event_slice(rng, users, titles, sub_edges[part], sub_edges[part + 1], part_count)
+
+
+def generate_events(titles, n_events=N_EVENTS, n_users=N_USERS, start=START_DATE, end=END_DATE,
+                    seed=42, chunk_size=CHUNK_SIZE):
+    # Whole dataset as one DataFrame (sorted by watched_at) - fine up to a few million events
+    chunks = list(generate_chunks(titles, n_events, n_users, start, end, seed, chunk_size))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def is_dataset_folder(out_dir):
+    # True for a folder holding nothing but year=* partitions (a dataset written earlier) or nothing at all
+    return os.path.isdir(out_dir) and all(entry.startswith('year=') for entry in os.listdir(out_dir))
+
+
+def write_parquet_dataset(partitions, out_dir, compression='zstd'):
+    # Hive-style layout: <out_dir>/year=2024/month=03/part-00000.parquet (readable with
+    # pd.read_parquet(out_dir) / pyarrow.dataset, and filters on year/month skip whole folders)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if os.path.exists(out_dir):
+        # Only a dataset written earlier is replaced, never a folder with other files
+        if not is_dataset_folder(out_dir):
+            raise ValueError(f"{out_dir} exists and is not a viewing-events dataset - choose another --out")
+        shutil.rmtree(out_dir)
+    n_rows = n_files = 0
+    for year, month, part, chunk in partitions:
+        folder = os.path.join(out_dir, f"year={year}", f"month={month:02d}")
+        os.makedirs(folder, exist_ok=True)
+        # Only the users/titles present in this file go into its dictionaries
+        chunk = chunk.assign(user_id=chunk['user_id'].cat.remove_unused_categories(),
+                             title=chunk['title'].cat.remove_unused_categories())
+        pq.write_table(pa.Table.from_pandas(chunk, preserve_index=False),
+                       os.path.join(folder, f"part-{part:05d}.parquet"), compression=compression)
+        n_rows += len(chunk)
+        n_files += 1
+    return n_rows, n_files
+
+
+def write_csv(chunks, path):
+    # Appends chunk by chunk, so only one chunk is ever in memory
+    n_rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        n_rows += len(chunk)
+    return n_rows
+
+
+# ----------------------------
+# Command line
+# ----------------------------
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic Netflix viewing events")
+    parser.add_argument('--events', type=int, default=N_EVENTS)
+    parser.add_argument('--users', type=int, default=N_USERS)
+    parser.add_argument('--titles', default=DEFAULT_TITLES, help="Path to netflix_titles.csv")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Events held in memory at a time")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="csv: one sorted file; parquet: year=/month= partitioned dataset")
+    parser.add_argument('--out', help="Output file (csv) or folder (parquet; replaced only if it holds an earlier dataset)")
+    args = parser.parse_args()
+    out = args.out or 'netflix_fake_viewers'
+    if args.format == 'parquet' and os.path.exists(out) and not is_dataset_folder(out):
+        parser.error(f"{out} exists and is not a viewing-events dataset - choose another --out")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    started = time.time()
+    titles = load_titles(args.titles)
+    if args.format == 'parquet':
+        out = args.out or 'netflix_fake_viewers'
+        partitions = generate_partitions(titles, args.events, args.users, seed=args.seed, chunk_size=args.chunk_size)
+        n_rows, n_files = write_parquet_dataset(partitions, out)
+        print(f"{n_rows:,} viewing events written to {out}/ ({n_files:,} files) in {time.time() - started:.1f}s")
+    else:
+        out = args.out or 'netflix_fake_viewers.csv'
+        chunks = generate_chunks(titles, args.events, args.users, seed=args.seed, chunk_size=args.chunk_size)
+        n_rows = write_csv(chunks, out)
+        print(f"{n_rows:,} viewing events written to {out} in {time.time() - started:.1f}s")
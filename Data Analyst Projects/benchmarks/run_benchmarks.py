@@ -0,0 +1,320 @@
+# ====== IMPORTS ======
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+# ====== CONSTANTS ======
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECTS = os.path.dirname(HERE)
+INSURANCE = os.path.join(PROJECTS, 'Insurance Project', 'code')
+HR = os.path.join(PROJECTS, 'HR Project', 'data (via MySQL)')
+NETFLIX = os.path.join(PROJECTS, 'Netflix Project', 'python code')
+
+BASELINE = os.path.join(HERE, 'baseline.json')
+SCALES = [1, 10, 100]  # Multipliers of the 1x sizes below
+
+# Size of each pipeline at 1x
+INSURANCE_SCALE = 0.01   # --scale of the insurance generator: 500 customers, 1,200 policies, 3,000 payments (~6.7k rows)
+HR_SCALE = 0.25          # --scale of the HR generator: 250 employees and ~11k monthly snapshots (+ 4,018 dates)
+NETFLIX_EVENTS = 50_000  # Viewing events
+
+TOLERANCE = 0.20         # Slower or bigger than the baseline by more than this is a regression
+MIN_SECONDS = 1.0        # Wall time is only compared when the baseline case took at least this long (start-up noise)
+MIN_TABLE_ROWS = 10_000  # Rows/sec is only compared for tables at least this big
+
+# Progress lines the scripts print
+LOADER_LINE = re.compile(r'→ (\w+): ([\d,]+) rows in ([\d.]+)s \(([\d,]+) rows/sec\)')    # bulk_loader.py finish()
+EXPORT_LINE = re.compile(r'→ .*?(\w+)\.(?:csv|parquet) \(([\d,]+) rows in ([\d.]+)s')     # table_export.py export_table()
+EVENTS_LINE = re.compile(r'([\d,]+) viewing events written to .* in ([\d.]+)s')           # viewer_generator.py
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Time the data generators and exporters at several scales against local sinks")
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES, help="Size multipliers (1 = the smallest run)")
+    parser.add_argument('--cases', nargs='+', default=['*'], help="Cases to run, e.g. 'insurance-*' 'hr-export/parquet' (see --list)")
+    parser.add_argument('--list', action='store_true', help="Print the cases and exit")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per case; the fastest one is kept")
+    parser.add_argument('--out', default='benchmark_results.json', help="Results file")
+    parser.add_argument('--baseline', default=BASELINE, help="Results of an earlier run to compare with")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the baseline (adds to / replaces its cases)")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="Allowed slowdown / memory growth before a case is a regression")
+    parser.add_argument('--keep', metavar='DIR', help="Work in DIR and keep the generated SQLite files there (default: a temporary folder)")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if any(scale < 1 for scale in args.scales):
+        parser.error("--scales must be positive")
+    return args
+
+
+# ====== CASES ======
+# A case is one script run: generate (rows to a sink) or export (a generated SQLite file to CSV /
+# Parquet). The export cases read the file of the project's sqlite generate case at the same
+# scale; if that case is not selected it is still run first, just not measured.
+class Case(NamedTuple):
+    name: str    # pipeline/output, e.g. 'insurance-generate/sqlite'
+    args: list   # Script and its arguments
+    needs: str = None  # Case whose output the case reads
+
+
+def build_cases(scale, work):
+    # work: folder that keeps the SQLite files for the export cases; other output goes to the run folder
+    insurance_db = os.path.join(work, f'insurance_{scale}x.sqlite')
+    hr_db = os.path.join(work, f'hr_{scale}x.sqlite')
+    cases = []
+    for sink in ['sqlite', 'csv', 'parquet']:
+        cases.append(Case(f'insurance-generate/{sink}', [
+            os.path.join(INSURANCE, 'Generate Insurance 001 db.py'), '--sink', sink,
+            '--scale', f'{INSURANCE_SCALE * scale:g}', '--out', insurance_db if sink == 'sqlite' else 'output']))
+    for sink in ['sqlite', 'csv', 'parquet']:
+        # Sharded mode is seeded, so every run writes the same rows; one worker keeps it in this process
+        cases.append(Case(f'hr-generate/{sink}', [
+            os.path.join(HR, 'generate_hr_data.py'), '--sink', sink, '--sharded', '--workers', '1',
+            '--scale', f'{HR_SCALE * scale:g}', '--out', hr_db if sink == 'sqlite' else 'output']))
+    for fmt in ['csv', 'parquet']:
+        cases.append(Case(f'netflix-generate/{fmt}', [
+            os.path.join(NETFLIX, 'viewer_generator.py'), '--events', str(NETFLIX_EVENTS * scale),
+            '--format', fmt, '--out', 'viewing_events.csv' if fmt == 'csv' else 'output']))
+    for fmt in ['csv', 'parquet']:
+        cases.append(Case(f'insurance-export/{fmt}', [
+            os.path.join(INSURANCE, 'export_to_csv.py'), '--sqlite', insurance_db, '--format', fmt],
+            needs='insurance-generate/sqlite'))
+    for fmt in ['csv', 'parquet']:
+        cases.append(Case(f'hr-export/{fmt}', [
+            os.path.join(HR, 'export_to_csv.py'), '--sqlite', hr_db, '--format', fmt],
+            needs='hr-generate/sqlite'))
+    return cases
+
+
+def selected(name, patterns):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+# ====== MEASURING ======
+# Each run is a fresh process in an empty folder: wall time around the whole process, peak RSS
+# from the kernel's resource usage of the child (wait4; not available on Windows), and per-table
+# rows/sec from the progress lines the script prints.
+def run(args, folder):
+    if os.path.exists(folder):
+        shutil.rmtree(folder)
+    os.makedirs(folder)
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable] + args, cwd=folder, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    output = proc.stdout.read()
+    proc.stdout.close()
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in KB on Linux, bytes on macOS
+        peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    else:
+        proc.wait()
+        peak_rss_mb = None
+    wall = time.perf_counter() - start
+    shutil.rmtree(folder)  # Generated files (the SQLite files the export cases need live outside it)
+    return proc.returncode, output, wall, peak_rss_mb
+
+
+def parse_tables(output):
+    # {table: {'rows', 'seconds', 'rows_per_sec'}} from the script's progress lines
+    tables = {}
+    for line in output.splitlines():
+        match = LOADER_LINE.search(line)
+        if match:
+            table, rows, seconds, rate = match.groups()
+            tables[table] = {'rows': int(rows.replace(',', '')), 'seconds': float(seconds), 'rows_per_sec': int(rate.replace(',', ''))}
+            continue
+        match = EXPORT_LINE.search(line) or EVENTS_LINE.search(line)
+        if match:
+            table, rows, seconds = match.groups() if match.re is EXPORT_LINE else ('ViewingEvents',) + match.groups()
+            rows, seconds = int(rows.replace(',', '')), float(seconds)
+            # Printed with 0.1s precision: too coarse for a rate below that
+            tables[table] = {'rows': rows, 'seconds': seconds, 'rows_per_sec': round(rows / seconds) if seconds > 0 else None}
+    return tables
+
+
+def measure(case, folder, repeat):
+    best = None
+    for _ in range(repeat):
+        code, output, wall, peak_rss_mb = run(case.args, folder)
+        if code != 0:
+            print(output[-2000:])
+            return {'error': f"exit code {code}"}
+        if best is None or wall < best[0]:
+            best = (wall, peak_rss_mb, output)
+    wall, peak_rss_mb, output = best
+    tables = parse_tables(output)
+    rows = sum(stats['rows'] for stats in tables.values())
+    return {
+        'rows': rows,
+        'wall_seconds': round(wall, 3),
+        'rows_per_sec': round(rows / wall) if wall > 0 else None,
+        'peak_rss_mb': None if peak_rss_mb is None else round(peak_rss_mb, 1),
+        'tables': tables,
+    }
+
+
+def warm_up(folder):
+    # The insurance generator builds its Faker vocabulary cache (.vocab_cache/) on the first run;
+    # a small unmeasured run keeps that out of the first measured case
+    run([os.path.join(INSURANCE, 'Generate Insurance 001 db.py'), '--sink', 'csv', '--scale', '0.001', '--out', 'output'], folder)
+
+
+# ====== BASELINE ======
+def machine():
+    return {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()}
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_results(path, results):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def compare(key, result, base, tolerance):
+    # Returns (regressions, notes) of one case against its baseline
+    regressions, notes = [], []
+    if base['rows'] != result['rows']:
+        notes.append(f"{key}: {base['rows']:,} rows in the baseline, {result['rows']:,} now - the output changed, timings may not compare")
+    if base['wall_seconds'] >= MIN_SECONDS and result['wall_seconds'] > base['wall_seconds'] * (1 + tolerance):
+        regressions.append(f"{key}: wall time {base['wall_seconds']:.2f}s → {result['wall_seconds']:.2f}s "
+                           f"({result['wall_seconds'] / base['wall_seconds'] - 1:+.0%})")
+    if base.get('peak_rss_mb') and result.get('peak_rss_mb') and result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+        regressions.append(f"{key}: peak RSS {base['peak_rss_mb']:.0f} MB → {result['peak_rss_mb']:.0f} MB "
+                           f"({result['peak_rss_mb'] / base['peak_rss_mb'] - 1:+.0%})")
+    for table, stats in result['tables'].items():
+        before = base['tables'].get(table)
+        if not before or before['rows'] < MIN_TABLE_ROWS or not before['rows_per_sec'] or not stats['rows_per_sec']:
+            continue
+        if stats['rows_per_sec'] < before['rows_per_sec'] * (1 - tolerance):
+            regressions.append(f"{key}: {table} {before['rows_per_sec']:,} → {stats['rows_per_sec']:,} rows/sec "
+                               f"({stats['rows_per_sec'] / before['rows_per_sec'] - 1:+.0%})")
+    return regressions, notes
+
+
+def print_summary(results, baseline):
+    print(f"\n{'Case':<32} {'Rows':>12} {'Wall s':>9} {'Rows/sec':>11} {'Peak MB':>9}  vs baseline")
+    for key, result in results.items():
+        if 'error' in result:
+            print(f"{key:<32} {result['error']}")
+            continue
+        base = (baseline or {}).get('results', {}).get(key)
+        versus = ''
+        if base and 'error' not in base:
+            versus = f"wall {result['wall_seconds'] / base['wall_seconds'] - 1:+.0%}"
+            if base.get('peak_rss_mb') and result.get('peak_rss_mb'):
+                versus += f", RSS {result['peak_rss_mb'] / base['peak_rss_mb'] - 1:+.0%}"
+        rate = f"{result['rows_per_sec']:,}" if result['rows_per_sec'] else '-'
+        rss = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] is not None else '-'
+        print(f"{key:<32} {result['rows']:>12,} {result['wall_seconds']:>9.2f} {rate:>11} {rss:>9}  {versus}")
+
+
+# ====== MAIN ======
+def main():
+    args = parse_args()
+    if args.list:
+        for case in build_cases(1, '.'):
+            print(f"{case.name:<28} {' '.join(os.path.basename(arg) if os.sep in arg else arg for arg in case.args)}")
+        return 0
+
+    work = os.path.abspath(args.keep) if args.keep else tempfile.mkdtemp(prefix='benchmarks_')
+    os.makedirs(work, exist_ok=True)
+    folder = os.path.join(work, 'run')
+    results = {}
+    try:
+        cases = [case for case in build_cases(1, work) if selected(case.name, args.cases)]
+        if not cases:
+            print(f"No case matches {args.cases} (see --list)")
+            return 2
+        if any(case.name.startswith('insurance-') for case in cases):
+            warm_up(folder)
+
+        for scale in sorted(args.scales):
+            cases = build_cases(scale, work)
+            by_name = {case.name: case for case in cases}
+            done = set()
+            for case in cases:
+                if not selected(case.name, args.cases):
+                    continue
+                if case.needs and case.needs not in done:
+                    print(f"Preparing {case.needs} ({scale}x, not measured)...")
+                    code, output, _, _ = run(by_name[case.needs].args, folder)
+                    if code != 0:
+                        print(output[-2000:])
+                        results[f'{case.name}/{scale}x'] = {'error': f"{case.needs} failed (exit code {code})"}
+                        continue
+                    done.add(case.needs)
+                key = f'{case.name}/{scale}x'
+                print(f"Running {key}...")
+                results[key] = measure(case, folder, args.repeat)
+                if 'error' not in results[key]:
+                    done.add(case.name)
+                    print(f"   {results[key]['rows']:,} rows in {results[key]['wall_seconds']:.2f}s, peak RSS {results[key]['peak_rss_mb']} MB")
+            if not args.keep:
+                for name in os.listdir(work):
+                    if name.endswith(f'_{scale}x.sqlite'):
+                        os.remove(os.path.join(work, name))  # Only needed by this scale's export cases
+    finally:
+        if not args.keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+    report = {'created': datetime.now().isoformat(timespec='seconds'), 'machine': machine(),
+              'tolerance': args.tolerance, 'results': results}
+    save_results(args.out, report)
+    print(f"\nResults saved to {args.out}")
+
+    baseline = load_results(args.baseline)
+    print_summary(results, baseline)
+
+    failed = [key for key, result in results.items() if 'error' in result]
+    regressions, notes = [], []
+    if baseline:
+        if baseline.get('machine') != report['machine']:
+            notes.append(f"The baseline was recorded on another machine ({baseline.get('machine')}) - differences may not be regressions")
+        for key, result in results.items():
+            base = baseline['results'].get(key)
+            if base and 'error' not in base and 'error' not in result:
+                case_regressions, case_notes = compare(key, result, base, args.tolerance)
+                regressions += case_regressions
+                notes += case_notes
+    else:
+        print(f"\nNo baseline at {args.baseline} (create one with --save-baseline)")
+    for note in notes:
+        print(f"Note: {note}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"   ✗ {regression}")
+    elif baseline:
+        print(f"\nNo regressions beyond {args.tolerance:.0%} of the baseline.")
+
+    if args.save_baseline:
+        # Keeps the baseline's other cases and scales, so a partial run only replaces what it measured
+        stored = baseline if baseline and baseline.get('machine') == report['machine'] else {'results': {}}
+        stored['results'].update({key: result for key, result in results.items() if 'error' not in result})
+        stored.update({'created': report['created'], 'machine': report['machine']})
+        save_results(args.baseline, stored)
+        print(f"Baseline saved to {args.baseline}")
+
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
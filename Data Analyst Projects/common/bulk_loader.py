@@ -0,0 +1,100 @@
+# ====== IMPORTS ======
+import time
+
+
+# ====== BULK LOADER ======
+# Buffers rows per table and writes them with `executemany`, which mysql-connector
+# rewrites into a single multi-row "INSERT ... VALUES (...), (...), ..." statement.
+# One round trip per batch instead of one per row.
+# Works with any DB-API connection (placeholder='?' for sqlite3); the file sinks in sinks.py
+# reuse the buffering and only replace write() and commit().
+class BulkLoader:
+    def __init__(self, cnx, batch_size=5000, placeholder='%s'):
+        self.cnx = cnx
+        self.cursor = cnx.cursor() if cnx is not None else None
+        self.batch_size = batch_size
+        self.placeholder = placeholder
+        self._columns = {}
+        self._sql = {}
+        self._parents = {}
+        self._buffers = {}
+        self._counts = {}
+        self._started = {}
+
+    def register(self, table, columns, parents=()):
+        # parents: tables whose pending rows must reach the DB before this table's rows (FK order)
+        placeholders = ", ".join([self.placeholder] * len(columns))
+        self._columns[table] = list(columns)
+        self._sql[table] = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        self._parents[table] = tuple(parents)
+        self._buffers[table] = []
+        self._counts[table] = 0
+        self._started[table] = None
+
+    def add(self, table, row):
+        if self._started[table] is None:
+            self._started[table] = time.perf_counter()
+        buffer = self._buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(table)
+
+    def add_rows(self, table, rows):
+        for row in rows:
+            self.add(table, row)
+
+    def flush(self, table):
+        for parent in self._parents[table]:
+            self.flush(parent)
+        buffer = self._buffers[table]
+        if not buffer:
+            return
+        self.write(table, buffer)
+        self._counts[table] += len(buffer)
+        buffer.clear()
+
+    def write(self, table, rows):
+        self.cursor.executemany(self._sql[table], rows)
+
+    def commit(self):
+        self.cnx.commit()
+
+    def load(self, table):
+        # Called once all of a table's rows are written and committed; loaders that stage rows
+        # first (sinks.LoadInfileSink) ingest them here
+        pass
+
+    def delete_after(self, table, last_id):
+        # Resumed runs (checkpoint.py): drops the rows written after the checkpoint, keyed on the
+        # table's first registered column (its ID, or the parent's ID for detail tables)
+        key = self._columns[table][0]
+        self.cursor.execute(f"DELETE FROM {table} WHERE {key} > {self.placeholder}", (last_id,))
+
+    def read_rows(self, table, last_id):
+        # Rows up to last_id as they were inserted, for a resumed run that needs them in memory
+        key = self._columns[table][0]
+        self.cursor.execute(f"SELECT {', '.join(self._columns[table])} FROM {table} "
+                            f"WHERE {key} <= {self.placeholder} ORDER BY {key}", (last_id,))
+        return self.cursor.fetchall()
+
+    def writers(self, n):
+        # Loaders the writer threads of pipeline.py write through. Only loaders that can open
+        # more connections (sinks.MySQLSink) support more than one
+        if n != 1:
+            raise ValueError(f"{type(self).__name__} supports a single writer thread")
+        return [self]
+
+    def finish(self, table):
+        # Flush what is left, commit the table and report its throughput
+        self.flush(table)
+        self.commit()
+        self.load(table)
+        rows = self._counts[table]
+        elapsed = time.perf_counter() - self._started[table] if self._started[table] else 0.0
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        print(f"   → {table}: {rows:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/sec)")
+        return rows
+
+    def close(self):
+        if self.cursor is not None:
+            self.cursor.close()
@@ -0,0 +1,105 @@
+# ====== IMPORTS ======
+import os
+import pickle
+
+# ====== CONSTANTS ======
+COMMIT_ROWS = 50_000  # Rows of a table between two commits (--commit-every)
+
+
+def commit_intervals(specs, default=COMMIT_ROWS):
+    # --commit-every values: "20000" sets every table, "Payments=100000" a single one
+    intervals = {None: default}
+    for spec in specs or []:
+        table, _, rows = spec.rpartition('=')
+        intervals[table or None] = int(rows)
+    return intervals
+
+
+# ====== CHECKPOINTS ======
+# Long runs commit every few batches instead of once per table: after a table's rows since the
+# last commit reach its interval, the rows of its phase are flushed and committed, and a checkpoint
+# records the phase, the last ID committed for it and whatever the generator needs to continue
+# from there with the same output (RNG states, allocators, ...; `state` returns them).
+#
+# phases: (phase, tables) in generation order - a phase is one ID range, e.g. ('Policies',
+# ['Policies', 'AutoPolicyDetails', ...]) keyed on PolicyID in the insurance generator, or
+# ('DIM_Employee', ['DIM_Employee', 'FACT_EmployeeSnapshot']) keyed on EmployeeID in sharded HR mode.
+# A --resume run deletes the rows written after the checkpoint (batches committed between the
+# last checkpoint and the crash, e.g. by pipeline.py writers), skips the phases already done and
+# carries on with the next ID.
+# A finished phase moves the checkpoint to the start of the next one.
+# The checkpoint is pickled next to the output and replaced atomically, so a crash while it is
+# written leaves the previous one. Without a path (file sinks) the intervals still apply but no
+# checkpoint is kept.
+class Checkpoints:
+    def __init__(self, loader, path, settings, intervals, state, phases):
+        self.loader = loader
+        self.path = path
+        self.settings = settings  # Arguments that change the output; a resumed run must use the same ones
+        self.intervals = intervals
+        self.state = state
+        self.phases = [phase for phase, _ in phases]
+        self.tables = dict(phases)
+        self.phase = None  # Phase and last ID of the checkpoint the run resumed from
+        self.last_id = 0
+        self.pending = 0  # Rows added since the last commit
+
+    def resume(self):
+        if self.path is None or not os.path.exists(self.path):
+            raise ValueError(f"No checkpoint to resume from ({self.path})")
+        with open(self.path, 'rb') as f:
+            saved = pickle.load(f)
+        for name, value in self.settings.items():
+            if saved['settings'].get(name) != value:
+                raise ValueError(f"The checkpoint was written with {name}={saved['settings'].get(name)!r}, not {value!r}")
+        self.phase, self.last_id = saved['phase'], saved['last_id']
+        print(f"Resuming {self.phase} after ID {self.last_id:,} ({self.path})")
+
+        # Rows committed after the checkpoint go, children before parents
+        current = self.phases.index(self.phase)
+        for phase in reversed(self.phases[current:]):
+            for table in reversed(self.tables[phase]):
+                self.loader.delete_after(table, self.last_id if phase == self.phase else 0)
+        self.loader.commit()
+        return saved['state']
+
+    def done(self, phase):
+        # Phases before the checkpoint's phase are complete in the database
+        return self.phase is not None and self.phases.index(phase) < self.phases.index(self.phase)
+
+    def resume_after(self, phase):
+        # Last ID of the phase already in the database (0: start from its first ID)
+        return self.last_id if phase == self.phase else 0
+
+    def advance(self, phase, last_id, rows):
+        # After a shard or block of the phase (IDs up to last_id) is added
+        self.pending += rows
+        if self.pending < self.intervals.get(phase, self.intervals[None]):
+            return
+        for table in self.tables[phase]:
+            self.loader.flush(table)
+        self.loader.commit()
+        self.save(phase, last_id)
+
+    def finished(self, phase):
+        # Call after finish() committed the phase's tables: a resume starts with the next phase
+        index = self.phases.index(phase) + 1
+        if index < len(self.phases):
+            self.save(self.phases[index], 0)
+
+    def save(self, phase, last_id):
+        # Rows of the phase up to last_id (and all earlier phases) are committed
+        self.pending = 0
+        if self.path is None:
+            return
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump({'settings': self.settings, 'phase': phase, 'last_id': last_id, 'state': self.state()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+
+    def remove(self):
+        # The run completed: nothing left to resume
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,116 @@
+# ====== IMPORTS ======
+import hashlib
+
+MASK32 = 0xFFFFFFFF
+
+
+def _derive_key(seed, label, i):
+    digest = hashlib.sha256(f"{seed}:{label}:{i}".encode()).digest()
+    return int.from_bytes(digest[:4], 'big')
+
+
+# ====== KEYED PERMUTATION ======
+# A small Feistel network over [0, 2**bits) plus cycle-walking gives a bijection on [0, size):
+# every index maps to a different, random-looking code, with no lookup table and no retries
+# against previously issued values. The same arithmetic runs on Python ints and NumPy arrays.
+class KeyedPermutation:
+    ROUNDS = 4
+
+    def __init__(self, size, seed, label='permutation'):
+        self.size = size
+        bits = max(2, (size - 1).bit_length())
+        bits += bits % 2  # even split into two halves
+        self.half_bits = bits // 2
+        self.half_mask = (1 << self.half_bits) - 1
+        self.keys = [_derive_key(seed, label, i) for i in range(self.ROUNDS)]
+
+    def _round(self, right, key):
+        x = (right * 0x9E3779B1 + key) & MASK32
+        x ^= x >> 15
+        x = (x * 0x85EBCA6B) & MASK32
+        x ^= x >> 13
+        return x & self.half_mask
+
+    def _encrypt(self, value):
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left << self.half_bits) | right
+
+    def __call__(self, index):
+        if not 0 <= index < self.size:
+            raise ValueError(f"Index {index} outside the permutation range 0..{self.size - 1}")
+        value = self._encrypt(index)
+        while value >= self.size:  # cycle-walk back into range (≈2 steps at most on average)
+            value = self._encrypt(value)
+        return value
+
+    def apply(self, indices):
+        # Vectorized version for NumPy integer arrays
+        import numpy as np
+        indices = np.asarray(indices, dtype=np.uint64)
+        if len(indices) and int(indices.max()) >= self.size:
+            raise ValueError(f"Index outside the permutation range 0..{self.size - 1}")
+        values = self._encrypt_array(indices)
+        outside = values >= self.size
+        while outside.any():
+            values[outside] = self._encrypt_array(values[outside])
+            outside = values >= self.size
+        return values
+
+    def _encrypt_array(self, values):
+        import numpy as np
+        half_bits = np.uint64(self.half_bits)
+        half_mask = np.uint64(self.half_mask)
+        mask32 = np.uint64(MASK32)
+        left, right = values >> half_bits, values & half_mask
+        for key in self.keys:
+            x = (right * np.uint64(0x9E3779B1) + np.uint64(key)) & mask32
+            x ^= x >> np.uint64(15)
+            x = (x * np.uint64(0x85EBCA6B)) & mask32
+            x ^= x >> np.uint64(13)
+            left, right = right, left ^ (x & half_mask)
+        return (left << half_bits) | right
+
+
+# ====== POLICY NUMBERS ======
+# PREFIX-NNNNNNN with 4 prefixes × 9,000,000 numbers = 36M distinct values.
+# PolicyID n always gets the same number for a given seed, so shards never collide.
+class PolicyNumberAllocator:
+    PREFIXES = ['POL', 'INS', 'COV', 'PRM']
+    NUMBERS_PER_PREFIX = 9_000_000  # 1000000 … 9999999
+
+    def __init__(self, seed=42):
+        self.permutation = KeyedPermutation(len(self.PREFIXES) * self.NUMBERS_PER_PREFIX, seed, 'policy-number')
+
+    def code(self, policy_id):
+        return self.permutation(policy_id - 1)
+
+    def number(self, policy_id):
+        code = self.code(policy_id)
+        return f"{self.PREFIXES[code // self.NUMBERS_PER_PREFIX]}-{code % self.NUMBERS_PER_PREFIX + 1000000}"
+
+
+# ====== EMAILS ======
+# One counter per (local-part base, domain). The first plain request gets "base@domain", later ones
+# get "base<n>@domain" with n counting up from a per-key offset. Bases never end in a digit, so two
+# different (base, n) pairs can't render the same address. Memory grows with distinct bases only.
+class EmailAllocator:
+    def __init__(self, seed=42):
+        self.seed = seed
+        self._counters = {}
+
+    def allocate(self, base, domain, numbered=False):
+        key = (base, domain)
+        n = self._counters.get(key, 0)
+        if numbered and n == 0:
+            n = 1  # numbered formats always carry a suffix
+        self._counters[key] = n + 1
+        if n == 0:
+            return f"{base}@{domain}"
+        return f"{base}{self._offset(key) + n}@{domain}"
+
+    def _offset(self, key):
+        # Makes suffixes look like "john.smith57" instead of always starting at 1
+        digest = hashlib.blake2b(f"{self.seed}:{key[0]}@{key[1]}".encode(), digest_size=2).digest()
+        return int.from_bytes(digest, 'big') % 90
@@ -0,0 +1,127 @@
+# ====== IMPORTS ======
+import queue
+import threading
+import time
+
+from bulk_loader import BulkLoader
+
+# ====== CONSTANTS ======
+WRITERS = 2        # Writer threads (MySQL: one pooled connection each; the other sinks use one)
+QUEUE_BATCHES = 8  # Full batches waiting for a writer before the generator has to wait
+
+
+# ====== PIPELINED LOADER ======
+# Same interface as BulkLoader, for --pipeline: the generator thread keeps building rows while
+# writer threads send the full batches to the sink. Batches go through a bounded queue, so when
+# the writers fall behind add() blocks (backpressure) and at most QUEUE_BATCHES batches are held.
+#
+# FK order: every batch gets a sequence number when it is queued. A writer only writes a batch
+# once no batch of a parent table (register(..., parents=[...])) queued before it is still
+# pending, and every batch is committed as soon as it is written - so with several connections a
+# child row never reaches MySQL before its parent row is visible. finish() waits until the queue
+# is empty, so tables finished earlier (Customers before Policies, DIM_Employee before the
+# snapshots in classic HR mode) are always complete before the next phase writes rows pointing to them.
+#
+# Metrics (printed by close(), kept in .metrics): queue depth when a batch is queued (average
+# and max), time the generator was stalled on a full queue, time the writers sat idle on an
+# empty queue, and time writers waited for a parent batch.
+class PipelinedLoader(BulkLoader):
+    def __init__(self, sink, writers=WRITERS, queue_batches=QUEUE_BATCHES):
+        super().__init__(None, sink.batch_size)
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=queue_batches)
+        self.condition = threading.Condition()
+        self.pending = {}  # table → sequence numbers of its queued or in-flight batches
+        self.sequence = 0
+        self.error = None
+        self.metrics = {'batches': 0, 'depth_total': 0, 'depth_max': 0, 'queue_size': queue_batches,
+                        'generator_stall': 0.0, 'writer_idle': 0.0, 'parent_wait': 0.0}
+        self._writers = sink.writers(writers)
+        self._threads = [threading.Thread(target=self.drain, args=(writer,), daemon=True) for writer in self._writers]
+        for thread in self._threads:
+            thread.start()
+
+    def register(self, table, columns, parents=()):
+        super().register(table, columns, parents)
+        self.sink.register(table, columns, parents)
+        self.pending[table] = set()
+
+    def check(self):
+        if self.error is not None:
+            raise RuntimeError("A writer thread failed") from self.error
+
+    def write(self, table, rows):
+        # Runs in the generator thread (BulkLoader.flush): hands the batch over instead of writing it
+        self.check()
+        with self.condition:
+            self.sequence += 1
+            self.pending[table].add(self.sequence)
+            item = (self.sequence, table, list(rows))  # flush() clears its buffer afterwards
+        started = time.perf_counter()
+        self.queue.put(item)  # Blocks while the queue is full
+        self.metrics['generator_stall'] += time.perf_counter() - started
+        depth = self.queue.qsize()  # Batches waiting, this one included
+        self.metrics['batches'] += 1
+        self.metrics['depth_total'] += depth
+        self.metrics['depth_max'] = max(self.metrics['depth_max'], depth)
+
+    def drain(self, writer):
+        parents = self.sink._parents
+        while True:
+            started = time.perf_counter()
+            item = self.queue.get()
+            idle = time.perf_counter() - started
+            if item is None:
+                self.queue.task_done()
+                return
+            sequence, table, rows = item
+            try:
+                with self.condition:
+                    self.metrics['writer_idle'] += idle
+                    started = time.perf_counter()
+                    self.condition.wait_for(lambda: not any(
+                        pending < sequence for parent in parents[table] for pending in self.pending[parent]))
+                    self.metrics['parent_wait'] += time.perf_counter() - started
+                if self.error is None:  # After a failure the queue is only drained, so the generator never blocks
+                    writer.write(table, rows)
+                    writer.commit()
+            except Exception as error:
+                self.error = self.error or error
+            finally:
+                with self.condition:
+                    self.pending[table].discard(sequence)
+                    self.condition.notify_all()
+                self.queue.task_done()
+
+    def commit(self):
+        # Waits until every queued batch is written (finish() calls this before reporting)
+        self.queue.join()
+        self.check()
+
+    def load(self, table):
+        self.sink.load(table)
+
+    def delete_after(self, table, last_id):
+        self.commit()
+        self.sink.delete_after(table, last_id)
+
+    def read_rows(self, table, last_id):
+        self.commit()
+        return self.sink.read_rows(table, last_id)
+
+    def close(self):
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        for writer in self._writers:
+            if writer is not self.sink:
+                writer.close()
+                writer.cnx.close()
+        m = self.metrics
+        average = m['depth_total'] / m['batches'] if m['batches'] else 0.0
+        print(f"   Pipeline: {m['batches']:,} batches, {len(self._threads)} writer(s), queue depth avg {average:.1f} / max {m['depth_max']} "
+              f"of {m['queue_size']}, generator stalled {m['generator_stall']:.1f}s, writers idle {m['writer_idle']:.1f}s (all threads), "
+              f"parent waits {m['parent_wait']:.1f}s")
+        self.sink.close()
+        self.check()
@@ -0,0 +1,72 @@
+# ====== IMPORTS ======
+import random
+
+import numpy as np
+
+# ====== WEIGHTED SAMPLERS ======
+# random.choices(values, weights=...) rebuilds the cumulative weights on every call, and
+# numpy's rng.choice(p=...) does the same for every column. A WeightedSampler compiles the
+# distribution once into a Walker alias table: every bucket i holds a probability prob[i] and an
+# alias. A draw picks a bucket uniformly and keeps it with probability prob[i], otherwise takes
+# its alias - O(1) per draw whatever the number of values, from a single random number.
+class WeightedSampler:
+    def __init__(self, values, weights):
+        # Weights don't need to sum to 1 (or 100) - only their proportions matter
+        weights = np.asarray(weights, dtype=float)
+        if len(values) != len(weights) or len(values) == 0:
+            raise ValueError("values and weights must be non-empty and of the same length")
+        if (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError("weights must be non-negative with a positive total")
+        self.values = list(values)
+        self.n = len(self.values)
+
+        # Vose's construction: scale to mean 1, then pair each under-full bucket with an over-full one
+        scaled = weights * self.n / weights.sum()
+        prob = np.ones(self.n)
+        alias = np.arange(self.n)
+        small = [i for i in range(self.n) if scaled[i] < 1.0]
+        large = [i for i in range(self.n) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left is full up to rounding errors (prob stays 1.0, alias itself)
+
+        self.prob = prob
+        self.alias = alias
+        # Plain lists for the scalar path: indexing a list is much faster than a NumPy array
+        self._prob = prob.tolist()
+        self._alias = alias.tolist()
+        self._array = None
+
+    # --- Row builders (random.Random) ---
+    def index(self, rng=random):
+        u = rng.random() * self.n
+        i = min(int(u), self.n - 1)
+        return i if u - i < self._prob[i] else self._alias[i]
+
+    def draw(self, rng=random):
+        return self.values[self.index(rng)]
+
+    # --- Column generators (numpy.random.Generator) ---
+    def codes(self, rng, size):
+        u = rng.random(size) * self.n
+        i = np.minimum(u.astype(np.int64), self.n - 1)
+        return np.where(u - i < self.prob[i], i, self.alias[i])
+
+    def sample(self, rng, size):
+        if self._array is None:
+            self._array = np.asarray(self.values)
+        return self._array[self.codes(rng, size)]
+
+
+_compiled = {}  # (values, weights) → WeightedSampler, for call sites that pass the weights inline
+
+
+def sampler(values, weights):
+    key = (tuple(values), tuple(float(w) for w in weights))
+    if key not in _compiled:
+        _compiled[key] = WeightedSampler(values, weights)
+    return _compiled[key]
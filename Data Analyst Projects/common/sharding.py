@@ -0,0 +1,68 @@
+# ====== IMPORTS ======
+import hashlib
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+# ====== SHARDED GENERATION ======
+# An ID range (e.g. CustomerID 1-50,000) is cut into fixed-size shards. Every shard gets its own
+# random.Random (and Faker) seeded from (base seed, table, shard number), so a shard produces the
+# same rows whichever process runs it. Shards are merged back in shard order, which makes the
+# output identical for any worker count.
+def shard_seed(base_seed, table, shard):
+    digest = hashlib.sha256(f"{base_seed}:{table}:{shard}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def shard_ranges(first_id, last_id, shard_size):
+    return [
+        (shard, start, min(start + shard_size - 1, last_id))
+        for shard, start in enumerate(range(first_id, last_id + 1, shard_size))
+    ]
+
+
+_fakers = {}  # One Faker per locale per worker process, re-seeded for every shard
+
+
+def _shard_faker(locale, seed):
+    from faker import Faker
+    fake = _fakers.get(locale)
+    if fake is None:
+        fake = _fakers[locale] = Faker(locale)
+    fake.seed_instance(seed)
+    fake.unique.clear()
+    return fake
+
+
+def _run_shard(task):
+    builder, first_id, last_id, seed, locale, context = task
+    rng = random.Random(seed)
+    fake = _shard_faker(locale, seed) if locale else None
+    return builder(rng, fake, first_id, last_id, context)
+
+
+def run_sharded(builder, table, first_id, last_id, context, base_seed=42, shard_size=10_000, workers=1, locale=None,
+                resume_after=0):
+    # builder(rng, fake, first_id, last_id, context) must be a module-level function (it is pickled).
+    # Yields each shard's result in shard order; at most 2 shards per worker are in flight.
+    # resume_after: skip the shards up to that ID (already written by an interrupted run) - shards
+    # keep their numbers, so the remaining ones get the same seeds
+    tasks = [
+        (builder, start, end, shard_seed(base_seed, table, shard), locale, context)
+        for shard, start, end in shard_ranges(first_id, last_id, shard_size)
+        if end > resume_after
+    ]
+    if workers <= 1:
+        for task in tasks:
+            yield _run_shard(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_run_shard, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
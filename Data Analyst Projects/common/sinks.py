@@ -0,0 +1,505 @@
+# ====== IMPORTS ======
+import csv
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import date, datetime
+
+from bulk_loader import BulkLoader
+from table_export import CHUNK_SIZE, arrow_type, to_arrow_column
+
+# ====== CONSTANTS ======
+SINKS = ['mysql', 'mysql-load', 'sqlite', 'csv', 'parquet']
+RESUMABLE = ['mysql', 'sqlite']  # Sinks that commit as they go, so a run can continue from a checkpoint (checkpoint.py)
+
+# MySQL column type → Parquet type, the same ones export_to_csv.py gets from a MySQL cursor
+# (table_export.MYSQL_TYPES); anything else is a string
+PARQUET_TYPES = {
+    'INT': 'int64', 'INTEGER': 'int64', 'BIGINT': 'int64', 'MEDIUMINT': 'int32', 'SMALLINT': 'int32',
+    'TINYINT': 'int16', 'BOOLEAN': 'int16', 'BOOL': 'int16', 'YEAR': 'int32',
+    'DECIMAL': 'float64', 'FLOAT': 'float32', 'DOUBLE': 'float64',
+    'DATE': 'date32', 'DATETIME': 'timestamp[s]', 'TIMESTAMP': 'timestamp[s]',
+}
+
+
+# ====== SCHEMA ======
+# The MySQL schema file stays the one place that defines the tables. It is translated for SQLite
+# (AUTO_INCREMENT keys become INTEGER PRIMARY KEY, which SQLite numbers the same way; ON UPDATE,
+# ALTER TABLE ... ADD FOREIGN KEY and stored procedures are dropped), which gives the SQLite sink
+# the same tables and lets the file sinks read the column order, types and defaults - and the
+# lookup rows the schema inserts - from an in-memory copy.
+def split_top_level(text):
+    # Splits on commas outside parentheses and quotes: "a INT, b DECIMAL(15,2)" → ['a INT', 'b DECIMAL(15,2)']
+    parts, depth, quote, current = [], 0, None, ''
+    for char in text:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        current += char
+    parts.append(current.strip())
+    return [part for part in parts if part]
+
+
+def sqlite_script(schema_path):
+    with open(schema_path, encoding='utf-8') as f:
+        text = f.read()
+    text = re.sub(r'DELIMITER \$\$.*?DELIMITER ;', '', text, flags=re.S)  # Stored procedures
+    text = re.sub(r'--[^\n]*', '', text)
+
+    statements = []
+    for statement in text.split(';'):
+        statement = statement.strip()
+        keyword = ' '.join(statement.split()[:2]).upper()
+        if keyword == 'CREATE TABLE':
+            statement = re.sub(r'\b(BIG)?INT\s+(AUTO_INCREMENT\s+PRIMARY KEY|PRIMARY KEY\s+AUTO_INCREMENT)\b',
+                               'INTEGER PRIMARY KEY', statement, flags=re.I)
+            statement = re.sub(r'\bON UPDATE CURRENT_TIMESTAMP\b', '', statement, flags=re.I)
+            statements.append(statement)
+        elif keyword == 'ALTER TABLE':
+            # SQLite adds one column per ALTER and cannot add constraints afterwards
+            table, additions = re.match(r'ALTER TABLE\s+(\w+)\s+(.*)', statement, flags=re.S | re.I).groups()
+            for addition in split_top_level(additions):
+                column = re.sub(r'^ADD\s+(COLUMN\s+)?', '', addition, flags=re.I)
+                if not re.match(r'(CONSTRAINT|FOREIGN|PRIMARY|UNIQUE|INDEX|KEY)\b', column, flags=re.I):
+                    statements.append(f"ALTER TABLE {table} ADD COLUMN {column}")
+        elif keyword.startswith('INSERT INTO'):
+            statements.append(statement)
+    return ';\n'.join(statements) + ';\n'
+
+
+def default_value(db, sql, now):
+    if sql is None or sql.upper() == 'NULL':
+        return None
+    if sql.upper() == 'CURRENT_TIMESTAMP':
+        return now  # MySQL fills in the local time of the insert
+    return db.execute(f"SELECT {sql}").fetchone()[0]
+
+
+class Schema:
+    def __init__(self, schema_path):
+        self.db = sqlite3.connect(':memory:')
+        self.db.executescript(sqlite_script(schema_path))
+        self.tables = [name for (name,) in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY rowid")]
+        now = datetime.now().replace(microsecond=0)
+        self.columns = {}   # table → [column name]
+        self.types = {}     # table → [MySQL type, upper case]
+        self.defaults = {}  # table → [value a MySQL insert would give a column left out]
+        self.auto = {}      # table → position of its AUTO_INCREMENT key, or None
+        for table in self.tables:
+            info = self.db.execute(f"PRAGMA table_info({table})").fetchall()
+            self.columns[table] = [row[1] for row in info]
+            self.types[table] = [row[2].upper() for row in info]
+            self.defaults[table] = [default_value(self.db, row[4], now) for row in info]
+            self.auto[table] = next((row[0] for row in info if row[5] == 1 and row[2].upper() == 'INTEGER'), None)
+
+    def lookup_rows(self, table):
+        return self.db.execute(f"SELECT * FROM {table}").fetchall()
+
+
+# ====== VALUE CONVERSION ======
+# Values as MySQL would store (and export_to_csv.py would write) them: BOOLEAN as 0/1, a date in a
+# DATETIME column as midnight, DECIMAL(p,s) with s decimals in CSV
+def to_datetime(value):
+    return datetime.combine(value, datetime.min.time()) if type(value) is date else value
+
+
+def value_converter(sql_type, text=False):
+    base = sql_type.split('(')[0]
+    if base in ('BOOLEAN', 'BOOL', 'TINYINT'):
+        return int
+    if base in ('DATETIME', 'TIMESTAMP'):
+        return (lambda v: to_datetime(v).strftime('%Y-%m-%d %H:%M:%S')) if text else to_datetime
+    if base == 'DECIMAL':
+        scale = re.search(r',\s*(\d+)\)', sql_type)
+        if text and scale:
+            return lambda v, fmt=f".{scale.group(1)}f": format(float(v), fmt)
+        return float
+    return None
+
+
+def row_converter(sql_types, text=False):
+    # Only the columns that need it are touched
+    fixes = [(i, fix) for i, fix in ((i, value_converter(t, text)) for i, t in enumerate(sql_types)) if fix]
+
+    def convert(row):
+        row = list(row)
+        for i, fix in fixes:
+            if row[i] is not None:
+                row[i] = fix(row[i])
+        return row
+    return convert
+
+
+# ====== DATABASE SINKS ======
+class MySQLSink(BulkLoader):
+    kind = 'mysql'
+
+    def __init__(self, config, batch_size=5000):
+        import mysql.connector
+        super().__init__(mysql.connector.connect(**config), batch_size)
+        self.config = config
+
+    def writers(self, n):
+        # One pooled connection per writer thread, sharing this sink's INSERT statements
+        import mysql.connector.pooling
+        pool = mysql.connector.pooling.MySQLConnectionPool(pool_name='generator_writers', pool_size=n, **self.config)
+        writers = []
+        for _ in range(n):
+            writer = BulkLoader(pool.get_connection(), self.batch_size)
+            writer._sql = self._sql
+            writers.append(writer)
+        return writers
+
+    def delete_after(self, table, last_id):
+        super().delete_after(table, last_id)
+        self.cnx.commit()
+        # InnoDB keeps its AUTO_INCREMENT counter past deleted and rolled-back rows; setting it to 1
+        # moves it back to MAX(key) + 1, so resumed rows get the IDs of an uninterrupted run
+        self.cursor.execute(f"ALTER TABLE {table} AUTO_INCREMENT = 1")
+
+    def close(self):
+        super().close()
+        self.cnx.close()
+
+
+# ====== LOAD DATA FAST PATH ======
+# --sink mysql-load: rows are staged to one TSV file per table and ingested with a single
+# LOAD DATA LOCAL INFILE when the table is finished. Before the first load the foreign keys and
+# secondary indexes of the registered tables are dropped, so InnoDB only maintains the primary
+# key while loading; close() rebuilds them in one ALTER TABLE per table (indexes first, then the
+# foreign keys that need them - with FOREIGN_KEY_CHECKS off, so MySQL adds them in place without
+# re-checking rows the generator already wrote in parent-first order). The rebuild statements are saved to REBUILD_FILE before anything
+# is dropped, so an interrupted run can be repaired by running that file.
+# Needs local_infile=ON on the server (SET GLOBAL local_infile = 1).
+REBUILD_FILE = 'deferred_keys.sql'
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+FOREIGN_KEYS_QUERY = """
+    SELECT k.TABLE_NAME, k.CONSTRAINT_NAME, k.COLUMN_NAME, k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME,
+           r.UPDATE_RULE, r.DELETE_RULE
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+      ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME IN ({})
+    ORDER BY k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION
+"""
+INDEXES_QUERY = """
+    SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME, SUB_PART
+    FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({})
+      AND INDEX_NAME <> 'PRIMARY' AND INDEX_TYPE = 'BTREE' AND COLUMN_NAME IS NOT NULL
+    ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+"""
+
+
+def tsv_value(value):
+    # One field as LOAD DATA reads it by default: \N for NULL, backslash-escaped tabs and newlines
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, str):
+        return value.translate(TSV_ESCAPES)
+    return str(value)
+
+
+class LoadInfileSink(MySQLSink):
+    kind = 'mysql-load'
+
+    def __init__(self, config, batch_size=5000, staging_dir=None):
+        import mysql.connector
+        BulkLoader.__init__(self, mysql.connector.connect(**config, allow_local_infile=True), batch_size)
+        self.config = config
+        self.staging_dir = tempfile.mkdtemp(prefix='load_', dir=staging_dir)
+        self._staged = {}     # table → [open TSV file, rows staged]
+        self._deferred = None  # table → (index clauses, foreign key clauses) to add back in close()
+        self.phases = {}      # phase → seconds, reported by close()
+
+    def timed(self, phase, started):
+        self.phases[phase] = self.phases.get(phase, 0.0) + time.perf_counter() - started
+
+    def path(self, table):
+        return os.path.join(self.staging_dir, f"{table}.tsv")
+
+    def write(self, table, rows):
+        started = time.perf_counter()
+        if table not in self._staged:
+            self._staged[table] = [open(self.path(table), 'w', encoding='utf-8', newline='\n'), 0]
+        staged = self._staged[table]
+        staged[0].writelines('\t'.join([tsv_value(v) for v in row]) + '\n' for row in rows)
+        staged[1] += len(rows)
+        self.timed('stage', started)
+
+    writers = BulkLoader.writers  # One staging file per table: a single writer thread
+
+    def commit(self):
+        pass  # Nothing is sent to MySQL until the table is loaded
+
+    def defer_keys(self):
+        # Drops the foreign keys and secondary indexes of every registered table (once)
+        started = time.perf_counter()
+        tables = list(self._sql)
+        names = ', '.join(['%s'] * len(tables))
+        self.cursor.execute("SET FOREIGN_KEY_CHECKS = 0, UNIQUE_CHECKS = 0")
+
+        foreign_keys = {}  # (table, name) → [columns, referenced table, referenced columns, rules]
+        self.cursor.execute(FOREIGN_KEYS_QUERY.format(names), tables)
+        for table, name, column, ref_table, ref_column, on_update, on_delete in self.cursor.fetchall():
+            key = foreign_keys.setdefault((table, name), [[], ref_table, [], on_update, on_delete])
+            key[0].append(column)
+            key[2].append(ref_column)
+        indexes = {}  # (table, name) → [unique, columns]
+        self.cursor.execute(INDEXES_QUERY.format(names), tables)
+        for table, name, non_unique, column, sub_part in self.cursor.fetchall():
+            index = indexes.setdefault((table, name), [not int(non_unique), []])
+            index[1].append(f"{column}({sub_part})" if sub_part else column)
+
+        self._deferred = {table: ([], []) for table in tables}
+        for (table, name), (unique, columns) in indexes.items():
+            self._deferred[table][0].append(f"ADD {'UNIQUE ' if unique else ''}INDEX `{name}` ({', '.join(columns)})")
+        for (table, name), (columns, ref_table, ref_columns, on_update, on_delete) in foreign_keys.items():
+            self._deferred[table][1].append(
+                f"ADD CONSTRAINT `{name}` FOREIGN KEY ({', '.join(columns)}) REFERENCES {ref_table} ({', '.join(ref_columns)}) "
+                f"ON DELETE {on_delete} ON UPDATE {on_update}")
+        with open(REBUILD_FILE, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.rebuild_statements()) + '\n')
+
+        for (table, name) in foreign_keys:
+            self.cursor.execute(f"ALTER TABLE {table} DROP FOREIGN KEY `{name}`")
+        for table in tables:
+            drops = [f"DROP INDEX `{name}`" for (owner, name) in indexes if owner == table]
+            if drops:
+                self.cursor.execute(f"ALTER TABLE {table} {', '.join(drops)}")
+        self.timed('defer keys', started)
+
+    def rebuild_statements(self):
+        statements = [f"ALTER TABLE {table} {', '.join(index_clauses)};"
+                      for table, (index_clauses, _) in self._deferred.items() if index_clauses]
+        statements += [f"ALTER TABLE {table} {', '.join(fk_clauses)};"
+                       for table, (_, fk_clauses) in self._deferred.items() if fk_clauses]
+        return statements
+
+    def load(self, table):
+        # One LOAD DATA for the whole staged table
+        if self._deferred is None:
+            self.defer_keys()
+        if table in self._staged:
+            f, rows = self._staged.pop(table)
+            f.close()
+            started = time.perf_counter()
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                f"({', '.join(self._columns[table])})", (self.path(table),))
+            self.cnx.commit()
+            self.timed('load', started)
+            os.remove(self.path(table))
+            elapsed = time.perf_counter() - started
+            rate = rows / elapsed if elapsed > 0 else 0.0
+            print(f"   → {table}: LOAD DATA of {rows:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/sec)")
+
+    def close(self):
+        if self._deferred is not None:
+            started = time.perf_counter()
+            for statement in self.rebuild_statements():
+                self.cursor.execute(statement.rstrip(';'))
+            self.cursor.execute("SET FOREIGN_KEY_CHECKS = 1, UNIQUE_CHECKS = 1")
+            self.timed('rebuild keys', started)
+            os.remove(REBUILD_FILE)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        print("   Phases: " + ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in self.phases.items()))
+        super().close()
+
+
+# sqlite3 only converts DATE and TIMESTAMP columns itself; DATETIME values are stored the same way
+sqlite3.register_converter('DATETIME', lambda value: datetime.fromisoformat(value.decode()))
+
+
+def connect_sqlite(path, check_same_thread=True):
+    # DATE / DATETIME columns come back as datetime.date / datetime, like from mysql-connector
+    return sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=check_same_thread)
+
+
+def sqlite_parquet_types(cnx, table):
+    # {column: Parquet type} from the declared column types of a table in a SQLite sink's file
+    cursor = cnx.execute(f"PRAGMA table_info(`{table}`)")
+    return {row[1]: PARQUET_TYPES.get(row[2].split('(')[0].upper(), 'string') for row in cursor.fetchall()}
+
+
+class SQLiteSink(BulkLoader):
+    # A fresh database file with the tables of the schema (and its lookup rows), or with
+    # resume=True the file of an interrupted run
+    kind = 'sqlite'
+
+    def __init__(self, schema_path, path, batch_size=5000, resume=False):
+        if resume and not os.path.exists(path):
+            raise ValueError(f"{path} does not exist - nothing to resume")
+        if os.path.exists(path) and not resume:
+            os.remove(path)
+        cnx = connect_sqlite(path, check_same_thread=False)  # pipeline.py writes from a writer thread
+        if not resume:
+            cnx.executescript(sqlite_script(schema_path))
+        super().__init__(cnx, batch_size, placeholder='?')
+        self._convert = {}
+
+    def register(self, table, columns, parents=()):
+        super().register(table, columns, parents)
+        types = {row[1]: row[2].upper() for row in self.cnx.execute(f"PRAGMA table_info({table})")}
+        self._convert[table] = row_converter([types[column] for column in columns])
+
+    def write(self, table, rows):
+        convert = self._convert[table]
+        self.cursor.executemany(self._sql[table], [convert(row) for row in rows])
+
+    def close(self):
+        super().close()
+        self.cnx.close()
+
+
+# ====== FILE SINKS ======
+# <out_dir>/<Table>.csv or .parquet in the full column layout of the schema - columns the generator
+# doesn't fill get the schema default or stay empty (an AUTO_INCREMENT key counts up from 1), as in
+# a MySQL export. At close() the lookup
+# tables the schema fills and the tables nobody wrote are added, so the folder has the same files
+# as an export_to_csv.py run. Each file is written to "<path>.part" and renamed when complete.
+class FileSink(BulkLoader):
+    extension = None
+
+    def __init__(self, schema_path, out_dir, batch_size=CHUNK_SIZE, dtypes=None):
+        super().__init__(None, batch_size)
+        self.schema = Schema(schema_path)
+        self.out_dir = out_dir
+        self.dtypes = dtypes or {}
+        self._positions = {}
+        self._next_id = {}
+        self._files = {}
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.makedirs(out_dir)
+
+    def register(self, table, columns, parents=()):
+        super().register(table, columns, parents)
+        names = self.schema.columns[table]
+        missing = [column for column in columns if column not in names]
+        if missing:
+            raise ValueError(f"{table} has no column(s) {', '.join(missing)} in the schema")
+        self._positions[table] = [names.index(column) for column in columns]
+        auto = self.schema.auto[table]
+        self._next_id[table] = 1 if auto is not None and auto not in self._positions[table] else None
+
+    def full_rows(self, table, rows):
+        defaults = self.schema.defaults[table]
+        positions = self._positions[table]
+        auto, next_id = self.schema.auto[table], self._next_id[table]
+        full = []
+        for row in rows:
+            values = list(defaults)
+            for position, value in zip(positions, row):
+                values[position] = value
+            if next_id is not None:
+                values[auto] = next_id
+                next_id += 1
+            full.append(values)
+        if next_id is not None:
+            self._next_id[table] = next_id
+        return full
+
+    def path(self, table):
+        return os.path.join(self.out_dir, f"{table}.{self.extension}")
+
+    def write(self, table, rows):
+        if table not in self._files:
+            self._files[table] = self.open_table(table)
+        self.write_rows(table, self.full_rows(table, rows))
+
+    def commit(self):
+        pass
+
+    def close(self):
+        for table in self.schema.tables:
+            if table not in self._files:
+                self._files[table] = self.open_table(table)
+                rows = self.schema.lookup_rows(table)
+                if rows:
+                    self.write_rows(table, rows)
+        for table in self._files:
+            self.close_table(table)
+            os.replace(self.path(table) + '.part', self.path(table))
+        self._files = {}
+
+
+class CSVSink(FileSink):
+    kind = 'csv'
+    extension = 'csv'
+
+    def open_table(self, table):
+        f = open(self.path(table) + '.part', 'w', newline='', encoding='utf-8')
+        writer = csv.writer(f)
+        writer.writerow(self.schema.columns[table])
+        return f, writer, row_converter(self.schema.types[table], text=True)
+
+    def write_rows(self, table, rows):
+        _, writer, convert = self._files[table]
+        writer.writerows(convert(row) for row in rows)
+
+    def close_table(self, table):
+        self._files[table][0].close()
+
+
+class ParquetSink(FileSink):
+    # dtypes: {table: {column: type name}} overrides, e.g. export_to_csv.PARQUET_DTYPES
+    kind = 'parquet'
+    extension = 'parquet'
+
+    def __init__(self, schema_path, out_dir, batch_size=CHUNK_SIZE, dtypes=None, compression='zstd'):
+        super().__init__(schema_path, out_dir, batch_size, dtypes)
+        self.compression = compression
+
+    def open_table(self, table):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        overrides = self.dtypes.get(table, {})
+        schema = pa.schema([
+            (column, arrow_type(overrides.get(column) or PARQUET_TYPES.get(sql_type.split('(')[0], 'string')))
+            for column, sql_type in zip(self.schema.columns[table], self.schema.types[table])
+        ])
+        writer = pq.ParquetWriter(self.path(table) + '.part', schema, compression=self.compression)
+        return writer, schema, row_converter(self.schema.types[table])
+
+    def write_rows(self, table, rows):
+        import pyarrow as pa
+        writer, schema, convert = self._files[table]
+        columns = zip(*(convert(row) for row in rows))
+        arrays = [to_arrow_column(list(values), field.type) for values, field in zip(columns, schema)]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))  # One row group per batch
+
+    def close_table(self, table):
+        self._files[table][0].close()
+
+
+def open_sink(kind, schema_path, mysql_config=None, out=None, batch_size=5000, dtypes=None, resume=False):
+    # out: SQLite database file or output folder; MySQL uses mysql_config and an existing schema.
+    # resume: keep what an interrupted run wrote (RESUMABLE sinks)
+    if kind == 'mysql':
+        return MySQLSink(mysql_config, batch_size)
+    if kind == 'mysql-load':
+        return LoadInfileSink(mysql_config, batch_size)
+    if kind == 'sqlite':
+        return SQLiteSink(schema_path, out, batch_size, resume)
+    if kind == 'csv':
+        return CSVSink(schema_path, out, dtypes=dtypes)
+    if kind == 'parquet':
+        return ParquetSink(schema_path, out, dtypes=dtypes)
+    raise ValueError(f"Unknown sink: {kind}")
@@ -0,0 +1,387 @@
+# ====== IMPORTS ======
+import csv
+import json
+import os
+import queue
+import re
+import shutil
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from decimal import Decimal
+
+# ====== CONSTANTS ======
+CHUNK_SIZE = 50_000  # Rows held in memory at a time, whatever the table size
+
+# MySQL field type codes (mysql.connector.FieldType) → default Parquet column type
+MYSQL_TYPES = {
+    0: 'float64', 246: 'float64',                   # DECIMAL, NEWDECIMAL
+    1: 'int16', 2: 'int32', 9: 'int32',              # TINY (also BOOLEAN), SHORT, INT24
+    3: 'int64', 8: 'int64', 13: 'int32',             # LONG, LONGLONG, YEAR
+    4: 'float32', 5: 'float64',                      # FLOAT, DOUBLE
+    10: 'date32', 14: 'date32',                      # DATE, NEWDATE
+    7: 'timestamp[s]', 12: 'timestamp[s]',           # TIMESTAMP, DATETIME
+}
+
+
+# ====== STREAMING READS ======
+# Rows come from an unbuffered (server-side) cursor with fetchmany(), so only one chunk is in
+# memory at a time. Works with any DB-API connection; MySQL gets buffered=False explicitly.
+def open_cursor(cnx):
+    try:
+        return cnx.cursor(buffered=False)
+    except TypeError:  # sqlite3 and other DB-API drivers without the keyword
+        return cnx.cursor()
+
+
+def stream_query(cnx, query, params=(), chunk_size=CHUNK_SIZE):
+    cursor = open_cursor(cnx)
+    cursor.execute(query, params)
+    columns = [d[0] for d in cursor.description]
+    type_codes = [d[1] for d in cursor.description]
+
+    def chunks():
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    return columns, type_codes, chunks()
+
+
+# ====== WRITERS ======
+# Both write to "<path>.part" and rename at the end, so a failed export never leaves a half file
+def write_csv(path, columns, chunks, header=True):
+    n_rows = 0
+    with open(path + '.part', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(rows)
+            n_rows += len(rows)
+    os.replace(path + '.part', path)
+    return n_rows
+
+
+def arrow_type(name):
+    # 'int64', 'float64', 'string', 'bool', 'date32', 'timestamp[s]', 'dictionary', 'decimal(15,2)', ...
+    import pyarrow as pa
+    if name == 'dictionary':
+        return pa.dictionary(pa.int32(), pa.string())  # Low-cardinality text (status, state, ...)
+    if name == 'string':
+        return pa.string()
+    if name == 'bool':
+        return pa.bool_()
+    match = re.fullmatch(r'decimal\((\d+),\s*(\d+)\)', name)
+    if match:
+        return pa.decimal128(int(match.group(1)), int(match.group(2)))
+    return pa.type_for_alias(name)
+
+
+def parquet_schema(columns, type_codes, dtypes=None):
+    import pyarrow as pa
+    dtypes = dtypes or {}
+    return pa.schema([
+        (column, arrow_type(dtypes.get(column) or MYSQL_TYPES.get(code, 'string')))
+        for column, code in zip(columns, type_codes)
+    ])
+
+
+def to_arrow_column(values, arrow_type):
+    import pyarrow as pa
+    if pa.types.is_floating(arrow_type):
+        values = [float(v) if isinstance(v, Decimal) else v for v in values]
+    elif pa.types.is_boolean(arrow_type):
+        values = [None if v is None else bool(v) for v in values]
+    elif pa.types.is_dictionary(arrow_type):
+        return pa.array(values, type=pa.string()).dictionary_encode().cast(arrow_type)
+    elif pa.types.is_string(arrow_type):
+        values = [None if v is None else str(v) for v in values]
+    return pa.array(values, type=arrow_type)
+
+
+def write_parquet(path, columns, type_codes, chunks, dtypes=None, compression='zstd'):
+    # dtypes: {column: type name} overrides the type derived from the MySQL column type
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = parquet_schema(columns, type_codes, dtypes)
+    n_rows = 0
+    with pq.ParquetWriter(path + '.part', schema, compression=compression) as writer:
+        for rows in chunks:
+            arrays = [to_arrow_column(values, field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))  # One row group per chunk
+            n_rows += len(rows)
+    os.replace(path + '.part', path)
+    return n_rows
+
+
+# ====== EXPORT ======
+def write_query(cnx, query, params, path, fmt='csv', chunk_size=CHUNK_SIZE, dtypes=None, compression='zstd', header=True):
+    # Streams one query into one file; returns (columns, rows written)
+    columns, type_codes, chunks = stream_query(cnx, query, params, chunk_size)
+    if fmt == 'csv':
+        return columns, write_csv(path, columns, chunks, header=header)
+    if fmt == 'parquet':
+        return columns, write_parquet(path, columns, type_codes, chunks, dtypes, compression)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_table(cnx, table, folder, fmt='csv', chunk_size=CHUNK_SIZE, dtypes=None, compression='zstd'):
+    start = time.time()
+    path = os.path.join(folder, f"{table}.{fmt}")
+    _, n_rows = write_query(cnx, f"SELECT * FROM `{table}`", (), path, fmt, chunk_size, dtypes, compression)
+    print(f"   → {path} ({n_rows:,} rows in {time.time() - start:.1f}s)")
+    return n_rows
+
+
+# ====== PARALLEL EXPORT ======
+# Same idea as mydumper: a separate connection holds FLUSH TABLES WITH READ LOCK just long enough
+# for every worker connection to open START TRANSACTION WITH CONSISTENT SNAPSHOT, so all workers
+# read the same point in time. Without the RELOAD privilege the snapshots are only taken back to back.
+def begin_snapshots(lock_cnx, connections):
+    lock_cursor = lock_cnx.cursor()
+    try:
+        lock_cursor.execute("FLUSH TABLES WITH READ LOCK")
+        locked = True
+    except Exception as e:
+        print(f"   Global read lock not available ({e}) - snapshots are taken back to back instead.")
+        locked = False
+    try:
+        for cnx in connections:
+            cursor = cnx.cursor()
+            cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+            cursor.close()
+    finally:
+        if locked:
+            lock_cursor.execute("UNLOCK TABLES")
+        lock_cursor.close()
+
+
+def pk_ranges(cnx, table, key, n_parts, where='', params=()):
+    # Splits [MIN(key), MAX(key)] (of the rows matching `where`) into n_parts contiguous, inclusive ranges
+    cursor = cnx.cursor()
+    cursor.execute(f"SELECT MIN(`{key}`), MAX(`{key}`) FROM `{table}`" + (f" WHERE {where}" if where else ""), params)
+    low, high = cursor.fetchone()
+    cursor.close()
+    if low is None:
+        return []
+    step = max(1, -(-(high - low + 1) // n_parts))
+    return [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
+
+
+def combine_parts(path, columns, part_paths, fmt, compression='zstd'):
+    # Concatenates the part files (in key order) into the final file
+    if fmt == 'parquet' and len(part_paths) == 1:
+        os.replace(part_paths[0], path)
+        return
+    if fmt == 'csv':
+        with open(path + '.part', 'w', newline='', encoding='utf-8') as out:
+            csv.writer(out).writerow(columns)
+            for part_path in part_paths:
+                with open(part_path, newline='', encoding='utf-8') as f:
+                    shutil.copyfileobj(f, out)
+    else:
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(part_paths[0])
+        with pq.ParquetWriter(path + '.part', schema, compression=compression) as writer:
+            for part_path in part_paths:
+                part = pq.ParquetFile(part_path)
+                for i in range(part.num_row_groups):
+                    writer.write_table(part.read_row_group(i))
+    os.replace(path + '.part', path)
+    for part_path in part_paths:
+        os.remove(part_path)
+
+
+def max_value(cnx, table, column):
+    cursor = cnx.cursor()
+    cursor.execute(f"SELECT MAX(`{column}`) FROM `{table}`")
+    value = cursor.fetchone()[0]
+    cursor.close()
+    return value
+
+
+def export_tables(pool, tables, folder, fmt='csv', workers=4, split_keys=None, chunk_size=CHUNK_SIZE, dtypes=None,
+                  compression='zstd', since=None, paths=None):
+    # pool: mysql.connector.pooling.MySQLConnectionPool with at least workers + 1 connections.
+    # split_keys: {table: primary key} for big tables that are read as `workers` PK ranges in parallel.
+    # since: {table: (column, last watermark or None)} exports only rows with column > watermark.
+    # paths: {table: output file}, default <folder>/<table>.<fmt>.
+    # Returns {table: {'path', 'rows', 'watermark'}} (watermark = MAX(column) in the snapshot).
+    split_keys = split_keys or {}
+    dtypes = dtypes or {}
+    since = since or {}
+    paths = paths or {}
+    parts_dir = os.path.join(folder, '.parts')
+    os.makedirs(parts_dir, exist_ok=True)
+
+    lock_cnx = pool.get_connection()
+    connections = [pool.get_connection() for _ in range(workers)]
+    try:
+        try:
+            begin_snapshots(lock_cnx, connections)
+        finally:
+            lock_cnx.close()  # Back to the pool
+
+        # One task per table, or per PK range for the split tables (read inside the snapshot too)
+        plan = {}
+        watermarks = {}
+        for table in tables:
+            where, params = '', ()
+            if table in since:
+                column, last = since[table]
+                watermarks[table] = max_value(connections[0], table, column)
+                if watermarks[table] is None:
+                    watermarks[table] = last
+                if last is not None:
+                    where, params = f"`{column}` > %s", (last,)
+            key = split_keys.get(table)
+            ranges = pk_ranges(connections[0], table, key, workers, where, params) if key and workers > 1 else []
+            plan[table] = [
+                (f"SELECT * FROM `{table}` WHERE {where + ' AND ' if where else ''}`{key}` BETWEEN %s AND %s ORDER BY `{key}`",
+                 params + (low, high))
+                for low, high in ranges
+            ] or [(f"SELECT * FROM `{table}`" + (f" WHERE {where}" if where else ""), params)]
+
+        idle = queue.Queue()  # Each connection serves one streaming query at a time
+        for cnx in connections:
+            idle.put(cnx)
+
+        def run_part(table, i, query, params):
+            cnx = idle.get()
+            try:
+                start = time.time()
+                path = os.path.join(parts_dir, f"{table}.{i:04d}.{fmt}")
+                columns, n_rows = write_query(cnx, query, params, path, fmt, chunk_size, dtypes.get(table), compression, header=False)
+                return table, i, path, columns, n_rows, start
+            finally:
+                idle.put(cnx)
+
+        # Split tables first: they are the longest, so they should not start last
+        order = sorted(tables, key=lambda t: -len(plan[t]))
+        done = defaultdict(list)
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_part, table, i, query, params)
+                       for table in order for i, (query, params) in enumerate(plan[table])]
+            for future in as_completed(futures):
+                table, i, path, columns, n_rows, start = future.result()
+                done[table].append((i, path, columns, n_rows, start))
+                if len(done[table]) < len(plan[table]):
+                    continue
+                parts = sorted(done.pop(table))
+                final_path = paths.get(table) or os.path.join(folder, f"{table}.{fmt}")
+                combine_parts(final_path, parts[0][2], [part[1] for part in parts], fmt, compression)
+                total = sum(part[3] for part in parts)
+                elapsed = time.time() - min(part[4] for part in parts)
+                print(f"   → {final_path} ({total:,} rows in {elapsed:.1f}s, {len(parts)} part{'s' if len(parts) > 1 else ''})")
+                results[table] = {'path': final_path, 'rows': total, 'watermark': watermarks.get(table)}
+    finally:
+        for cnx in connections:
+            try:
+                cnx.rollback()  # End the read-only snapshot
+            finally:
+                cnx.close()
+    os.rmdir(parts_dir)
+    return results
+
+
+# ====== INCREMENTAL EXPORT ======
+# Tables with a watermark column (an increasing ID, or a date) only export the rows past the last
+# run's watermark, as a new partition file in <folder>/<table>/. Other tables are re-exported in full.
+# manifest.json keeps each table's watermark, partitions and row counts for the next run.
+MANIFEST = 'manifest.json'
+
+
+def load_manifest(folder):
+    path = os.path.join(folder, MANIFEST)
+    if not os.path.exists(path):
+        return {'tables': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(folder, manifest):
+    path = os.path.join(folder, MANIFEST)
+    with open(path + '.part', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.part', path)  # The manifest only changes once all files are in place
+
+
+def reset_tables(folder, tables):
+    # For rows rewritten in place under the same IDs (Claim Fix.py): the watermarks would skip them,
+    # so the tables' partitions are dropped and the next incremental run exports them in full.
+    # Returns the tables that were reset (those the manifest had).
+    manifest = load_manifest(folder)
+    reset = [table for table in tables if table in manifest['tables']]
+    if not reset:
+        return reset
+    for table in reset:
+        del manifest['tables'][table]
+    save_manifest(folder, manifest)
+    for table in reset:
+        shutil.rmtree(os.path.join(folder, table), ignore_errors=True)
+    return reset
+
+
+def json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def export_incremental(pool, tables, folder, watermarks, fmt='csv', workers=4, split_keys=None, chunk_size=CHUNK_SIZE,
+                       dtypes=None, compression='zstd'):
+    # watermarks: {table: column}. The first run (no manifest yet) exports everything.
+    os.makedirs(folder, exist_ok=True)
+    manifest = load_manifest(folder)
+    if manifest['tables'] and manifest.get('format') != fmt:
+        raise ValueError(f"'{folder}' holds a {manifest.get('format')} export; use the same --format or a new folder")
+    run = manifest.get('runs', 0) + 1
+
+    since, paths = {}, {}
+    for table in tables:
+        os.makedirs(os.path.join(folder, table), exist_ok=True)
+        column = watermarks.get(table)
+        entry = manifest['tables'].get(table, {})
+        if column:
+            if entry.get('watermark_column', column) != column:
+                raise ValueError(f"{table} was exported with watermark {entry['watermark_column']}, not {column}")
+            since[table] = (column, entry.get('watermark'))
+            paths[table] = os.path.join(folder, table, f"{table}-{run:05d}.{fmt}")
+        else:
+            paths[table] = os.path.join(folder, table, f"{table}.{fmt}")
+
+    results = export_tables(pool, tables, folder, fmt, workers, split_keys, chunk_size, dtypes, compression, since, paths)
+
+    exported_at = datetime.now().isoformat(sep=' ', timespec='seconds')
+    for table, result in results.items():
+        entry = manifest['tables'].setdefault(table, {'partitions': []})
+        partition = {'file': os.path.relpath(result['path'], folder).replace(os.sep, '/'), 'rows': result['rows'],
+                     'exported_at': exported_at}
+        if table in since:
+            entry['watermark_column'] = since[table][0]
+            entry['watermark'] = json_value(result['watermark'])
+            if result['rows']:
+                partition['watermark'] = entry['watermark']
+                entry['partitions'].append(partition)
+            else:
+                os.remove(result['path'])  # Nothing new since the last run
+        else:
+            entry['partitions'] = [partition]
+        entry['rows'] = sum(p['rows'] for p in entry['partitions'])
+        if table in since:
+            print(f"   {table}: +{result['rows']:,} new rows ({entry['rows']:,} total, watermark {entry['watermark']})")
+
+    manifest.update(format=fmt, runs=run, updated_at=exported_at)
+    save_manifest(folder, manifest)
+    return manifest